@@ -1,14 +1,37 @@
-from sklearn.metrics import confusion_matrix, accuracy_score, precision_score, recall_score, f1_score
-from IPython.display import display, HTML
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
-import json
 import os
 
-# Style configuration for nicer plots
-sns.set_theme(style="whitegrid")
-plt.rcParams['figure.figsize'] = [10, 6]
+import metrics
+import ground_truth
+from results_store import CACHE_DIR as RESULTS_CACHE_DIR, ResultsStore, concat_categorical
+
+# matplotlib.pyplot and seaborn, imported by the first plot (see plotting()), so loading
+# data and computing metrics does not pay for the plotting stack
+plt = sns = None
+
+
+def plotting():
+    """Imports matplotlib and seaborn on first use and applies the plot style."""
+    global plt, sns
+    if plt is None:
+        import matplotlib.pyplot as pyplot
+        import seaborn
+
+        # Style configuration for nicer plots
+        seaborn.set_theme(style="whitegrid")
+        pyplot.rcParams['figure.figsize'] = [10, 6]
+        plt, sns = pyplot, seaborn
+
+
+def display(obj):
+    from IPython.display import display as ipython_display
+    ipython_display(obj)
+
+
+def HTML(data):
+    from IPython.display import HTML as ipython_html
+    return ipython_html(data)
+
 
 llm_colors = {
     'ChatGPT 5.1': "#25D899",  # OpenAI Teal
@@ -19,93 +42,117 @@ llm_colors = {
 # Define root directory of your results
 base_dir = 'Results'
 
-def load_data(models):
-    all_records = []
+def load_data(models, use_cache=True, justifications=True, relabel=False):
+    """
+    One row per smell of every result file of the given LLMs. LLM, Category, File and Rule_ID
+    are categoricals; justifications=False leaves out the Justification strings, which is
+    all the metrics and plots need. relabel=True takes Actual from the current Data/ label
+    files instead of the value stored in the result files (see apply_ground_truth()).
+    """
+    frames = []
+    columns = ['Category', 'File', 'Rule_ID', 'Actual', 'Detected'] + (['Justification'] if justifications else [])
+    # A name given twice (e.g. on --models) is loaded once: Categorical.from_codes needs unique categories
+    models = list(dict.fromkeys(models))
 
-    for llm in models:
+    for index, llm in enumerate(models):
         llm_path = os.path.join(base_dir, llm.split()[0]) # We use split()[0] to get LLM first name only
         
         if not os.path.exists(llm_path):
             print(f"Warning: Path not found for {llm}")
             continue
-            
-        # Walk through the directory structure
-        for root, _, files in os.walk(llm_path):
-            for file in files:
-                if file.endswith(".json"):
-                    full_path = os.path.join(root, file)
-                    
-                    # Determine the category based on folder structure
-                    # Ex: Results/Gemini/Synthetic/Single: Synthetic -> Single
-                    rel_path = os.path.relpath(root, llm_path)
-                    category = rel_path.replace(os.path.sep, " -> ")
-                    if category == ".": category = "Uncategorized"
-
-                    try:
-                        with open(full_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            
-                            # Extract specific smell results
-                            for smell in data.get('smell_analysis', []):
-                                record = {
-                                    'LLM': llm,
-                                    'Category': category,
-                                    'File': data.get('file_name'),
-                                    'Rule_ID': smell.get('rule_id'),
-                                    'Actual': smell.get('actual'),
-                                    'Detected': smell.get('detected'),
-                                    'Justification': smell.get('justification')
-                                }
-                                all_records.append(record)
-                    except Exception as e:
-                        print(f"Error reading {full_path}: {e}")
-
-    return pd.DataFrame(all_records)
+
+        # Per-smell records of every result file under llm_path. Only new or changed files are
+        # parsed, the rest comes from the Parquet cache in .cache/results (see results_store.py)
+        # Ex: Results/Gemini/Synthetic/Single/*.json -> Category "Synthetic -> Single"
+        records = ResultsStore(llm_path, cache_dir=RESULTS_CACHE_DIR if use_cache else None).load(columns)
+        records.insert(0, 'LLM', pd.Categorical.from_codes([index] * len(records), categories=list(models)))
+        frames.append(records)
+
+    if not frames:
+        return pd.DataFrame()
+    df = concat_categorical(frames)
+    df['LLM'] = df['LLM'].cat.remove_unused_categories()
+    return apply_ground_truth(df) if relabel else df
+
+
+def apply_ground_truth(df, index=None, verbose=True):
+    """
+    Sets Actual from the current ground truth labels (Data/<category>/<file>.txt) and keeps
+    the value stored in the result files as Stored_Actual, so a corrected label file does not
+    need the result files to be regenerated. Actual is missing (NA) for files without a label
+    file. Prints the records whose label changed; relabeled_records() returns them.
+    """
+    # An index without any label file is falsy (len 0), so it is tested against None
+    index = ground_truth.get_index() if index is None else index
+    positives = [(category, file, rule_id) for (category, file), labels in index.items() for rule_id in labels]
+    labeled_files = [key for key, _ in index.items()]
+
+    # Label file keys use the Data/ folder form, e.g. "Synthetic/Single" for "Synthetic -> Single"
+    category = df['Category'].map(ground_truth.category_key).astype(str)
+    present = pd.MultiIndex.from_arrays([category, df['File'].astype(str), df['Rule_ID'].astype(str)]).isin(positives)
+    labeled = pd.MultiIndex.from_arrays([category, df['File'].astype(str)]).isin(labeled_files)
+
+    df = df.copy()
+    df['Stored_Actual'] = df['Actual']
+    if labeled.all():
+        df['Actual'] = present
+    else:
+        df['Actual'] = pd.array(present, dtype='boolean')
+        df.loc[~labeled, 'Actual'] = pd.NA
+
+    if verbose:
+        changed = relabeled_records(df)
+        print(f"Ground truth: {len(changed)} of {len(df)} records changed label")
+        for (cat, file), group in changed.groupby(['Category', 'File'], observed=True, sort=False):
+            gained = sorted(group.loc[group['Actual'].fillna(False).astype(bool), 'Rule_ID'].astype(str).unique())
+            lost = sorted(group.loc[group['Stored_Actual'].fillna(False).astype(bool), 'Rule_ID'].astype(str).unique())
+            missing = " (no label file)" if group['Actual'].isna().any() else ""
+            print(f"  {cat}/{file}: +{','.join(gained) or '-'} -{','.join(lost) or '-'}{missing}")
+    return df
+
+
+def relabeled_records(df):
+    """Rows of an apply_ground_truth() df whose Actual differs from the label stored in the result file."""
+    actual, stored = df['Actual'].astype('boolean'), df['Stored_Actual'].astype('boolean')
+    changed = (actual != stored).fillna(actual.isna() != stored.isna())
+    return df[changed.to_numpy(dtype=bool)]
 
 
 def calculate_metrics(df, grouping_col=None):
     """
     Calculates Accuracy, Precision, Recall, and F1 for given data.
     """
-    results = []
-    
-    # Identify unique groups (e.g., unique LLMs)
-    groups = df[grouping_col].unique() if grouping_col else [None]
-    
-    for group in groups:
-        subset = df[df[grouping_col] == group] if group else df
-        
-        y_true = subset['Actual'].astype(int)
-        y_pred = subset['Detected'].astype(int)
-        
-        metrics = {
-            'Accuracy': accuracy_score(y_true, y_pred),
-            'Precision': precision_score(y_true, y_pred, zero_division=0),
-            'Recall': recall_score(y_true, y_pred, zero_division=0),
-            'F1-Score': f1_score(y_true, y_pred, zero_division=0),
-            'Sample Size': len(subset)
-        }
-        
-        if grouping_col:
-            metrics[grouping_col] = group
-            
-        results.append(metrics)
-        
-    return pd.DataFrame(results)
+    return metrics_from_counts(metrics.counts_for(df), grouping_col)
+
+
+def metrics_from_counts(counts, grouping_col=None):
+    """
+    calculate_metrics() from a metrics.confusion_counts() table (or a filtered part of it)
+    instead of the raw rows.
+    """
+    keys = [grouping_col] if grouping_col else []
+    return metrics.summarize(counts, keys)[['Accuracy', 'Precision', 'Recall', 'F1-Score', 'Sample Size'] + keys]
 
 
 def plot_confusion_matrix_per_llm(df, title_prefix="Overall"):
     """
     Plots a row of confusion matrices, one for each LLM.
     """
-    llms = df['LLM'].unique()
-    _, axes = plt.subplots(1, len(llms), figsize=(4.5 * len(llms), 4))
+    plot_confusion_matrices(metrics.counts_for(df), title_prefix)
+
+
+def plot_confusion_matrices(counts, title_prefix="Overall"):
+    """plot_confusion_matrix_per_llm() from a metrics.confusion_counts() table."""
+    plotting()
+    per_llm = metrics.rollup(counts, ['LLM'])
+    _, axes = plt.subplots(1, len(per_llm), figsize=(4.5 * len(per_llm), 4))
     
-    if len(llms) == 1: axes = [axes] # Handle single case
+    if len(per_llm) == 1: axes = [axes] # Handle single case
+
+    # Rows: Present / Not Present, columns: Detected / Not Detected
+    matrices = per_llm[['TP', 'FN', 'FP', 'TN']].to_numpy().reshape(-1, 2, 2)
 
-    for ax, llm in zip(axes, llms):
-        subset = df[df['LLM'] == llm]
-        cm = confusion_matrix(subset['Actual'], subset['Detected'], labels=[True, False])
+    for ax, llm, cm in zip(axes, per_llm['LLM'], matrices):
         
         sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax, 
                     xticklabels=['Detected', 'Not Detected'], 
@@ -125,6 +172,7 @@ def plot_benchmark_bars(metrics_df, title):
     """
     Plots a grouped bar chart comparing LLMs across metrics.
     """
+    plotting()
     # Melt the dataframe for Seaborn plotting
     melted = metrics_df.melt(id_vars=['LLM'], 
                              value_vars=['Accuracy', 'Precision', 'Recall', 'F1-Score'], 
@@ -156,34 +204,38 @@ def plot_benchmark_bars(metrics_df, title):
 
 
 def plot_custom_aggregates(df, custom_aggregates):
+    counts = metrics.counts_for(df)
+
     for group_name, target_categories in custom_aggregates.items():
         print(" ")
         print(f"--- Analysis for {group_name} ---")
         print(" ")
     
-        # Filter the main dataframe for only the categories in this group
-        group_df = df[df['Category'].isin(target_categories)]
+        # Filter the counts for only the categories in this group
+        group_counts = counts[counts['Category'].isin(target_categories)]
     
-        if group_df.empty:
+        if group_counts.empty:
             print(f"No data found for {group_name}. Check category names.")
             continue
         
         # 1. Calculate Metrics
-        group_metrics = calculate_metrics(group_df, grouping_col='LLM')
+        group_metrics = metrics_from_counts(group_counts, grouping_col='LLM')
         display(group_metrics)
     
         # 2. Plot Bar Chart
         plot_benchmark_bars(group_metrics, f"Performance: {group_name}")
     
         # 3. Plot Confusion Matrices
-        plot_confusion_matrix_per_llm(group_df, title_prefix=group_name)
+        plot_confusion_matrices(group_counts, title_prefix=group_name)
         # Force a blank space after the plot
         display(HTML("<br>"))
 
 
 def plot_per_category(df, target_order):
+    counts = metrics.counts_for(df)
+
     # Get list of what actually exists in the data (to avoid errors if a folder is empty)
-    available_categories = set(df['Category'].unique())
+    available_categories = set(counts['Category'].unique())
 
     for cat in target_order:
         # Skip if this category isn't in your loaded data
@@ -195,39 +247,32 @@ def plot_per_category(df, target_order):
         print(f"--- Analysis for {cat} ---")
         print(" ")
     
-        # Filter data for this category
-        cat_df = df[df['Category'] == cat]
+        # Filter counts for this category
+        cat_counts = counts[counts['Category'] == cat]
     
         # Calculate Metrics
-        cat_metrics = calculate_metrics(cat_df, grouping_col='LLM')
+        cat_metrics = metrics_from_counts(cat_counts, grouping_col='LLM')
         display(cat_metrics)
     
         # Plot Bar Chart
         plot_benchmark_bars(cat_metrics, f"Performance: {cat}")
     
         # Plot Confusion Matrix
-        plot_confusion_matrix_per_llm(cat_df, title_prefix=cat)
+        plot_confusion_matrices(cat_counts, title_prefix=cat)
         # Force a blank space after the plot
         display(HTML("<br>"))
 
 
 
 def plot_hardest_smells(df):
-    # Calculate Recall per Rule per LLM
-    rule_metrics_list = []
-    unique_rules = sorted(df['Rule_ID'].unique())
-
-    for rule in unique_rules:
-        subset = df[df['Rule_ID'] == rule]
-        # We only care about rules that actually existed (Actual=True) to calculate Recall
-        if subset['Actual'].sum() > 0: 
-            m = calculate_metrics(subset, grouping_col='LLM')
-            m['Rule_ID'] = rule
-            rule_metrics_list.append(m)
-
-    if rule_metrics_list:
-        rule_df = pd.concat(rule_metrics_list)
-    
+    plotting()
+    # Recall per Rule per LLM, only for rules that actually existed (Actual=True) somewhere
+    counts = metrics.counts_for(df)
+    rule_df = metrics.summarize(counts, ['Rule_ID', 'LLM'])
+    positives = rule_df.groupby('Rule_ID')[['TP', 'FN']].transform('sum').sum(axis=1)
+    rule_df = rule_df[positives > 0]
+
+    if not rule_df.empty:
         # Create Pivot Table for Heatmap
         heatmap_data = rule_df.pivot(index='Rule_ID', columns='LLM', values='Recall')
     
@@ -247,12 +292,12 @@ def plot_hardest_smells(df):
 
 
 def plot_hallucinations(df):
-    # 1. Filter for False Positives (Actual=False, Detected=True)
-    fp_df = df[(df['Actual'] == False) & (df['Detected'] == True)]
+    plotting()
+    # 1. False Positives (Actual=False, Detected=True) per LLM
+    per_llm = metrics.rollup(metrics.counts_for(df), ['LLM'])
 
-    # 2. Count occurrences per LLM
-    # We reindex to ensure all LLMs show up even if they have 0 hallucinations
-    fp_counts = fp_df['LLM'].value_counts().reindex(fp_df['LLM'].unique(), fill_value=0).reset_index()
+    # 2. Keep the LLMs that have hallucinations, in order of appearance
+    fp_counts = per_llm.loc[per_llm['FP'] > 0, ['LLM', 'FP']].reset_index(drop=True)
     fp_counts.columns = ['LLM', 'False_Positives']
 
     # 3. Plot
@@ -285,19 +330,19 @@ def plot_hallucinations(df):
 
 
 def plot_paranoia_heatmap(df):
+    plotting()
     # 1. DATA PREPARATION
     # We need to look at cases where the smell was NOT actually present (Actual = False)
-    negatives_df = df[df['Actual'] == False]
+    rule_df = metrics.summarize(metrics.counts_for(df), ['Rule_ID', 'LLM'])
+    negatives_df = rule_df[rule_df['FP'] + rule_df['TN'] > 0]
 
     if not negatives_df.empty:
-        # Calculate FPR: Mean of 'Detected' on negative samples.
-        # If Actual is False, and Detected is True (1), mean goes up. 
-        # If Detected is False (0), mean stays 0.
+        # FPR = False Positives / Total Negatives per rule and LLM
         fpr_data = negatives_df.pivot_table(
             index='Rule_ID', 
             columns='LLM', 
-            values='Detected', 
-            aggfunc='mean'  # This calculates False Positives / Total Negatives
+            values='FPR', 
+            aggfunc='sum'  # One row per (Rule_ID, LLM), so this only reshapes
         )
 
         # 2. PLOTTING
@@ -330,18 +375,21 @@ def plot_paranoia_heatmap(df):
 
 
 def plot_strategy_map(df, custom_aggregates):
+    plotting()
+    counts = metrics.counts_for(df)
+
     for group_name, target_categories in custom_aggregates.items():
         print(" ")
         
-        # Filter the main dataframe for only the categories in this group
-        group_df = df[df['Category'].isin(target_categories)]
+        # Filter the counts for only the categories in this group
+        group_counts = counts[counts['Category'].isin(target_categories)]
     
-        if group_df.empty:
+        if group_counts.empty:
             print(f"No data found for {group_name}. Check category names.")
             continue   
      
         # 1. Calculate Overall Metrics
-        strategy_metrics = calculate_metrics(group_df, grouping_col='LLM')
+        strategy_metrics = metrics_from_counts(group_counts, grouping_col='LLM')
 
         # 2. PLOTTING
         plt.figure(figsize=(10, 8))
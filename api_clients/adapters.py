@@ -0,0 +1,334 @@
+import json
+import base64
+from datetime import datetime
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urlunsplit
+
+# ==========================================
+# Request/response shapes of the provider APIs
+# ==========================================
+# Plain HTTP versions of the calls in the *.ipynb notebooks next to this file, so every
+# provider can be driven from one asyncio client (and pointed at a local stub server).
+# With a schema (validation.response_schema()) every request also asks for the API's
+# structured output: a JSON schema format, a forced tool call or a responseSchema.
+
+SCHEMA_NAME = "smell_analysis"
+
+
+@dataclass(frozen=True)
+class Attachment:
+    name: str           # file name shown to the model, e.g. "Autorent.pdf"
+    mime_type: str      # "application/pdf", "image/png", ...
+    data: bytes
+
+    def b64(self):
+        return base64.b64encode(self.data).decode("ascii")
+
+    @property
+    def is_text(self):
+        return self.mime_type == "text/plain"
+
+    def text(self):
+        return self.data.decode("utf-8")
+
+
+@dataclass(frozen=True)
+class FileRef:
+    """A file uploaded once through the provider's file API, referenced by id instead of sent inline."""
+    name: str
+    mime_type: str
+    file_id: str
+    uri: str = ""       # Gemini references files by URI
+
+    is_text = False
+
+
+def endpoint(provider, path, base_url=None, from_root=False):
+    """
+    Full URL for an API path. base_url only replaces scheme and host, so a local stub
+    server serves the same paths (/v1/messages, /v1beta/models/...) as the real API.
+    from_root puts path right after the host instead of after provider.base_url.
+    """
+    if from_root:
+        parts = urlsplit(provider.base_url)
+        url = urlunsplit((parts.scheme, parts.netloc, path, "", ""))
+    else:
+        url = provider.base_url.rstrip("/") + path
+    if not base_url:
+        return url
+    override = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((override.scheme, override.netloc, parts.path, parts.query, parts.fragment))
+
+
+def without_keywords(schema, keywords):
+    """Copy of a JSON Schema without the given keywords, at every level."""
+    if isinstance(schema, dict):
+        return {key: without_keywords(value, keywords) for key, value in schema.items() if key not in keywords}
+    if isinstance(schema, list):
+        return [without_keywords(value, keywords) for value in schema]
+    return schema
+
+
+def gemini_schema(schema):
+    """
+    A JSON Schema in the OpenAPI subset of Gemini's responseSchema: upper-case types,
+    propertyOrdering (so "detected" stays the second key) and no additionalProperties/minLength.
+    """
+    result = {}
+    for key, value in schema.items():
+        if key in ("additionalProperties", "minLength"):
+            continue
+        if key == "type":
+            value = value.upper()
+        elif key == "properties":
+            value = {name: gemini_schema(prop) for name, prop in value.items()}
+            result["propertyOrdering"] = list(value)
+        elif key == "items":
+            value = gemini_schema(value)
+        result[key] = value
+    return result
+
+
+def parse_time(value):
+    """Epoch seconds of an RFC 3339 timestamp ("2025-12-11T15:32:50.123Z"), None for None."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class OpenAIResponses:
+    """OpenAI Responses API (client.responses.create) and Files API."""
+
+    supports_files = True
+
+    def request(self, provider, api_key, prompt, attachments, base_url=None, schema=None):
+        content = []
+        for a in attachments:
+            if isinstance(a, FileRef):
+                content.append({"type": "input_file", "file_id": a.file_id})
+            elif a.is_text:
+                content.append({"type": "input_text", "text": a.text()})
+            elif a.mime_type.startswith("image/"):
+                content.append({"type": "input_image", "image_url": f"data:{a.mime_type};base64,{a.b64()}"})
+            else:
+                content.append({"type": "input_file", "filename": a.name, "file_data": f"data:{a.mime_type};base64,{a.b64()}"})
+        content.append({"type": "input_text", "text": prompt})
+
+        body = {
+            "model": provider.api_model,
+            "input": [{"role": "user", "content": content}],
+            "max_output_tokens": provider.max_tokens,
+            "store": False,
+        }
+        if schema is not None:
+            # Strict mode does not support minLength; empty strings are still caught by the validator
+            body["text"] = {"format": {"type": "json_schema", "name": SCHEMA_NAME, "strict": True,
+                                       "schema": without_keywords(schema, ("minLength",))}}
+        headers = {"Authorization": f"Bearer {api_key}"}
+        return endpoint(provider, "/responses", base_url), headers, body
+
+    def stream_request(self, provider, api_key, prompt, attachments, base_url=None, schema=None):
+        """request() as a server-sent event stream."""
+        url, headers, body = self.request(provider, api_key, prompt, attachments, base_url, schema)
+        return url, headers, {**body, "stream": True}
+
+    def stream_text(self, event):
+        """Text delta of one parsed stream event ("" for events without text)."""
+        return event.get("delta", "") if event.get("type") == "response.output_text.delta" else ""
+
+    def upload_request(self, provider, api_key, attachment, base_url=None):
+        """(url, headers, httpx request kwargs) of a file upload."""
+        headers = {"Authorization": f"Bearer {api_key}"}
+        kwargs = {"files": {"file": (attachment.name, attachment.data, attachment.mime_type)}, "data": {"purpose": "user_data"}}
+        return endpoint(provider, "/files", base_url), headers, kwargs
+
+    def upload_result(self, payload):
+        """(file_id, uri, expires_at epoch or None) from an upload response."""
+        return payload["id"], "", payload.get("expires_at")
+
+    def usage(self, payload):
+        """Input plus output tokens the API counted for a reply, None when it does not say."""
+        usage = payload.get("usage") or {}
+        return usage["input_tokens"] + usage["output_tokens"] if "input_tokens" in usage else None
+
+    def response_text(self, payload):
+        return "".join(
+            part.get("text", "")
+            for item in payload.get("output", []) if item.get("type") == "message"
+            for part in item.get("content", []) if part.get("type") == "output_text"
+        )
+
+
+class AnthropicMessages:
+    """Anthropic Messages API (client.messages.create) and Files API (beta)."""
+
+    supports_files = True
+    files_beta = "files-api-2025-04-14"
+
+    def request(self, provider, api_key, prompt, attachments, base_url=None, schema=None):
+        content = []
+        for a in attachments:
+            if isinstance(a, FileRef):
+                content.append({"type": "document", "source": {"type": "file", "file_id": a.file_id}})
+                continue
+            if a.is_text:
+                content.append({"type": "text", "text": a.text()})
+                continue
+            block_type = "image" if a.mime_type.startswith("image/") else "document"
+            content.append({"type": block_type, "source": {"type": "base64", "media_type": a.mime_type, "data": a.b64()}})
+        content.append({"type": "text", "text": prompt})
+
+        body = {
+            "model": provider.api_model,
+            "max_tokens": provider.max_tokens,
+            "messages": [{"role": "user", "content": content}],
+        }
+        if schema is not None:
+            # A forced tool call: its input is generated against input_schema
+            body["tools"] = [{"name": SCHEMA_NAME, "description": "Records the smell analysis of the diagram.",
+                              "input_schema": schema}]
+            body["tool_choice"] = {"type": "tool", "name": SCHEMA_NAME}
+        headers = {"x-api-key": api_key, "anthropic-version": "2023-06-01"}
+        if any(isinstance(a, FileRef) for a in attachments):
+            headers["anthropic-beta"] = self.files_beta
+        return endpoint(provider, "/messages", base_url), headers, body
+
+    def stream_request(self, provider, api_key, prompt, attachments, base_url=None, schema=None):
+        url, headers, body = self.request(provider, api_key, prompt, attachments, base_url, schema)
+        return url, headers, {**body, "stream": True}
+
+    def stream_text(self, event):
+        if event.get("type") != "content_block_delta":
+            return ""
+        delta = event.get("delta", {})
+        # Tool input arrives as partial JSON
+        return delta.get("text") or delta.get("partial_json", "")
+
+    def upload_request(self, provider, api_key, attachment, base_url=None):
+        headers = {"x-api-key": api_key, "anthropic-version": "2023-06-01", "anthropic-beta": self.files_beta}
+        kwargs = {"files": {"file": (attachment.name, attachment.data, attachment.mime_type)}}
+        return endpoint(provider, "/files", base_url), headers, kwargs
+
+    def upload_result(self, payload):
+        return payload["id"], "", None
+
+    def usage(self, payload):
+        usage = payload.get("usage") or {}
+        return usage["input_tokens"] + usage.get("output_tokens", 0) if "input_tokens" in usage else None
+
+    def response_text(self, payload):
+        for block in payload.get("content", []):
+            if block.get("type") == "tool_use":
+                return json.dumps(block.get("input"), ensure_ascii=False)
+        return "".join(block.get("text", "") for block in payload.get("content", []) if block.get("type") == "text")
+
+
+class GeminiGenerate:
+    """Gemini generateContent (model.generate_content) and File API (files expire after 48h)."""
+
+    supports_files = True
+
+    def request(self, provider, api_key, prompt, attachments, base_url=None, schema=None):
+        parts = []
+        for a in attachments:
+            if isinstance(a, FileRef):
+                parts.append({"file_data": {"mime_type": a.mime_type, "file_uri": a.uri}})
+            elif a.is_text:
+                parts.append({"text": a.text()})
+            else:
+                parts.append({"inline_data": {"mime_type": a.mime_type, "data": a.b64()}})
+        parts.append({"text": prompt})
+
+        body = {
+            "contents": [{"role": "user", "parts": parts}],
+            "generationConfig": {"maxOutputTokens": provider.max_tokens},
+        }
+        if schema is not None:
+            body["generationConfig"].update(responseMimeType="application/json", responseSchema=gemini_schema(schema))
+        headers = {"x-goog-api-key": api_key}
+        return endpoint(provider, f"/models/{provider.api_model}:generateContent", base_url), headers, body
+
+    def stream_request(self, provider, api_key, prompt, attachments, base_url=None, schema=None):
+        url, headers, body = self.request(provider, api_key, prompt, attachments, base_url, schema)
+        return url.replace(":generateContent", ":streamGenerateContent") + "?alt=sse", headers, body
+
+    def stream_text(self, event):
+        # Every event is a partial generateContent response
+        return self.response_text(event)
+
+    def upload_request(self, provider, api_key, attachment, base_url=None):
+        # Simple media upload: raw bytes in the body, the API names the file
+        version = urlsplit(provider.base_url).path.strip("/")
+        url = endpoint(provider, f"/upload/{version}/files", base_url, from_root=True) + "?uploadType=media"
+        headers = {"x-goog-api-key": api_key, "Content-Type": attachment.mime_type}
+        return url, headers, {"content": attachment.data}
+
+    def upload_result(self, payload):
+        file = payload["file"]
+        return file["name"], file["uri"], parse_time(file.get("expirationTime"))
+
+    def usage(self, payload):
+        return (payload.get("usageMetadata") or {}).get("totalTokenCount")
+
+    def response_text(self, payload):
+        candidates = payload.get("candidates") or [{}]
+        return "".join(part.get("text", "") for part in candidates[0].get("content", {}).get("parts", []))
+
+
+class ChatCompletions:
+    """OpenAI-compatible chat/completions, used by Grok and DeepSeek."""
+
+    supports_files = False
+
+    def request(self, provider, api_key, prompt, attachments, base_url=None, schema=None):
+        content = []
+        for a in attachments:
+            if a.is_text:
+                content.append({"type": "text", "text": a.text()})
+            elif a.mime_type.startswith("image/"):
+                content.append({"type": "image_url", "image_url": {"url": f"data:{a.mime_type};base64,{a.b64()}"}})
+            else:
+                content.append({"type": "file", "file": {"filename": a.name, "file_data": f"data:{a.mime_type};base64,{a.b64()}"}})
+        content.append({"type": "text", "text": prompt})
+
+        body = {
+            "model": provider.api_model,
+            "messages": [{"role": "user", "content": content}],
+            "max_tokens": provider.max_tokens,
+        }
+        if schema is not None:
+            body["response_format"] = {"type": "json_schema", "json_schema": {
+                "name": SCHEMA_NAME, "strict": True, "schema": without_keywords(schema, ("minLength",))}}
+        headers = {"Authorization": f"Bearer {api_key}"}
+        return endpoint(provider, "/chat/completions", base_url), headers, body
+
+    def stream_request(self, provider, api_key, prompt, attachments, base_url=None, schema=None):
+        url, headers, body = self.request(provider, api_key, prompt, attachments, base_url, schema)
+        return url, headers, {**body, "stream": True}
+
+    def stream_text(self, event):
+        choices = event.get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content") or ""
+
+    def usage(self, payload):
+        return (payload.get("usage") or {}).get("total_tokens")
+
+    def response_text(self, payload):
+        choices = payload.get("choices") or [{}]
+        return choices[0].get("message", {}).get("content") or ""
+
+
+ADAPTERS = {
+    "openai_responses": OpenAIResponses(),
+    "anthropic_messages": AnthropicMessages(),
+    "gemini_generate": GeminiGenerate(),
+    "chat_completions": ChatCompletions(),
+}
+
+
+def get_adapter(provider):
+    try:
+        return ADAPTERS[provider.api]
+    except KeyError:
+        raise ValueError(f"Provider '{provider.key}' has no API adapter (api='{provider.api}').") from None
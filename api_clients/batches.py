@@ -0,0 +1,207 @@
+import json
+from urllib.parse import urlsplit, urlunsplit
+
+from api_clients.adapters import endpoint
+
+# ==========================================
+# Batch job formats of the provider APIs
+# ==========================================
+# Every API takes a list of (custom_id, url, headers, body) requests, built by the same
+# adapters.py request() as a single call, and answers each one with the same response body
+# a single call gets, at about half the price and without a connection held open per call.
+#   OpenAI:    JSONL file (purpose "batch") + POST /v1/batches, results in the output/error files
+#   Anthropic: POST /v1/messages/batches, results as JSONL from results_url
+#   Gemini:    POST models/<model>:batchGenerateContent with inlined requests, results in the operation
+
+
+class BatchError(Exception):
+    """Raised when a batch cannot be submitted, or its status or results cannot be read."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def transient(self):
+        """Rate limits and server errors pass; a batch the API refuses to show (4xx) stays refused."""
+        return self.status_code == 429 or (self.status_code or 0) >= 500
+
+
+# A result line or item that is not in the API's shape; its job then counts as missing from the results
+UNREADABLE = (ValueError, KeyError, TypeError, AttributeError)
+
+
+def check(response, action):
+    if response.status_code not in (200, 201):
+        raise BatchError(f"Error: {action} returned HTTP {response.status_code}. {response.text[:200]}", response.status_code)
+    return response
+
+
+def same_host(url, base_url):
+    """url with scheme and host of base_url (a stub server), like adapters.endpoint()."""
+    if not base_url:
+        return url
+    override, parts = urlsplit(base_url), urlsplit(url)
+    return urlunsplit((override.scheme, override.netloc, parts.path, parts.query, parts.fragment))
+
+
+class OpenAIBatch:
+    max_requests = 50000
+    max_bytes = 200 * 1024 * 1024   # input file size limit
+    completion_window = "24h"
+
+    def headers(self, api_key):
+        return {"Authorization": f"Bearer {api_key}"}
+
+    async def submit(self, client, provider, api_key, requests, base_url=None):
+        """Uploads the requests as a JSONL input file and creates the batch. Returns the batch id."""
+        lines = "".join(json.dumps({"custom_id": custom_id, "method": "POST", "url": urlsplit(url).path, "body": body}) + "\n"
+                        for custom_id, url, _, body in requests)
+        response = check(await client.post(endpoint(provider, "/files", base_url), headers=self.headers(api_key),
+                                           files={"file": ("batch.jsonl", lines.encode("utf-8"), "application/jsonl")},
+                                           data={"purpose": "batch"}), "Batch input upload")
+        body = {"input_file_id": response.json()["id"], "endpoint": urlsplit(requests[0][1]).path,
+                "completion_window": self.completion_window}
+        response = check(await client.post(endpoint(provider, "/batches", base_url), headers=self.headers(api_key), json=body),
+                         "Batch creation")
+        return response.json()["id"]
+
+    async def status(self, client, provider, api_key, batch_id, base_url=None):
+        """(whether the batch has ended, batch object)."""
+        response = check(await client.get(endpoint(provider, f"/batches/{batch_id}", base_url), headers=self.headers(api_key)),
+                         "Batch status")
+        batch = response.json()
+        return batch["status"] in ("completed", "failed", "expired", "cancelled"), batch
+
+    def progress(self, batch):
+        counts = batch.get("request_counts") or {}
+        return f"{batch['status']}, {counts.get('completed', 0)}/{counts.get('total', 0)} done, {counts.get('failed', 0)} failed"
+
+    async def results(self, client, provider, api_key, batch, base_url=None):
+        """Yields (custom_id, response body or None, error message or None), streamed from the output and error files."""
+        for key in ("output_file_id", "error_file_id"):
+            if not batch.get(key):
+                continue
+            url = endpoint(provider, f"/files/{batch[key]}/content", base_url)
+            async with client.stream("GET", url, headers=self.headers(api_key)) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    check(response, "Batch results download")
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    try:
+                        result = self.result(json.loads(line))
+                    except UNREADABLE:
+                        continue
+                    yield result
+
+    def result(self, item):
+        reply = item.get("response") or {}
+        if item.get("error") or reply.get("status_code") != 200:
+            return item["custom_id"], None, json.dumps(item.get("error") or reply.get("body"))[:200]
+        return item["custom_id"], reply["body"], None
+
+
+class AnthropicBatch:
+    max_requests = 100000
+    max_bytes = 256 * 1024 * 1024
+
+    def headers(self, api_key, requests=()):
+        headers = {"x-api-key": api_key, "anthropic-version": "2023-06-01"}
+        # The files beta header of requests with uploaded files applies to the whole batch
+        betas = {beta for _, _, request_headers, _ in requests if (beta := request_headers.get("anthropic-beta"))}
+        if betas:
+            headers["anthropic-beta"] = ",".join(sorted(betas))
+        return headers
+
+    async def submit(self, client, provider, api_key, requests, base_url=None):
+        body = {"requests": [{"custom_id": custom_id, "params": params} for custom_id, _, _, params in requests]}
+        response = check(await client.post(endpoint(provider, "/messages/batches", base_url),
+                                           headers=self.headers(api_key, requests), json=body), "Batch creation")
+        return response.json()["id"]
+
+    async def status(self, client, provider, api_key, batch_id, base_url=None):
+        response = check(await client.get(endpoint(provider, f"/messages/batches/{batch_id}", base_url),
+                                          headers=self.headers(api_key)), "Batch status")
+        batch = response.json()
+        return batch["processing_status"] == "ended", batch
+
+    def progress(self, batch):
+        counts = batch.get("request_counts") or {}
+        return f"{batch['processing_status']}, " + ", ".join(f"{count} {name}" for name, count in counts.items() if count)
+
+    async def results(self, client, provider, api_key, batch, base_url=None):
+        async with client.stream("GET", same_host(batch["results_url"], base_url), headers=self.headers(api_key)) as response:
+            if response.status_code != 200:
+                await response.aread()
+                check(response, "Batch results download")
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    result = self.result(json.loads(line))
+                except UNREADABLE:
+                    continue
+                yield result
+
+    def result(self, item):
+        result = item["result"]
+        if result["type"] == "succeeded":
+            return item["custom_id"], result["message"], None
+        return item["custom_id"], None, f"{result['type']}: {json.dumps(result.get('error'))[:200]}"
+
+
+class GeminiBatch:
+    max_requests = 100000
+    max_bytes = 20 * 1024 * 1024    # inlined requests; larger sweeps should use --upload-files
+
+    def headers(self, api_key):
+        return {"x-goog-api-key": api_key}
+
+    async def submit(self, client, provider, api_key, requests, base_url=None):
+        body = {"batch": {"display_name": "smell-sweep", "input_config": {"requests": {"requests": [
+            {"request": request, "metadata": {"key": custom_id}} for custom_id, _, _, request in requests]}}}}
+        url = endpoint(provider, f"/models/{provider.api_model}:batchGenerateContent", base_url)
+        response = check(await client.post(url, headers=self.headers(api_key), json=body), "Batch creation")
+        return response.json()["name"].split("/")[-1]
+
+    async def status(self, client, provider, api_key, batch_id, base_url=None):
+        response = check(await client.get(endpoint(provider, f"/batches/{batch_id}", base_url), headers=self.headers(api_key)),
+                         "Batch status")
+        operation = response.json()
+        state = operation.get("metadata", {}).get("state", "")
+        return operation.get("done", False) or state in ("BATCH_STATE_SUCCEEDED", "BATCH_STATE_FAILED",
+                                                         "BATCH_STATE_CANCELLED", "BATCH_STATE_EXPIRED"), operation
+
+    def progress(self, operation):
+        return operation.get("metadata", {}).get("state", "unknown state")
+
+    async def results(self, client, provider, api_key, operation, base_url=None):
+        output = operation.get("response") or operation.get("metadata", {}).get("output") or {}
+        for item in output.get("inlinedResponses", {}).get("inlinedResponses", []):
+            try:
+                result = self.result(item)
+            except UNREADABLE:
+                continue
+            yield result
+
+    def result(self, item):
+        custom_id = item.get("metadata", {}).get("key")
+        if "response" in item:
+            return custom_id, item["response"], None
+        return custom_id, None, json.dumps(item.get("error"))[:200]
+
+
+BATCH_APIS = {
+    "openai_responses": OpenAIBatch(),
+    "anthropic_messages": AnthropicBatch(),
+    "gemini_generate": GeminiBatch(),
+}
+
+
+def get_batch_api(provider):
+    try:
+        return BATCH_APIS[provider.api]
+    except KeyError:
+        raise ValueError(f"Provider '{provider.key}' has no batch API (api='{provider.api}').") from None
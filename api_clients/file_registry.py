@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from pathlib import Path
+
+from api_clients.adapters import FileRef, get_adapter
+
+# ==========================================
+# CONFIG: upload-once registry for the providers' file APIs
+# ==========================================
+
+REGISTRY_PATH = Path(__file__).resolve().parent.parent / ".cache" / "file_registry.json"
+
+# Re-upload when a file expires within this many seconds; a request can run for minutes
+EXPIRY_MARGIN = 60 * 60
+
+
+class UploadError(Exception):
+    """Raised when a provider rejects a file upload."""
+
+
+class StaleFileError(Exception):
+    """Raised when the API no longer knows a registered file id (deleted or expired early)."""
+
+
+class FileRegistry:
+    """
+    Remembers which PDFs were uploaded to which provider, as
+    {provider key: {sha256 of the file: {"file_id", "uri", "expires_at", "uploaded_at"}}}
+    persisted to REGISTRY_PATH. Each file is uploaded at most once per provider; expired
+    entries (and entries the API no longer knows, see forget()) are uploaded again.
+    """
+
+    def __init__(self, path=REGISTRY_PATH, scope=""):
+        self.path = Path(path) if path else None
+        # Uploads to a stub server must not be mixed up with the real API's file ids
+        self.scope = scope
+        self.uploads = 0
+        self.reuses = 0
+        self.uploaded_bytes = 0
+        self._entries = {}
+        self._locks = {}
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._entries = {}
+
+    def _save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _bucket(self, provider):
+        return f"{self.scope}|{provider.key}" if self.scope else provider.key
+
+    def lookup(self, provider, sha):
+        """Registered, not (nearly) expired entry for a file, or None."""
+        entry = self._entries.get(self._bucket(provider), {}).get(sha)
+        if entry and entry.get("expires_at") and entry["expires_at"] - EXPIRY_MARGIN <= time.time():
+            return None
+        return entry
+
+    def forget(self, provider, sha):
+        """Drops an entry, e.g. after the API answered that the file id is unknown."""
+        if self._entries.get(self._bucket(provider), {}).pop(sha, None) is not None:
+            self._save()
+
+    async def ensure(self, client, provider, attachment, api_key, base_url=None):
+        """Returns a FileRef for attachment, uploading it first if this provider does not have it yet."""
+        sha = hashlib.sha256(attachment.data).hexdigest()
+        lock = self._locks.setdefault((provider.key, sha), asyncio.Lock())
+        async with lock:
+            entry = self.lookup(provider, sha)
+            if entry is None:
+                entry = await self.upload(client, provider, attachment, api_key, base_url)
+                self._entries.setdefault(self._bucket(provider), {})[sha] = entry
+                self._save()
+                self.uploads += 1
+                self.uploaded_bytes += len(attachment.data)
+            else:
+                self.reuses += 1
+        return FileRef(attachment.name, attachment.mime_type, entry["file_id"], entry.get("uri", ""))
+
+    async def upload(self, client, provider, attachment, api_key, base_url=None):
+        adapter = get_adapter(provider)
+        url, headers, kwargs = adapter.upload_request(provider, api_key, attachment, base_url)
+        response = await client.post(url, headers=headers, **kwargs)
+        if response.status_code not in (200, 201):
+            raise UploadError(f"Error: Upload of '{attachment.name}' to {provider.key} returned HTTP {response.status_code}. {response.text[:200]}")
+        file_id, uri, expires_at = adapter.upload_result(response.json())
+        return {"file_id": file_id, "uri": uri, "expires_at": expires_at, "uploaded_at": time.time(), "name": attachment.name}
+
+    def stats(self):
+        return {"uploads": self.uploads, "reuses": self.reuses, "uploaded_bytes": self.uploaded_bytes}
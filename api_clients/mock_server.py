@@ -0,0 +1,596 @@
+import re
+import json
+import math
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==========================================
+# Local stand-in for the provider APIs
+# ==========================================
+# Answers the same paths as the real APIs (see adapters.py) with a schema-valid
+# smell_analysis reply, so sweep.py can run offline:
+#   python api_clients/mock_server.py --port 8765
+#   python sweep.py --base-url http://127.0.0.1:8765 --results-dir /tmp/results
+# Requests with "stream": true (or Gemini's :streamGenerateContent) get the reply as
+# server-sent events, one smell_analysis item per event.
+#
+# For load and resilience tests it can also:
+#   --latency 2 --latency-dist lognormal      draw every reply's delay from a distribution
+#   --rate-limit-rate 0.1 / --rpm 60          answer 429 with a Retry-After header (--rpm also sends
+#                                             OpenAI style x-ratelimit-* headers with every reply)
+#   --truncate-rate 0.05                      cut replies short (stop reason "max tokens", or a stream that just ends)
+#   --malformed-rate 0.05                     send reply text that is not valid JSON
+#   --ground-truth Data --error-rate 0.1      answer from Data/**/*.txt (the PDF is recognised by its sha256)
+#   --batch-delay 5 --batch-error-rate 0.05   fake batch APIs: OpenAI /v1/batches, Anthropic /v1/messages/batches,
+#                                             Gemini :batchGenerateContent; a batch ends after --batch-delay seconds
+#                                             and every item is answered like a single request (plus errored items)
+# Requests with a response schema (structured output: OpenAI text.format / response_format
+# json_schema, Anthropic tool_choice, Gemini responseSchema) always get a schema-valid reply:
+# --invalid-rate and --malformed-rate do not apply to them, like on the real APIs; truncation does.
+# Anthropic tool calls are answered with a tool_use block (input_json_delta when streaming).
+# GET /stats returns how many requests got which treatment.
+
+CHECK_LIST = ["G5.1", "G5.2", "G6.1", "G6.2", "G6.3", "G8.1", "G15.1", "G15.2", "G15.3", "S1.1", "S1.2", "S2.1", "N1.1", "N1.2", "N3.1", "N3.2", "N3.3", "N4.1"]
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+BATCH_PATH = re.compile(r"^/v1(?:beta)?(?:/messages)?/batches/(?P<id>[\w-]+)(?P<results>/results)?$")
+FILE_CONTENT_PATH = re.compile(r"^/v1/files/(?P<id>[\w-]+)/content$")
+RULE_LINE = re.compile(r"^([GSN]\d+\.\d+):", re.MULTILINE)
+DATA_URL = re.compile(r"^data:[^;,]+;base64,")
+
+
+def requested_rules(payload):
+    """Rule IDs defined in the prompt's knowledge base, in order; the full CHECK_LIST when there are none."""
+    rule_ids = []
+    for text in prompt_texts(payload):
+        for rule_id in RULE_LINE.findall(text):
+            if rule_id not in rule_ids:
+                rule_ids.append(rule_id)
+    return rule_ids or CHECK_LIST
+
+
+def structured(payload):
+    """Whether a request body asks for structured output against a JSON schema."""
+    def field(*keys):
+        value = payload
+        for key in keys:
+            value = value.get(key) if isinstance(value, dict) else None
+        return value
+
+    return (field("text", "format", "type") == "json_schema" or field("response_format", "type") == "json_schema"
+            or field("generationConfig", "responseSchema") is not None or field("tool_choice", "type") == "tool")
+
+
+def tool_call(path, payload):
+    """The tool name an Anthropic request forces, None otherwise."""
+    if path.endswith("/messages") and payload.get("tool_choice", {}).get("type") == "tool":
+        return payload["tool_choice"]["name"]
+    return None
+
+
+def prompt_texts(payload):
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            if key in ("text", "content") and isinstance(value, str):
+                yield value
+            else:
+                yield from prompt_texts(value)
+    elif isinstance(payload, list):
+        for value in payload:
+            yield from prompt_texts(value)
+
+
+def sample_latency(mean, distribution="fixed", spread=0.5):
+    """
+    Seconds to wait before a reply: mean itself ("fixed"), uniform in mean +- spread * mean,
+    exponential with that mean, or lognormal with median mean and sigma spread (long tail).
+    """
+    if mean <= 0 or distribution == "fixed":
+        return max(mean, 0.0)
+    if distribution == "uniform":
+        return random.uniform(mean * (1 - spread), mean * (1 + spread))
+    if distribution == "exponential":
+        return random.expovariate(1 / mean)
+    return random.lognormvariate(math.log(mean), spread)
+
+
+def load_ground_truth(data_dir):
+    """{sha256 of a PDF: set of its rule IDs} for every Data/**/*.pdf with a label file next to it."""
+    labels = {}
+    for pdf in Path(data_dir).rglob("*.pdf"):
+        label_file = pdf.with_suffix(".txt")
+        if not label_file.is_file():
+            continue
+        # Same format as ground_truth.parse_labels: comma separated rule IDs
+        text = label_file.read_text(encoding="utf-8-sig")
+        labels[hashlib.sha256(pdf.read_bytes()).hexdigest()] = {
+            part.strip() for part in text.replace("\n", ",").split(",") if part.strip()}
+    return labels
+
+
+def attachment_hashes(payload):
+    """sha256 of every inline base64 attachment (data URLs and base64 "data" fields) in a request body."""
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            if isinstance(value, str) and (key == "data" or DATA_URL.match(value)):
+                try:
+                    yield hashlib.sha256(base64.b64decode(DATA_URL.sub("", value, count=1))).hexdigest()
+                except ValueError:
+                    continue
+            else:
+                yield from attachment_hashes(value)
+    elif isinstance(payload, list):
+        for value in payload:
+            yield from attachment_hashes(value)
+
+
+def analysis_text(rule_ids=CHECK_LIST, invalid_index=None, labels=None, error_rate=0.0, fenced=True):
+    """
+    The reply text, in a ```json fence unless fenced is False (structured output is bare JSON);
+    invalid_index makes that item break Condition 2.3 (non-boolean "detected").
+    With labels (the diagram's ground truth) every rule is detected when present, each
+    verdict flipped with probability error_rate; without, nothing is detected.
+    """
+    def detected(rule_id):
+        if labels is None:
+            return False
+        return (rule_id in labels) != (random.random() < error_rate)
+
+    analysis = {
+        "file_name": "mock",
+        "smell_analysis": [
+            {"rule_id": rule_id, "detected": detected(rule_id), "justification": "Mock server reply."} for rule_id in rule_ids
+        ],
+    }
+    if invalid_index is not None:
+        analysis["smell_analysis"][invalid_index]["detected"] = "no"
+    text = json.dumps(analysis, indent=2)
+    return "```json\n" + text + "\n```" if fenced else text
+
+
+def malformed(text):
+    """The reply with the comma between two items dropped, so it is no longer valid JSON."""
+    return text.replace("},\n    {", "}\n    {", 1)
+
+
+def item_chunks(text):
+    """Splits a reply after every smell_analysis item (indent=2 puts their closing braces at 4 spaces)."""
+    chunks, current = [], []
+    for line in text.splitlines(keepends=True):
+        current.append(line)
+        if line.startswith("    }"):
+            chunks.append("".join(current))
+            current = []
+    chunks.append("".join(current))
+    return chunks
+
+
+def referenced_files(payload):
+    """Every file_id / file_uri referenced anywhere in a request body."""
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            if key in ("file_id", "file_uri") and isinstance(value, str):
+                yield value
+            else:
+                yield from referenced_files(value)
+    elif isinstance(payload, list):
+        for value in payload:
+            yield from referenced_files(value)
+
+
+def multipart_file(body, content_type):
+    """Content of the first file part of a multipart/form-data body, or body itself when it is not multipart."""
+    match = re.search(r"boundary=\"?([^\";]+)", content_type or "")
+    if not match:
+        return body
+    for part in body.split(b"--" + match.group(1).encode()):
+        head, _, content = part.partition(b"\r\n\r\n")
+        if b"filename=" in head:
+            return content[:-2] if content.endswith(b"\r\n") else content
+    return body
+
+
+def cut(text):
+    """text cut off at a random point, as when the output token limit runs out."""
+    return text[:random.randrange(1, len(text))]
+
+
+def wrap_reply(path, text, truncated=False, tool=None):
+    """
+    Wraps reply text into the response body of the API that path belongs to; truncated as if max
+    tokens ran out. With tool (a forced Anthropic tool) the text is the input of a tool_use block.
+    """
+    if path.endswith("/responses"):
+        reply = {"status": "incomplete" if truncated else "completed",
+                 "output": [{"type": "message", "content": [{"type": "output_text", "text": text}]}]}
+        if truncated:
+            reply["incomplete_details"] = {"reason": "max_output_tokens"}
+        return reply
+    if path.endswith("/messages") and tool:
+        # A tool call cut off by max tokens comes back with an empty input
+        return {"content": [{"type": "tool_use", "id": f"toolu_{random.getrandbits(64):016x}", "name": tool,
+                             "input": {} if truncated else json.loads(text)}],
+                "stop_reason": "max_tokens" if truncated else "tool_use"}
+    if path.endswith("/messages"):
+        return {"content": [{"type": "text", "text": text}], "stop_reason": "max_tokens" if truncated else "end_turn"}
+    if path.endswith(":generateContent"):
+        return {"candidates": [{"content": {"parts": [{"text": text}]}, "finishReason": "MAX_TOKENS" if truncated else "STOP"}]}
+    if path.endswith("/chat/completions"):
+        return {"choices": [{"message": {"role": "assistant", "content": text}, "finish_reason": "length" if truncated else "stop"}]}
+    return None
+
+
+def stream_event(path, chunk, tool=None):
+    """One server-sent event carrying chunk, in the stream format of the API that path belongs to."""
+    if path.endswith("/responses"):
+        return {"type": "response.output_text.delta", "delta": chunk}
+    if path.endswith("/messages") and tool:
+        return {"type": "content_block_delta", "index": 0, "delta": {"type": "input_json_delta", "partial_json": chunk}}
+    if path.endswith("/messages"):
+        return {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}}
+    if path.endswith(":streamGenerateContent"):
+        return {"candidates": [{"content": {"parts": [{"text": chunk}]}}]}
+    if path.endswith("/chat/completions"):
+        return {"choices": [{"index": 0, "delta": {"content": chunk}}]}
+    return None
+
+
+def rate_limit_error(path, retry_after):
+    """429 body in the error shape of the API that path belongs to."""
+    message = f"Rate limit reached, retry after {retry_after:.0f}s (mock server)"
+    if path.endswith((":generateContent", ":streamGenerateContent")):
+        return {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": message}}
+    if path.endswith("/messages"):
+        return {"type": "error", "error": {"type": "rate_limit_error", "message": message}}
+    return {"error": {"type": "rate_limit_exceeded", "code": "rate_limit_exceeded", "message": message}}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    latency_dist = "fixed"  # see sample_latency()
+    latency_spread = 0.5
+    item_latency = 0.0      # extra seconds per smell_analysis item, like a longer generation
+    file_ttl = 48 * 3600    # seconds an uploaded file stays known
+    invalid_rate = 0.0      # share of replies with one broken item
+    rate_limit_rate = 0.0   # share of requests answered 429
+    retry_after = 1.0       # Retry-After of those 429s
+    rpm = 0                 # requests per minute before 429s (0: no limit)
+    truncate_rate = 0.0     # share of replies cut short
+    malformed_rate = 0.0    # share of replies that are not valid JSON
+    ground_truth = None     # {PDF sha256: rule IDs}, see load_ground_truth()
+    error_rate = 0.0        # share of ground truth verdicts flipped
+    files = {}              # file id or uri -> expiry time (epoch)
+    file_hashes = {}        # file id or uri -> sha256 of the uploaded content
+    stats = None            # treatment -> request count
+    bucket = None           # {"level", "time"}: requests left of the --rpm bucket, refilled continuously
+    batch_delay = 2.0       # seconds until a batch has ended
+    batch_error_rate = 0.0  # share of batch items that come back errored
+    batches = {}            # batch id -> {"api", "ready_at", "results": [(custom_id, reply or None, error)]}
+    contents = {}           # file id -> bytes, for batch input and output files
+    lock = None
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/stats":
+            with self.lock:
+                return self.send_json(200, dict(self.stats))
+        match = BATCH_PATH.match(path)
+        if match and match.group("id") in self.batches:
+            return self.send_batch(match.group("id"), results=bool(match.group("results")))
+        match = FILE_CONTENT_PATH.match(path)
+        if match and match.group("id") in self.contents:
+            return self.send_bytes(200, self.contents[match.group("id")], "application/jsonl")
+        return self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        if self.path.split("?")[0].endswith("/files"):
+            return self.upload(body)
+
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            return self.send_json(400, {"error": {"message": "Request body is not valid JSON"}})
+
+        path = self.path.split("?")[0]
+        if path.endswith(("/batches", ":batchGenerateContent")):
+            return self.create_batch(path, payload)
+
+        retry_after = self.rate_limited()
+        if retry_after is not None:
+            self.count("rate_limited")
+            return self.send_json(429, rate_limit_error(path, retry_after),
+                                  {"Retry-After": f"{math.ceil(retry_after)}", **self.rate_limit_headers()})
+
+        streaming = payload.get("stream") is True or path.endswith(":streamGenerateContent")
+        try:
+            text, truncated = self.generate(payload)
+        except LookupError as e:
+            return self.send_json(404, {"error": {"type": "not_found_error", "message": f"File not found: {e}"}})
+
+        delay = sample_latency(self.latency, self.latency_dist, self.latency_spread)
+        tool = tool_call(path, payload)
+        if streaming and stream_event(path, "") is not None:
+            return self.send_stream(path, text, delay, truncated, tool)
+
+        time.sleep(delay + self.item_latency * len(requested_rules(payload)))
+        reply = wrap_reply(path, cut(text) if truncated else text, truncated, tool)
+        if reply is None:
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+        else:
+            self.send_json(200, reply, self.rate_limit_headers())
+
+    def generate(self, payload):
+        """
+        (reply text, whether to cut it short) for one request body, with every other failure
+        injection applied. Raises LookupError for a file reference the server does not know (or that expired).
+        """
+        rule_ids = requested_rules(payload)
+        schema = structured(payload)
+        if schema:
+            self.count("structured")
+        invalid_index = random.randrange(len(rule_ids)) if not schema and random.random() < self.invalid_rate else None
+
+        now = time.time()
+        references = list(referenced_files(payload))
+        for ref in references:
+            if self.files.get(ref, 0) <= now:
+                raise LookupError(ref)
+
+        labels = None
+        if self.ground_truth is not None:
+            hashes = [self.file_hashes.get(ref) for ref in references] + list(attachment_hashes(payload))
+            labels = next((self.ground_truth[sha] for sha in hashes if sha in self.ground_truth), None)
+            self.count("ground_truth" if labels is not None else "unknown_diagram")
+
+        text = analysis_text(rule_ids, invalid_index, labels, self.error_rate, fenced=not schema)
+        if not schema and random.random() < self.malformed_rate:
+            text = malformed(text)
+            self.count("malformed")
+        truncated = random.random() < self.truncate_rate
+        if truncated:
+            self.count("truncated")
+        self.count("invalid" if invalid_index is not None else "replies")
+        return text, truncated
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    def create_batch(self, path, payload):
+        """Creates a batch from an OpenAI input file, Anthropic "requests" or Gemini inlined requests."""
+        if path.endswith(":batchGenerateContent"):
+            api = "gemini"
+            requests = payload.get("batch", {}).get("input_config", {}).get("requests", {}).get("requests", [])
+            items = [(request.get("metadata", {}).get("key", str(i)), path.replace(":batchGenerateContent", ":generateContent"),
+                      request["request"]) for i, request in enumerate(requests)]
+        elif path.endswith("/messages/batches"):
+            api = "anthropic"
+            items = [(request["custom_id"], path[:-len("/batches")], request["params"]) for request in payload.get("requests", [])]
+        else:
+            api = "openai"
+            content = self.contents.get(payload.get("input_file_id"))
+            if content is None:
+                return self.send_json(404, {"error": {"message": f"File not found: {payload.get('input_file_id')}"}})
+            lines = [json.loads(line) for line in content.decode("utf-8").splitlines() if line.strip()]
+            items = [(line["custom_id"], line["url"], line["body"]) for line in lines]
+
+        batch_id = {"openai": "batch_", "anthropic": "msgbatch_", "gemini": ""}[api] + f"{random.getrandbits(64):016x}"
+        self.batches[batch_id] = {"api": api, "ready_at": time.time() + self.batch_delay, "results": self.batch_results(items)}
+        self.count("batches")
+        return self.send_batch(batch_id)
+
+    def batch_results(self, items):
+        """[(custom_id, reply or None, error message)] for [(custom_id, API path, request body)], each answered like a single request."""
+        results = []
+        for custom_id, path, body in items:
+            if random.random() < self.batch_error_rate:
+                self.count("batch_errors")
+                results.append((custom_id, None, "Internal server error (mock server)"))
+                continue
+            try:
+                text, truncated = self.generate(body)
+            except LookupError as e:
+                results.append((custom_id, None, f"File not found: {e}"))
+                continue
+            results.append((custom_id, wrap_reply(path, cut(text) if truncated else text, truncated, tool_call(path, body)), None))
+        return results
+
+    def send_batch(self, batch_id, results=False):
+        """The batch object in its API's shape, or with results=True the Anthropic results JSONL."""
+        batch = self.batches[batch_id]
+        ended = time.time() >= batch["ready_at"]
+        succeeded = sum(reply is not None for _, reply, _ in batch["results"])
+        errored = len(batch["results"]) - succeeded
+
+        if batch["api"] == "anthropic":
+            if results:
+                if not ended:
+                    return self.send_json(404, {"error": {"message": "Batch has not ended yet"}})
+                lines = [{"custom_id": custom_id,
+                          "result": {"type": "succeeded", "message": reply} if reply is not None else
+                          {"type": "errored", "error": {"type": "error", "error": {"type": "api_error", "message": error}}}}
+                         for custom_id, reply, error in batch["results"]]
+                return self.send_bytes(200, "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8"), "application/jsonl")
+            counts = {"processing": 0 if ended else succeeded + errored, "succeeded": succeeded if ended else 0,
+                      "errored": errored if ended else 0, "canceled": 0, "expired": 0}
+            return self.send_json(200, {
+                "id": batch_id, "type": "message_batch", "processing_status": "ended" if ended else "in_progress",
+                "request_counts": counts,
+                "results_url": f"http://{self.headers.get('Host')}/v1/messages/batches/{batch_id}/results" if ended else None})
+
+        if batch["api"] == "gemini":
+            name = f"batches/{batch_id}"
+            operation = {"name": name, "done": ended, "metadata": {
+                "@type": "type.googleapis.com/google.ai.generativelanguage.v1main.GenerateContentBatch", "name": name,
+                "state": "BATCH_STATE_SUCCEEDED" if ended else "BATCH_STATE_RUNNING"}}
+            if ended:
+                operation["response"] = {"inlinedResponses": {"inlinedResponses": [
+                    {"response": reply, "metadata": {"key": custom_id}} if reply is not None else
+                    {"error": {"code": 500, "message": error}, "metadata": {"key": custom_id}}
+                    for custom_id, reply, error in batch["results"]]}}
+            return self.send_json(200, operation)
+
+        view = {"id": batch_id, "object": "batch", "endpoint": "/v1/responses", "status": "completed" if ended else "in_progress",
+                "output_file_id": None, "error_file_id": None,
+                "request_counts": {"total": succeeded + errored, "completed": succeeded if ended else 0, "failed": errored if ended else 0}}
+        if ended:
+            for key, lines in (("output_file_id", [(c, r, e) for c, r, e in batch["results"] if r is not None]),
+                               ("error_file_id", [(c, r, e) for c, r, e in batch["results"] if r is None])):
+                if lines:
+                    view[key] = file_id = f"file-{batch_id}-{key[:-8]}"
+                    self.contents[file_id] = "".join(json.dumps({
+                        "id": f"batch_req_{i}", "custom_id": custom_id,
+                        "response": {"status_code": 200 if reply is not None else 500,
+                                     "body": reply if reply is not None else {"error": {"message": error}}},
+                        "error": None}) + "\n" for i, (custom_id, reply, error) in enumerate(lines)).encode("utf-8")
+        return self.send_json(200, view)
+
+    def rate_limited(self):
+        """Seconds the client should wait when this request is answered 429, else None."""
+        if self.rate_limit_rate and random.random() < self.rate_limit_rate:
+            return self.retry_after
+        if not self.rpm:
+            return None
+        with self.lock:
+            level = self.refill()
+            if level < 1:
+                return (1 - level) * 60 / self.rpm
+            self.bucket["level"] = level - 1
+        return None
+
+    def refill(self):
+        """Requests left in the --rpm bucket, which holds rpm and refills rpm per minute (call with the lock held)."""
+        now = time.monotonic()
+        self.bucket["level"] = min(self.rpm, self.bucket["level"] + (now - self.bucket["time"]) * self.rpm / 60)
+        self.bucket["time"] = now
+        return self.bucket["level"]
+
+    def rate_limit_headers(self):
+        """x-ratelimit-* headers of the --rpm bucket, as the OpenAI API sends them (reset: until the bucket is full)."""
+        if not self.rpm:
+            return {}
+        with self.lock:
+            level = self.refill()
+            return {"x-ratelimit-limit-requests": str(self.rpm),
+                    "x-ratelimit-remaining-requests": str(int(level)),
+                    "x-ratelimit-reset-requests": f"{(self.rpm - level) * 60 / self.rpm:.3f}s"}
+
+    def upload(self, body):
+        """Fake file API: OpenAI/Anthropic POST /v1/files (multipart), Gemini POST /upload/v1beta/files (raw bytes)."""
+        file_id = "file-" + hashlib.sha256(body).hexdigest()[:24]
+        expires_at = time.time() + self.file_ttl
+        content = multipart_file(body, self.headers.get("Content-Type"))
+        content_sha = hashlib.sha256(content).hexdigest()
+        if b'name="purpose"\r\n\r\nbatch' in body:
+            self.contents[file_id] = content
+        if self.path.startswith("/upload/"):
+            uri = f"http://{self.headers.get('Host')}/v1beta/files/{file_id}"
+            self.files[uri] = expires_at
+            self.file_hashes[uri] = content_sha
+            expiration = datetime.fromtimestamp(expires_at, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            return self.send_json(200, {"file": {"name": f"files/{file_id}", "uri": uri, "expirationTime": expiration}})
+        self.files[file_id] = expires_at
+        self.file_hashes[file_id] = content_sha
+        return self.send_json(200, {"id": file_id, "object": "file", "bytes": len(body)})
+
+    def send_stream(self, path, text, delay=0.0, truncated=False, tool=None):
+        """
+        Sends text as server-sent events, one item at a time, item_latency apart. Ends with the
+        connection; a truncated stream stops after a random number of items without a final event.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        for key, value in self.rate_limit_headers().items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.close_connection = True
+        time.sleep(delay)
+        chunks = item_chunks(text)
+        if truncated:
+            chunks = chunks[:random.randrange(1, len(chunks))]
+        try:
+            for chunk in chunks:
+                self.wfile.write(f"data: {json.dumps(stream_event(path, chunk, tool))}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(self.item_latency)
+            if path.endswith("/chat/completions") and not truncated:
+                self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client cancelled the generation
+            pass
+
+    def send_json(self, status, payload, headers=None):
+        self.send_bytes(status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+    def send_bytes(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=8765, latency=0.0, file_ttl=MockHandler.file_ttl, item_latency=0.0, invalid_rate=0.0,
+          latency_dist="fixed", latency_spread=0.5, rate_limit_rate=0.0, retry_after=1.0, rpm=0,
+          truncate_rate=0.0, malformed_rate=0.0, ground_truth_dir=None, error_rate=0.0, seed=None,
+          batch_delay=2.0, batch_error_rate=0.0):
+    if seed is not None:
+        random.seed(seed)
+    ground_truth = load_ground_truth(ground_truth_dir) if ground_truth_dir else None
+    handler = type("Handler", (MockHandler,), {
+        "latency": latency, "latency_dist": latency_dist, "latency_spread": latency_spread, "item_latency": item_latency,
+        "file_ttl": file_ttl, "invalid_rate": invalid_rate, "rate_limit_rate": rate_limit_rate, "retry_after": retry_after,
+        "rpm": rpm, "truncate_rate": truncate_rate, "malformed_rate": malformed_rate, "ground_truth": ground_truth,
+        "error_rate": error_rate, "batch_delay": batch_delay, "batch_error_rate": batch_error_rate,
+        "batches": {}, "contents": {}, "files": {}, "file_hashes": {}, "stats": {},
+        "bucket": {"level": rpm, "time": time.monotonic()}, "lock": threading.Lock()})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"Mock LLM server on http://{host}:{server.server_port}"
+          + (f" ({len(ground_truth)} ground truth PDFs)" if ground_truth is not None else ""))
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of the OpenAI, Anthropic, Gemini and chat/completions APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before every reply (mean/median of --latency-dist)")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-spread", type=float, default=0.5, help="uniform: +- share of --latency; lognormal: sigma")
+    parser.add_argument("--item-latency", type=float, default=0.0, help="extra seconds per smell_analysis item in a reply")
+    parser.add_argument("--file-ttl", type=float, default=MockHandler.file_ttl, help="seconds an uploaded file stays known")
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="share of replies (0-1) with one schema-breaking item")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests (0-1) answered 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds of --rate-limit-rate 429s")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before answering 429 (0: no limit)")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="share of replies (0-1) cut short")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of replies (0-1) that are not valid JSON")
+    parser.add_argument("--ground-truth", metavar="DATA_DIR", help="answer from the label files of the PDFs in this folder")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of ground truth verdicts (0-1) flipped")
+    parser.add_argument("--seed", type=int, help="seed for reproducible failure injection")
+    parser.add_argument("--batch-delay", type=float, default=2.0, help="seconds until a submitted batch has ended")
+    parser.add_argument("--batch-error-rate", type=float, default=0.0, help="share of batch items (0-1) that come back errored")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.latency, args.file_ttl, args.item_latency, args.invalid_rate,
+          args.latency_dist, args.latency_spread, args.rate_limit_rate, args.retry_after, args.rpm,
+          args.truncate_rate, args.malformed_rate, args.ground_truth, args.error_rate, args.seed,
+          args.batch_delay, args.batch_error_rate).serve_forever()
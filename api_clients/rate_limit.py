@@ -0,0 +1,215 @@
+import re
+import math
+import time
+import asyncio
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from api_clients.adapters import FileRef
+from pdf_pages import CHARS_PER_TOKEN, IMAGE_TOKEN_CAP
+
+# ==========================================
+# CONFIG: adaptive per-(provider, model) rate limiter
+# ==========================================
+# Two token buckets per (provider, model), one for requests and one for tokens, refilled at
+# the current rate per minute. The rates follow AIMD: every successful reply adds
+# INCREASE_SHARE of the limit, a 429 halves them and pauses the bucket for Retry-After. The
+# limits themselves start at provider.requests_per_minute / tokens_per_minute and are replaced
+# by the x-ratelimit-limit-* (OpenAI, xAI) or anthropic-ratelimit-*-limit headers; the
+# *-remaining headers drain a bucket to what the API says is left.
+
+INCREASE_SHARE = 0.05    # additive increase per successful reply, share of the limit
+DECREASE_FACTOR = 0.5    # multiplicative decrease per 429
+MIN_SHARE = 0.05         # never below this share of the limit
+DEFAULT_RETRY_AFTER = 5  # seconds to pause after a 429 without a Retry-After header
+
+# Token estimates of a request, before the API counts them (same rough costs as pdf_pages.py:
+# a PDF page is a full-size page image plus its text)
+TOKENS_PER_PDF_PAGE = IMAGE_TOKEN_CAP + 400
+TOKENS_PER_FILE_REF = 2 * TOKENS_PER_PDF_PAGE  # uploaded PDF, its pages are not at hand
+OUTPUT_TOKENS_PER_RULE = 120    # one smell_analysis item with its justification
+
+PDF_PAGE = re.compile(rb"/Type\s*/Page(?!s)")
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+KINDS = ("requests", "tokens")
+
+
+def estimate_tokens(prompt, attachments, rule_count):
+    """Estimated input plus output tokens of one request."""
+    tokens = len(prompt) / CHARS_PER_TOKEN + rule_count * OUTPUT_TOKENS_PER_RULE
+    for a in attachments:
+        if isinstance(a, FileRef):
+            tokens += TOKENS_PER_FILE_REF
+        elif a.is_text:
+            tokens += len(a.data) / CHARS_PER_TOKEN
+        elif a.mime_type.startswith("image/"):
+            tokens += IMAGE_TOKEN_CAP
+        else:
+            tokens += max(len(PDF_PAGE.findall(a.data)), 1) * TOKENS_PER_PDF_PAGE
+    return int(tokens)
+
+
+def header_number(value):
+    """A header's value as a finite, non-negative number; None when it is missing or not one."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) and number >= 0 else None
+
+
+def parse_reset(value):
+    """
+    Seconds until a reset header's time: "1s", "6m0s", "20ms" (OpenAI), RFC 3339 (Anthropic),
+    an HTTP-date (Retry-After) or plain seconds. None when it is none of these.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+        return max(seconds, 0.0) if math.isfinite(seconds) else None
+    except ValueError:
+        pass
+    parts = DURATION_PART.findall(value)
+    if parts:
+        return sum(float(number) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit] for number, unit in parts)
+    for parse in (lambda v: datetime.fromisoformat(v.replace("Z", "+00:00")), parsedate_to_datetime):
+        try:
+            return max(parse(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError, OverflowError):
+            continue
+    return None
+
+
+def rate_limit_headers(headers):
+    """
+    {kind: (limit, remaining, seconds until reset)} from the OpenAI/xAI or Anthropic rate-limit
+    headers. A value that is not a number is ignored, like a missing header.
+    """
+    result = {}
+    for kind in KINDS:
+        values = [headers.get(f"x-ratelimit-{name}-{kind}") or headers.get(f"anthropic-ratelimit-{kind}-{name}")
+                  for name in ("limit", "remaining", "reset")]
+        parsed = (header_number(values[0]), header_number(values[1]), parse_reset(values[2]))
+        if any(value is not None for value in parsed):
+            result[kind] = parsed
+    return result
+
+
+class RateLimiter:
+    """
+    Request and token buckets of one (provider, model):
+
+        await limiter.acquire(tokens)           # waits for both buckets, in arrival order
+        limiter.update(status, headers, tokens, used_tokens)
+
+    stats() exposes the current rates, queue depth and time spent throttled.
+    """
+
+    def __init__(self, name, requests_per_minute, tokens_per_minute):
+        self.name = name
+        self.limits = {"requests": float(requests_per_minute), "tokens": float(tokens_per_minute)}
+        self.rates = dict(self.limits)      # per minute, AIMD between MIN_SHARE and 1 of the limit
+        self.levels = dict(self.limits)     # bucket contents, at most one minute of the rate
+        self.refilled = time.monotonic()
+        self.paused_until = 0.0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.throttle_seconds = 0.0
+        self.throttled = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        for kind in KINDS:
+            self.levels[kind] = min(self.rates[kind], self.levels[kind] + self.rates[kind] * (now - self.refilled) / 60)
+        self.refilled = now
+        return now
+
+    def _wait(self, tokens):
+        """Seconds until a request of tokens fits into both buckets, 0 when it fits now."""
+        now = self._refill()
+        wait = self.paused_until - now
+        for kind, needed in (("requests", 1), ("tokens", tokens)):
+            # A request bigger than the whole bucket goes once the bucket is full
+            deficit = min(needed, self.rates[kind]) - self.levels[kind]
+            if deficit > 0:
+                wait = max(wait, deficit / self.rates[kind] * 60)
+        return wait
+
+    async def acquire(self, tokens):
+        """Waits until one request of tokens estimated tokens may be sent, then takes it from the buckets."""
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        start = time.monotonic()
+        try:
+            async with self._lock:
+                while (wait := self._wait(tokens)) > 0:
+                    await asyncio.sleep(wait)
+                self.levels["requests"] -= 1
+                self.levels["tokens"] -= min(tokens, self.rates["tokens"])
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - start
+        if waited > 0.001:
+            self.throttled += 1
+            self.throttle_seconds += waited
+        self.requests += 1
+
+    def update(self, status, headers, tokens=0, used_tokens=None):
+        """Adjusts limits, rates and buckets to one response: its status, rate-limit headers and token usage."""
+        self._refill()
+        reported = rate_limit_headers(headers)
+        for kind, (limit, remaining, _) in reported.items():
+            if limit:
+                self.limits[kind] = limit
+                self.rates[kind] = min(self.rates[kind], limit)
+            if remaining is not None:
+                self.levels[kind] = min(self.levels[kind], remaining)
+        if used_tokens is not None:
+            self.levels["tokens"] += tokens - used_tokens
+
+        if status == 429:
+            self.rate_limited += 1
+            # Only the exhausted bucket backs off, both when the headers do not say which
+            exhausted = [kind for kind, (_, remaining, _) in reported.items() if remaining == 0] or KINDS
+            for kind in exhausted:
+                self.rates[kind] = max(self.rates[kind] * DECREASE_FACTOR, self.limits[kind] * MIN_SHARE)
+                self.levels[kind] = min(self.levels[kind], 0.0)
+            retry_after = parse_reset(headers.get("retry-after"))
+            if retry_after is None:
+                retry_after = max((reported[kind][2] for kind in exhausted if kind in reported and reported[kind][2] is not None),
+                                  default=DEFAULT_RETRY_AFTER)
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        elif status < 400:
+            for kind in KINDS:
+                self.rates[kind] = min(self.rates[kind] + self.limits[kind] * INCREASE_SHARE, self.limits[kind])
+
+    def stats(self):
+        return {
+            "rpm": self.rates["requests"], "rpm_limit": self.limits["requests"],
+            "tpm": self.rates["tokens"], "tpm_limit": self.limits["tokens"],
+            "queue": self.waiting, "max_queue": self.max_waiting,
+            "requests": self.requests, "throttled": self.throttled, "throttle_seconds": self.throttle_seconds,
+            "rate_limited": self.rate_limited,
+        }
+
+
+class RateLimits:
+    """One RateLimiter per (provider key, api_model), created on first use."""
+
+    def __init__(self):
+        self._limiters = {}
+
+    def limiter(self, provider):
+        key = (provider.key, provider.api_model)
+        if key not in self._limiters:
+            self._limiters[key] = RateLimiter(f"{provider.key}/{provider.api_model}",
+                                              provider.requests_per_minute, provider.tokens_per_minute)
+        return self._limiters[key]
+
+    def stats(self):
+        """{"provider/model": RateLimiter.stats()}."""
+        return {limiter.name: limiter.stats() for limiter in self._limiters.values()}
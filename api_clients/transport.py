@@ -0,0 +1,184 @@
+import os
+import time
+import asyncio
+import argparse
+import statistics
+
+import httpx
+
+try:
+    import h2  # noqa: F401  httpx only speaks HTTP/2 with the h2 package installed
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+# ==========================================
+# CONFIG: pooled keep-alive transport shared by the provider clients
+# ==========================================
+# One httpx.AsyncClient per provider, each with its own connection pool, so a sweep opens
+# a handful of connections per API host and reuses them for every request instead of paying
+# a TCP (and TLS) handshake per PDF. HTTP/2 is used when h2 is installed (pip install h2);
+# the providers then multiplex all requests over one connection.
+#
+#   python api_clients/mock_server.py --port 8765
+#   python -m api_clients.transport --base-url http://127.0.0.1:8765 --requests 300
+# compares a fresh connection per request (what requests.post does) with the pooled transport.
+
+# Seconds; a full PDF analysis can take several minutes
+REQUEST_TIMEOUT = 600
+CONNECT_TIMEOUT = 30
+
+# Seconds an idle connection stays open; the APIs close theirs after a few minutes
+KEEPALIVE_EXPIRY = 120
+
+
+class Transport:
+    """
+    Pooled clients per provider, created on first use:
+
+        async with Transport(timeout=600) as transport:
+            response = await transport.client(provider).post(url, headers=headers, json=body)
+
+    A provider's pool holds pool_sizes[provider.key], else provider.pool_size, else
+    provider.max_concurrency connections. stats() counts requests and the connections (and
+    handshakes) they needed; handshake_seconds is wall time, see tracer().
+    """
+
+    def __init__(self, timeout=REQUEST_TIMEOUT, pool_sizes=None, http2=HTTP2, connect_timeout=CONNECT_TIMEOUT):
+        self.timeout = httpx.Timeout(timeout, connect=min(connect_timeout, timeout))
+        self.pool_sizes = pool_sizes or {}
+        self.http2 = http2
+        self._clients = {}
+        self._stats = {}
+
+    def pool_size(self, provider):
+        return self.pool_sizes.get(provider.key) or provider.pool_size or provider.max_concurrency
+
+    def client(self, provider):
+        """The pooled httpx.AsyncClient of provider."""
+        client = self._clients.get(provider.key)
+        if client is None:
+            size = self.pool_size(provider)
+            limits = httpx.Limits(max_connections=size, max_keepalive_connections=size, keepalive_expiry=KEEPALIVE_EXPIRY)
+            stats = self._stats[provider.key] = {"requests": 0, "connections": 0, "tls_handshakes": 0,
+                                                 "handshake_seconds": 0.0, "http_versions": set()}
+            client = self._clients[provider.key] = httpx.AsyncClient(
+                timeout=self.timeout, limits=limits, http2=self.http2,
+                event_hooks={"request": [tracer(stats)], "response": [version_counter(stats)]})
+        return client
+
+    def stats(self):
+        """{provider key: {"requests", "connections", "tls_handshakes", "handshake_seconds", "http_versions"}}."""
+        return {key: {**stats, "http_versions": sorted(stats["http_versions"])} for key, stats in self._stats.items()}
+
+    async def aclose(self):
+        await asyncio.gather(*(client.aclose() for client in self._clients.values()))
+        self._clients.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+def tracer(stats):
+    """
+    Request hook that counts the new connections a request opens, through httpcore's trace
+    extension. handshake_seconds is wall time from the start to the end of each step on the
+    event loop, so it includes the time the loop spent on other tasks in between; it is only
+    a handshake cost when requests go one at a time, as in send_back_to_back().
+    """
+    async def on_request(request):
+        started = {}
+
+        async def trace(event, info):
+            step, _, phase = event.rpartition(".")
+            if step not in ("connection.connect_tcp", "connection.start_tls"):
+                return
+            if phase == "started":
+                started[step] = time.perf_counter()
+            elif phase == "complete":
+                stats["handshake_seconds"] += time.perf_counter() - started.pop(step, time.perf_counter())
+                stats["connections" if step.endswith("tcp") else "tls_handshakes"] += 1
+
+        stats["requests"] += 1
+        request.extensions["trace"] = trace
+    return on_request
+
+
+def version_counter(stats):
+    async def on_response(response):
+        stats["http_versions"].add(response.http_version)
+    return on_response
+
+
+# ==========================================
+# Overhead benchmark against a stub server
+# ==========================================
+
+async def send_back_to_back(provider, requests, base_url, pooled, attachment):
+    """
+    Seconds per request for requests identical requests sent one after the other, through one
+    pooled transport or through a fresh one per request (like requests.post() without a Session),
+    and the summed transport stats.
+    """
+    from api_clients.adapters import get_adapter
+
+    url, headers, body = get_adapter(provider).request(provider, "stub", "Analyze the diagram.", [attachment], base_url)
+    seconds, totals = [], {"connections": 0, "handshake_seconds": 0.0, "http_versions": set()}
+
+    def add(stats):
+        for name in ("connections", "handshake_seconds"):
+            totals[name] += stats[name]
+        totals["http_versions"].update(stats["http_versions"])
+
+    shared = Transport(pool_sizes={provider.key: 1})
+    for _ in range(requests):
+        transport = shared if pooled else Transport(pool_sizes={provider.key: 1})
+        start = time.perf_counter()
+        response = await transport.client(provider).post(url, headers=headers, json=body)
+        if not pooled:
+            await transport.aclose()
+            add(transport.stats()[provider.key])
+        seconds.append(time.perf_counter() - start)
+        response.raise_for_status()
+    await shared.aclose()
+    if pooled:
+        add(shared.stats()[provider.key])
+    return seconds, {**totals, "http_versions": sorted(totals["http_versions"])}
+
+
+def main():
+    from providers import get_provider
+    from api_clients.adapters import Attachment
+
+    parser = argparse.ArgumentParser(description="Per-request overhead of a fresh connection per request vs the pooled transport.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8765", help="stub server, see api_clients/mock_server.py")
+    parser.add_argument("--provider", default="claude")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--pdf", help="PDF to send (default: the first one in Data/Oppejoud)")
+    args = parser.parse_args()
+
+    provider = get_provider(args.provider)
+    pdf = args.pdf
+    if pdf is None:
+        folder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data", "Oppejoud")
+        pdf = os.path.join(folder, sorted(name for name in os.listdir(folder) if name.lower().endswith(".pdf"))[0])
+    with open(pdf, 'rb') as f:
+        attachment = Attachment(os.path.basename(pdf), "application/pdf", f.read())
+
+    print(f"{args.requests} x {attachment.name} ({len(attachment.data) / 1024:.0f} KB) to {args.base_url}, HTTP/2: {HTTP2}")
+    means = {}
+    for name, pooled in (("fresh", False), ("pooled", True)):
+        seconds, stats = asyncio.run(send_back_to_back(provider, args.requests, args.base_url, pooled, attachment))
+        means[name] = statistics.mean(seconds)
+        print(f"{name:<7} mean: {means[name] * 1000:7.2f} ms  median: {statistics.median(seconds) * 1000:7.2f} ms  "
+              f"connections: {stats['connections']:>4}  connect wall time: {stats['handshake_seconds'] * 1000:7.1f} ms  "
+              f"{'/'.join(stats['http_versions'])}")
+    print(f"Saved per request: {(means['fresh'] - means['pooled']) * 1000:.2f} ms "
+          f"({(1 - means['pooled'] / means['fresh']) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
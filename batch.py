@@ -0,0 +1,272 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from pathlib import Path
+
+import httpx
+
+from api_clients.adapters import get_adapter
+from api_clients.batches import UNREADABLE, BatchError, get_batch_api
+from api_clients.file_registry import UploadError
+from journal import IN_FLIGHT
+from sweep import SweepRunner
+from validation import ValidationError, parse_response_text
+
+# ==========================================
+# CONFIG: batch-API mode of the sweep
+# ==========================================
+# python sweep.py --batch [--poll-interval 60] [--upload-files] ...
+# Packs every pending job of a provider into its batch API (api_clients/batches.py), polls
+# until the batch has ended and feeds each result through the same ValidationEngine as a
+# synchronous sweep. Errored, missing and rejected results are submitted again in a new
+# batch, up to the runner's retries; a batch whose status or results the API cannot show for
+# a while is polled again, never submitted twice. Submitted batches are remembered in
+# STATE_PATH, so a sweep that is stopped while waiting picks its batches up again instead
+# of paying twice.
+# Test it offline against api_clients/mock_server.py (--batch-delay, --batch-error-rate).
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+STATE_PATH = SCRIPT_DIR / ".cache" / "batches.json"
+
+# Seconds between status checks; batches take minutes to hours
+POLL_INTERVAL = 30
+
+
+class BatchState:
+    """
+    Open batches as {batch id: {"provider", "scope", "jobs": [custom ids], "submitted_at"}},
+    persisted to STATE_PATH. scope keeps stub server batches apart from the real API's.
+    """
+
+    def __init__(self, path=STATE_PATH, scope=""):
+        self.path = Path(path) if path else None
+        self.scope = scope
+        self._batches = {}
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._batches = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._batches = {}
+
+    def _save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._batches, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def open(self, provider):
+        """{batch id: custom ids} of the provider's batches that have not been collected yet."""
+        return {batch_id: entry["jobs"] for batch_id, entry in self._batches.items()
+                if entry["provider"] == provider.key and entry["scope"] == self.scope}
+
+    def add(self, batch_id, provider, custom_ids):
+        self._batches[batch_id] = {"provider": provider.key, "scope": self.scope, "jobs": custom_ids,
+                                   "submitted_at": time.time()}
+        self._save()
+
+    def remove(self, batch_id):
+        if self._batches.pop(batch_id, None) is not None:
+            self._save()
+
+
+class BatchRunner(SweepRunner):
+    """SweepRunner that sends every provider's jobs as batch jobs instead of one request each."""
+
+    def __init__(self, poll_interval=POLL_INTERVAL, state_path=STATE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.poll_interval = poll_interval
+        self.state = BatchState(state_path, scope=self.base_url or "")
+        self._cache_keys = {}   # custom id -> response cache key of the job's reply
+
+    def custom_id(self, job):
+        """Stable id of a job inside a batch (Anthropic allows [a-zA-Z0-9_-], at most 64 characters)."""
+        return "job-" + hashlib.sha1(json.dumps(self.job_key(job)).encode("utf-8")).hexdigest()[:24]
+
+    async def run_jobs(self, transport, jobs):
+        pending = {}
+        for job in jobs:
+            if self.journal is None and os.path.exists(self.engine(job).output_file(job.file_name)):
+                self.report.skipped.append(job)
+                continue
+            prompt, attachments = self.prompt(job), self.attachments(job)
+            key = self.cache_key(job, prompt, attachments) if self.cache is not None else None
+            text = self.cache.get(key) if self.cache is not None else None
+            if text is not None:
+                try:
+                    self.accept(job, parse_response_text(text), cached=True)
+                except ValidationError as e:
+                    self.reject(job, str(e))
+                continue
+            self._cache_keys[self.custom_id(job)] = key
+            pending.setdefault(job.provider.key, []).append(job)
+
+        await asyncio.gather(*(self.run_provider(transport.client(provider_jobs[0].provider), provider_jobs)
+                               for provider_jobs in pending.values()))
+
+    async def run_provider(self, client, jobs):
+        """Batches the jobs of one provider until every job passed or has used up its retries."""
+        provider = jobs[0].provider
+        api = get_batch_api(provider)
+        start = time.perf_counter()
+        stats = self.report.batch_stats.setdefault(provider.key, {"batches": 0, "requests": 0, "requeued": 0, "seconds": 0.0})
+        by_id = {self.custom_id(job): job for job in jobs}
+
+        # Batches an earlier run submitted for these jobs are collected, not submitted again
+        resumed = [batch_id for batch_id, custom_ids in self.state.open(provider).items() if set(custom_ids) & by_id.keys()]
+        in_resumed = {custom_id for batch_id in resumed for custom_id in self.state.open(provider)[batch_id]}
+        queued = [job for custom_id, job in by_id.items() if custom_id not in in_resumed]
+        if resumed:
+            self._log(f"BATCH {provider.key}: collecting {len(resumed)} batches of an earlier run")
+
+        failed = {}
+        for attempt in range(self.retries + 1):
+            if attempt:
+                stats["requeued"] += len(queued)
+                self._log(f"BATCH {provider.key}: re-queueing {len(queued)} failed jobs (attempt {attempt + 1})")
+            batch_ids, failed = await self.submit(client, api, queued)
+            for result in await asyncio.gather(*(self.collect(client, api, provider, batch_id, by_id)
+                                                 for batch_id in resumed + batch_ids)):
+                failed.update(result)
+            resumed = []
+            if not failed:
+                break
+            queued = [by_id[custom_id] for custom_id in failed]
+
+        for custom_id, error in failed.items():
+            self.reject(by_id[custom_id], error)
+        stats["seconds"] = time.perf_counter() - start
+
+    async def batch_request(self, client, job):
+        """(custom id, url, headers, body) of one job, with its PDF uploaded first when a file registry is used."""
+        adapter = get_adapter(job.provider)
+        api_key = self._api_keys[job.provider.key]
+        attachments = self.attachments(job)
+        if self.file_registry is not None and adapter.supports_files:
+            attachments = [await self.file_registry.ensure(client, job.provider, a, api_key, self.base_url)
+                           if a.mime_type == "application/pdf" else a for a in attachments]
+        url, headers, body = adapter.request(job.provider, api_key, self.prompt(job), attachments, self.base_url,
+                                             self.schema(job))
+        return self.custom_id(job), url, headers, body
+
+    async def submit(self, client, api, jobs):
+        """
+        Submits jobs as batches, a new one whenever the API's request or size limit would be
+        exceeded. Returns (batch ids, {custom id: error} of the jobs that could not be submitted).
+        """
+        batch_ids, failed = [], {}
+        chunks, chunk, size = [], [], 0
+        for job in jobs:
+            try:
+                request = await self.batch_request(client, job)
+            except (UploadError, httpx.TransportError) as e:
+                failed[self.custom_id(job)] = str(e) if isinstance(e, UploadError) else f"Error: Upload failed. {e}"
+                continue
+            request_size = len(json.dumps(request[3]))
+            if chunk and (len(chunk) == api.max_requests or size + request_size > api.max_bytes):
+                chunks.append(chunk)
+                chunk, size = [], 0
+            chunk.append(request)
+            size += request_size
+        if chunk:
+            chunks.append(chunk)
+
+        for chunk in chunks:
+            provider = jobs[0].provider
+            custom_ids = [request[0] for request in chunk]
+            try:
+                batch_id = await api.submit(client, provider, self._api_keys[provider.key], chunk, self.base_url)
+            except (BatchError, httpx.TransportError) as e:
+                failed.update({custom_id: f"Error: Batch submission failed. {e}" for custom_id in custom_ids})
+                continue
+            self.state.add(batch_id, provider, custom_ids)
+            if self.journal is not None:
+                submitted = set(custom_ids)
+                self.journal.record([self.job_key(job) for job in jobs if self.custom_id(job) in submitted], IN_FLIGHT)
+            stats = self.report.batch_stats[provider.key]
+            stats["batches"] += 1
+            stats["requests"] += len(chunk)
+            self._log(f"BATCH {provider.key}: submitted {batch_id} ({len(chunk)} requests)")
+            batch_ids.append(batch_id)
+        return batch_ids, failed
+
+    async def collect(self, client, api, provider, batch_id, by_id):
+        """
+        Waits for one batch to end and saves its results. Returns {custom id: error} of its jobs
+        that failed: errored, missing from the results or rejected by validation. While the API
+        only fails for a while (connection errors, 429, 5xx), the batch is polled and read again
+        instead of having its jobs submitted twice.
+        """
+        api_key = self._api_keys[provider.key]
+        errors = 0
+        while True:
+            try:
+                ended, batch = await api.status(client, provider, api_key, batch_id, self.base_url)
+                errors = 0
+            except (BatchError, httpx.TransportError) as e:
+                if not transient(e):
+                    errors += 1
+                    if errors > self.retries:
+                        return {custom_id: f"Error: Batch {batch_id} status unavailable. {e}"
+                                for custom_id in self.state.open(provider).get(batch_id, []) if custom_id in by_id}
+                self._log(f"BATCH {provider.key}: status of {batch_id} unavailable, polling again. {e}")
+                ended, batch = False, None
+            if ended:
+                break
+            if batch is not None:
+                self._log(f"BATCH {provider.key}: {batch_id} {api.progress(batch)}")
+            await asyncio.sleep(self.poll_interval)
+
+        adapter = get_adapter(provider)
+        failed, seen = {}, set()
+        while True:
+            try:
+                async for custom_id, payload, error in api.results(client, provider, api_key, batch, self.base_url):
+                    job = by_id.get(custom_id)
+                    if job is None or custom_id in seen:
+                        # A job of an earlier run that this sweep does not include, or one read before a dropped download
+                        continue
+                    seen.add(custom_id)
+                    if error is not None:
+                        failed[custom_id] = f"Error: Batch request failed. {error}"
+                        continue
+                    try:
+                        text = adapter.response_text(payload)
+                    except UNREADABLE as e:
+                        failed[custom_id] = f"Error: Unreadable batch result. {type(e).__name__}: {e}"
+                        continue
+                    try:
+                        self.accept(job, parse_response_text(text), [(self._cache_keys.get(custom_id), text)])
+                        self.count_reply(job, rejected=False)
+                    except ValidationError as e:
+                        self.count_reply(job, rejected=True)
+                        failed[custom_id] = str(e)
+                break
+            except (BatchError, httpx.TransportError) as e:
+                if transient(e):
+                    self._log(f"BATCH {provider.key}: results of {batch_id} incomplete, reading them again. {e}")
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                # Results not read yet are missing below; the batch stays in the state file for the next run
+                self._log(f"BATCH {provider.key}: results of {batch_id} incomplete. {e}")
+                return {**failed, **{custom_id: f"Error: Batch results incomplete. {e}" for custom_id in by_id
+                                     if custom_id in self.state.open(provider).get(batch_id, []) and custom_id not in seen}}
+
+        for custom_id in self.state.open(provider).get(batch_id, []):
+            if custom_id in by_id and custom_id not in seen:
+                failed[custom_id] = "Error: Missing from the batch results."
+        self.state.remove(batch_id)
+        return failed
+
+
+def transient(error):
+    """Whether a failed batch API call is worth repeating as is: connection errors, 429 and 5xx."""
+    return isinstance(error, httpx.TransportError) or error.transient
+
+def run_batch(jobs, **kwargs):
+    return asyncio.run(BatchRunner(**kwargs).run(jobs))
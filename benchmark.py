@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import platform
+from pathlib import Path
+
+from ground_truth import GroundTruthIndex
+from providers import get_provider
+from result_files import LLM_MODELS
+from validation import CHECK_LIST, ValidationEngine
+
+# ==========================================
+# CONFIG: pipeline benchmark on a generated corpus
+# ==========================================
+# generate_corpus() writes Data/<category>/<name>.txt label files and pushes one raw reply
+# per diagram and provider through validation.ValidationEngine, so the Results/ JSONs are
+# exactly what save_result.py writes. Every stage (ingestion, cold and cached load_data,
+# metrics, the stdlib metrics CLI, report rendering) is then timed on that corpus and
+# compared with the last saved baseline.
+#
+#   python benchmark.py --scales 1000 10000 [--save-baseline]
+#
+# A scale is the number of result files (split over the three LLMs). 100000 and 1000000
+# work the same way, but need ~0.6 / ~6 GB of disk and minutes to hours to generate.
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = SCRIPT_DIR / ".cache" / "benchmark_baseline.json"
+SCALES = [1000, 10000]
+SEED = 0
+REPEAT = 3
+
+# A stage this much slower than its baseline is reported as a regression
+REGRESSION_RATIO = 1.25
+
+# Provider of every LLM name in result_files.LLM_MODELS
+PROVIDERS = {'ChatGPT 5.1': "chatgpt", 'Claude Opus 4.5': "claude", 'Gemini 3 Pro': "gemini"}
+
+# (Data/ category, share of the diagrams) like the real data set
+CATEGORIES = [("Oppejoud", 0.06), ("Yliopilased", 0.34), ("Synthetic/Single", 0.37), ("Synthetic/Multi", 0.23)]
+
+# Share of rules present per diagram, and per LLM (miss rate on present smells, false alarm rate on absent ones)
+POSITIVE_RATE = 0.13
+ERROR_RATES = {'ChatGPT 5.1': (0.47, 0.008), 'Claude Opus 4.5': (0.39, 0.04), 'Gemini 3 Pro': (0.31, 0.02)}
+
+WORDS = ("the diagram class table actor use case relationship attribute foreign key association page "
+         "element name shows model generalization entity is are not no found each with one multiple "
+         "missing duplicate register state transformed database all".split())
+
+
+def diagram_labels(seed, index):
+    """(category, diagram name, sorted present rule IDs) of diagram number index; the same for any corpus size."""
+    rng = random.Random(seed * 1_000_003 + index)
+    category = rng.choices([name for name, _ in CATEGORIES], [share for _, share in CATEGORIES])[0]
+    labels = sorted(rule_id for rule_id in CHECK_LIST if rng.random() < POSITIVE_RATE)
+    return category, f"bench_{index:07d}", labels
+
+
+def raw_reply(llm, name, labels, rng):
+    """A reply as the LLM's prompt asks for it (before save_result.py injects "actual")."""
+    miss_rate, false_alarm_rate = ERROR_RATES[llm]
+    items = []
+    for rule_id in CHECK_LIST:
+        present = rule_id in labels
+        detected = (rng.random() >= miss_rate) if present else (rng.random() < false_alarm_rate)
+        words = rng.choices(WORDS, k=rng.randint(12, 60))
+        items.append({"rule_id": rule_id, "detected": detected,
+                      "justification": f"{rule_id}: " + " ".join(words).capitalize() + "."})
+    return {"file_name": get_provider(PROVIDERS[llm]).file_prefix + name, "smell_analysis": items}
+
+
+def generate_corpus(root, files, seed=SEED, models=LLM_MODELS):
+    """
+    Writes root/Data and root/Results for files result files. Returns the seconds spent in
+    ValidationEngine (validation and saving, i.e. ingestion), without reply generation.
+    """
+    root = Path(root)
+    diagrams = [diagram_labels(seed, index) for index in range(-(-files // len(models)))]
+    for category, name, labels in diagrams:
+        folder = root / "Data" / category
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"{name}.txt").write_text(",".join(labels), encoding="utf-8")
+
+    index = GroundTruthIndex(root / "Data", cache_path=None)
+    index.refresh()
+    ingest = 0.0
+    written = 0
+    for llm in models:
+        rng = random.Random(f"{seed}:{llm}")
+        engines = {}
+        for category, name, labels in diagrams:
+            if written == files:
+                break
+            engine = engines.get(category)
+            if engine is None:
+                engine = engines[category] = ValidationEngine(PROVIDERS[llm], category, results_dir=str(root / "Results"), verbose=False)
+                engine.ground_truth = index
+                os.makedirs(engine.output_path, exist_ok=True)
+            reply = raw_reply(llm, name, labels, rng)
+            start = time.perf_counter()
+            engine.process(reply)
+            ingest += time.perf_counter() - start
+            written += 1
+    return ingest
+
+
+def timed(function, *args, repeat=1, setup=None, **kwargs):
+    """(best seconds of repeat calls, result of the last call); setup() runs untimed before each call."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_scale(files, workdir, seed=SEED, report=True, repeat=REPEAT):
+    """{stage: seconds} for one corpus size. Every stage but ingestion and the cold report is the best of repeat runs."""
+    import Results
+    import metrics
+    import results_cli
+
+    root = Path(workdir) / f"corpus_{files}"
+    shutil.rmtree(root, ignore_errors=True)
+    stages = {}
+
+    start = time.perf_counter()
+    stages["ingest"] = generate_corpus(root, files, seed)
+    stages["generate+ingest"] = time.perf_counter() - start
+
+    # load_data reads these module globals, pointed at the corpus and its own cache until the run ends
+    originals = Results.base_dir, Results.RESULTS_CACHE_DIR
+    Results.base_dir = str(root / "Results")
+    Results.RESULTS_CACHE_DIR = root / ".cache" / "results"
+    try:
+        clear_cache = lambda: shutil.rmtree(Results.RESULTS_CACHE_DIR, ignore_errors=True)
+        stages["load cold"], _ = timed(Results.load_data, LLM_MODELS, justifications=False, repeat=repeat, setup=clear_cache)
+        stages["load cached"], df = timed(Results.load_data, LLM_MODELS, justifications=False, repeat=repeat)
+        stages["load cached +justifications"], _ = timed(Results.load_data, LLM_MODELS, repeat=repeat)
+
+        def compute_metrics():
+            counts = metrics.confusion_counts(df)
+            return counts, Results.metrics_from_counts(counts, 'LLM'), metrics.summarize(counts, ['LLM', 'Category'])
+
+        stages["metrics"], (counts, _, _) = timed(compute_metrics, repeat=repeat)
+        stages["cli metrics"], _ = timed(results_cli.count_results, LLM_MODELS, str(root / "Results"), repeat=repeat)
+
+        if report:
+            import report as report_module
+            figures = root / ".cache" / "figures"
+            stages["report cold"], _ = timed(report_module.build_report, counts, root / "Report", figures)
+            stages["report cached"], _ = timed(report_module.build_report, counts, root / "Report", figures, repeat=repeat)
+    finally:
+        Results.base_dir, Results.RESULTS_CACHE_DIR = originals
+    return stages
+
+
+def load_baseline(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times ingestion, loading, metrics and report rendering on a generated results corpus.")
+    parser.add_argument("--scales", nargs="+", type=int, default=SCALES, help="corpus sizes in result files")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--workdir", help="keep the generated corpora here (default: a temporary folder)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="runs per stage, the fastest counts")
+    parser.add_argument("--no-report", action="store_true", help="skip report rendering")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true", help=f"exit with status 1 when a stage is {REGRESSION_RATIO}x slower than the baseline")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        print(f"{'scale':>8}  {'stage':<28} {'seconds':>9} {'baseline':>9} {'change':>8}")
+        for files in args.scales:
+            stages = run_scale(files, workdir, args.seed, report=not args.no_report, repeat=args.repeat)
+            results[str(files)] = stages
+            for stage, seconds in stages.items():
+                before = baseline.get("results", {}).get(str(files), {}).get(stage)
+                change = f"{(seconds / before - 1) * 100:+.0f}%" if before else ""
+                if before and seconds > before * REGRESSION_RATIO:
+                    regressions.append(f"{files} {stage}")
+                    change += " !"
+                print(f"{files:>8}  {stage:<28} {seconds:>9.3f} {before if before else float('nan'):>9.3f} {change:>8}")
+
+    if args.save_baseline:
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        merged = {**baseline.get("results", {}), **results}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count(),
+                       "seed": args.seed, "repeat": args.repeat, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": merged}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"Slower than baseline x{REGRESSION_RATIO}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+
+# ==========================================
+# CONFIG: ground truth index over Data/**/*.txt
+# ==========================================
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DATA_DIR = SCRIPT_DIR / "Data"
+CACHE_PATH = SCRIPT_DIR / ".cache" / "ground_truth.json"
+
+# Readme files that live next to the label files but are not labels
+IGNORED_FILES = {"LOEMIND.txt"}
+
+CACHE_VERSION = 1
+
+
+def parse_labels(text):
+    """Turns the comma-separated content of a label file ("S1.1,S1.2") into an exact rule ID set."""
+    return frozenset(part.strip() for part in text.replace("\n", ",").split(",") if part.strip())
+
+
+def category_key(category):
+    """
+    Normalizes a category to the Data/ relative folder form used as index key.
+    Accepts 'Synthetic/Single', 'Synthetic -> Single' (as in Results.load_data) or OS paths.
+    """
+    parts = [p.strip() for p in category.replace(" -> ", "/").replace(os.path.sep, "/").split("/")]
+    return "/".join(p for p in parts if p)
+
+
+class GroundTruthIndex:
+    """
+    Parsed ground truth labels for every Data/<category>/<file>.txt.
+
+    The parsed sets are persisted to CACHE_PATH together with each file's mtime, size and
+    sha1, so a refresh only re-reads label files that actually changed on disk.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, cache_path=CACHE_PATH):
+        self.data_dir = Path(data_dir)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._entries = {}   # "Category/File.txt" -> {"mtime_ns", "size", "sha1", "labels"}
+        self._labels = {}    # (category, file_name) -> frozenset of rule IDs
+        self._load_cache()
+
+    # -------------------------------------------------
+    # Persistence
+    # -------------------------------------------------
+    def _load_cache(self):
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if cached.get("version") == CACHE_VERSION and cached.get("data_dir") == str(self.data_dir):
+            self._entries = cached.get("files", {})
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "data_dir": str(self.data_dir), "files": self._entries}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    # -------------------------------------------------
+    # Refresh
+    # -------------------------------------------------
+    def refresh(self):
+        """
+        Re-stats every label file and re-parses only new or changed ones.
+        Returns the list of relative paths whose labels changed (added, edited or removed).
+        """
+        changed = []
+        seen = set()
+        dirty = False
+
+        for path in self.data_dir.rglob("*.txt"):
+            if path.name in IGNORED_FILES or not path.is_file():
+                continue
+            rel = path.relative_to(self.data_dir).as_posix()
+            seen.add(rel)
+
+            stat = path.stat()
+            entry = self._entries.get(rel)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+
+            raw = path.read_bytes()
+            sha1 = hashlib.sha1(raw).hexdigest()
+            if entry and entry["sha1"] == sha1:
+                # Touched but not edited: only the stat fields move
+                entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+                dirty = True
+                continue
+
+            labels = sorted(parse_labels(raw.decode("utf-8-sig")))
+            self._entries[rel] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": sha1, "labels": labels}
+            changed.append(rel)
+
+        for rel in set(self._entries) - seen:
+            del self._entries[rel]
+            changed.append(rel)
+
+        if changed or dirty:
+            self._save_cache()
+
+        self._labels = {}
+        for rel, entry in self._entries.items():
+            category, _, name = rel.rpartition("/")
+            self._labels[(category, name[:-len(".txt")])] = frozenset(entry["labels"])
+
+        return changed
+
+    # -------------------------------------------------
+    # Lookups
+    # -------------------------------------------------
+    def labels(self, category, file_name):
+        """Rule ID set for one file, or None when there is no ground truth file for it."""
+        return self._labels.get((category_key(category), file_name))
+
+    def is_present(self, category, file_name, rule_id):
+        labels = self.labels(category, file_name)
+        return labels is not None and rule_id in labels
+
+    def items(self):
+        """Yields ((category, file_name), labels) for every indexed file."""
+        return self._labels.items()
+
+    def __len__(self):
+        return len(self._labels)
+
+
+_index = None
+
+
+def get_index(refresh=True):
+    """Process-wide index over the default Data/ folder, refreshed against the disk on each call."""
+    global _index
+    if _index is None:
+        _index = GroundTruthIndex()
+        refresh = True
+    if refresh:
+        _index.refresh()
+    return _index
+
+
+if __name__ == "__main__":
+    index = GroundTruthIndex()
+    changed = index.refresh()
+    print(f"Indexed {len(index)} ground truth files from {index.data_dir}")
+    print(f"Re-parsed {len(changed)} changed files, cache: {index.cache_path}")
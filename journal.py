@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+
+# ==========================================
+# CONFIG: resumable run journal of the sweep
+# ==========================================
+
+# Kept inside the results folder it describes, so deleting the results also deletes the journal
+JOURNAL_NAME = ".sweep_journal.jsonl"
+
+# Job states, in the order a job goes through them
+QUEUED, IN_FLIGHT, DONE, FAILED = "queued", "in_flight", "done", "failed"
+
+# Fields that identify one job across runs
+KEY_FIELDS = ("provider", "model", "category", "file", "prompt_hash")
+
+# On open, the log is rewritten with only the latest record per job once it has this many times more lines than jobs
+COMPACT_RATIO = 4
+
+
+def prompt_hash(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def journal_path(results_dir):
+    return Path(results_dir) / JOURNAL_NAME
+
+
+class SweepJournal:
+    """
+    Append-only JSONL write-ahead log of job states. Every line is one record
+    {"provider", "model", "category", "file", "prompt_hash", "status", "run", "time", "error"};
+    the last record of a job wins. A line half-written by a crashed run is ignored on load.
+
+    A restarted sweep reads the log once and only runs the jobs whose latest state is not
+    done, so it does not have to stat every file of the Results/ tree.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.run_id = time.strftime("%Y%m%dT%H%M%S")
+        self.states = {}    # key tuple -> latest record
+        self.lines = 0
+        self._file = None
+        self._load()
+        if self.lines > COMPACT_RATIO * max(len(self.states), 1):
+            self.compact()
+
+    @staticmethod
+    def key(record):
+        return tuple(record[name] for name in KEY_FIELDS)
+
+    def _load(self):
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    key = self.key(record)
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue
+                self.states[key] = record
+                self.lines += 1
+
+    def compact(self):
+        """Rewrites the log with only the latest record of every job."""
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in self.states.values():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self.lines = len(self.states)
+
+    def status(self, key):
+        """Latest state of a job, or None when the journal has never seen it."""
+        record = self.states.get(key)
+        return record["status"] if record else None
+
+    def record(self, keys, status, error=None):
+        """Appends one record per key (a single key tuple or a list of them) and flushes it to disk."""
+        if isinstance(keys, tuple):
+            keys = [keys]
+        if not keys:
+            return
+        if self._file is None:
+            self._open()
+        now = time.time()
+        lines = []
+        for key in keys:
+            record = dict(zip(KEY_FIELDS, key), status=status, run=self.run_id, time=now)
+            if error:
+                record["error"] = error
+            self.states[key] = record
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.write("".join(lines))
+        self._file.flush()
+        self.lines += len(lines)
+
+    def _open(self):
+        """Opens the log for appending. A line half-written by a crashed run is ended first, so it does not swallow the next record."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        torn = False
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        except OSError:
+            # Missing or empty
+            pass
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if torn:
+            self._file.write("\n")
+
+    def counts(self):
+        counts = {}
+        for record in self.states.values():
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+        return counts
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
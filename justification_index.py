@@ -0,0 +1,290 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from result_files import BASE_DIR, LLM_MODELS, llm_folder
+from results_store import CACHE_DIR as RESULTS_CACHE_DIR, ResultsStore
+
+# ==========================================
+# CONFIG: inverted index over the justifications
+# ==========================================
+# Every per-smell record of Results/ is one document: its Justification split into lowercase
+# word tokens, plus the facets LLM, Category, File, Rule_ID and Outcome (TP/FP/TN/FN).
+# Postings are kept as (token, record) pairs sorted by token, so the records of a token are
+# one searchsorted slice. A changed or deleted result file only marks its old records dead
+# and appends the new ones; the index is rewritten without dead records once they outnumber
+# the live ones.
+# Outcome uses the labels stored in the result files, like Results.load_data(); --relabel
+# recomputes Actual and Outcome from the current Data/ label files, as
+# Results.apply_ground_truth() does, so the facets agree with "metrics --relabel".
+# Needs a Parquet engine for pandas (pip install pyarrow) to keep the index between runs;
+# without one it is rebuilt in memory on every search.
+
+INDEX_DIR = Path(__file__).resolve().parent / ".cache" / "justifications"
+INDEX_VERSION = 1
+
+TOKEN = re.compile(r"\w+")
+QUERY_TERM = re.compile(r"\w+\*?")
+FACETS = ['LLM', 'Category', 'File', 'Rule_ID', 'Outcome']
+RECORD_COLUMNS = ['LLM', 'Category', 'File', 'Source', 'Rule_ID', 'Actual', 'Detected', 'Outcome', 'Justification']
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower()) if isinstance(text, str) else []
+
+
+def outcomes(actual, detected):
+    """TP/FP/TN/FN per record, None where Actual or Detected is missing."""
+    result = np.full(len(actual), None, dtype=object)
+    known = actual.notna().to_numpy() & detected.notna().to_numpy()
+    a = actual.to_numpy(dtype=object)[known].astype(bool)
+    d = detected.to_numpy(dtype=object)[known].astype(bool)
+    result[known] = np.array(['TN', 'FP', 'FN', 'TP'], dtype=object)[a * 2 + d]
+    return result
+
+
+class JustificationIndex:
+    """
+    Persistent token -> record index of the justifications in INDEX_DIR:
+    records.parquet (one row per record, RECORD_COLUMNS), postings.npz (vocabulary, sorted
+    pairs, live mask) and manifest.json (sha1 of every indexed result file).
+
+        index = JustificationIndex()
+        index.update(["Claude Opus 4.5", "Gemini 3 Pro"])
+        index.search("foreign key", LLM="Claude Opus 4.5", Rule_ID="G6.3", Outcome="FP")
+    """
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = Path(index_dir)
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.records = pd.DataFrame({name: pd.Series(dtype=object) for name in RECORD_COLUMNS})
+        self.vocabulary = []                            # token id -> token
+        self.token_ids = {}                             # token -> token id
+        self.pair_tokens = np.empty(0, dtype=np.int32)  # sorted by token, then record
+        self.pair_records = np.empty(0, dtype=np.int32)
+        self.live = np.empty(0, dtype=bool)             # record id -> still in Results/
+        self.sources = {}                               # "LLM/rel path" -> sha1 of the indexed file
+        self.base_dir = None
+
+    # -------------------------------------------------
+    # Persistence
+    # -------------------------------------------------
+    def _load(self):
+        try:
+            with open(self.index_dir / "manifest.json", 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("version") != INDEX_VERSION:
+                return
+            records = pd.read_parquet(self.index_dir / "records.parquet")
+            with np.load(self.index_dir / "postings.npz", allow_pickle=False) as postings:
+                vocabulary = postings["vocabulary"].tolist()
+                pair_tokens, pair_records, live = postings["tokens"], postings["records"], postings["live"]
+        except (OSError, ValueError, KeyError, ImportError):
+            return
+        self.records = records.astype(object).where(records.notna(), None)
+        self.vocabulary, self.token_ids = vocabulary, {token: i for i, token in enumerate(vocabulary)}
+        self.pair_tokens, self.pair_records, self.live = pair_tokens, pair_records, live
+        self.sources, self.base_dir = manifest["sources"], manifest["base_dir"]
+
+    def save(self):
+        """Writes the three index files (each through a temporary file), manifest last."""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_records = self.index_dir / "records.parquet.tmp"
+        try:
+            self.records.to_parquet(tmp_records, index=False)
+        except ImportError:
+            print("Warning: no Parquet engine installed (pip install pyarrow), the justification index is not saved.")
+            return
+        tmp_postings = self.index_dir / "postings.tmp.npz"
+        np.savez(tmp_postings, vocabulary=np.array(self.vocabulary, dtype=str),
+                 tokens=self.pair_tokens, records=self.pair_records, live=self.live)
+        tmp_manifest = self.index_dir / "manifest.json.tmp"
+        with open(tmp_manifest, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "base_dir": self.base_dir, "sources": self.sources}, f)
+        os.replace(tmp_records, self.index_dir / "records.parquet")
+        os.replace(tmp_postings, self.index_dir / "postings.npz")
+        os.replace(tmp_manifest, self.index_dir / "manifest.json")
+
+    # -------------------------------------------------
+    # Update
+    # -------------------------------------------------
+    def update(self, models=LLM_MODELS, base_dir=BASE_DIR, save=True):
+        """
+        Indexes the new and changed result files of the given LLMs and drops the records of
+        deleted ones. Records come from ResultsStore, so only files it has not cached yet
+        are parsed. Returns the number of (re)indexed files.
+        """
+        base_dir = os.path.abspath(base_dir)
+        if self.base_dir not in (None, base_dir):
+            self._reset()   # index of another Results tree
+        self.base_dir = base_dir
+
+        stale, fresh = set(), []
+        for llm in models:
+            llm_path = llm_folder(llm, base_dir)
+            if not os.path.exists(llm_path):
+                print(f"Warning: Path not found for {llm}")
+                continue
+            store = ResultsStore(llm_path, cache_dir=RESULTS_CACHE_DIR)
+            table = store.load(['Source', 'Category', 'File', 'Rule_ID', 'Actual', 'Detected', 'Justification'])
+            prefix = f"{llm}/"
+            current = {prefix + rel: entry["sha1"] for rel, entry in store.entries.items()}
+            known = {source for source in self.sources if source.startswith(prefix)}
+
+            changed = {source for source, sha1 in current.items() if self.sources.get(source) != sha1}
+            stale |= (known - set(current)) | (changed & known)
+            if changed:
+                rows = table[table['Source'].isin({source[len(prefix):] for source in changed})]
+                fresh.append(rows.assign(LLM=llm))
+            for source in known - set(current):
+                del self.sources[source]
+            self.sources.update({source: current[source] for source in changed})
+
+        if stale:
+            keys = self.records['LLM'].astype(str) + "/" + self.records['Source'].astype(str)
+            self.live &= ~keys.isin(stale).to_numpy()
+        if fresh:
+            self._append(pd.concat(fresh, ignore_index=True))
+        if (~self.live).sum() > self.live.sum():
+            self.compact()
+        if save and (stale or fresh):
+            self.save()
+        return sum(frame['Source'].nunique() for frame in fresh)
+
+    def _append(self, rows):
+        """Adds rows as new records and merges their (token, record) pairs into the sorted postings."""
+        first = len(self.records)
+        rows = rows.assign(Outcome=outcomes(rows['Actual'], rows['Detected']))[RECORD_COLUMNS].astype(object)
+        rows = rows.where(rows.notna(), None)
+
+        pair_tokens, pair_records = [], []
+        for offset, text in enumerate(rows['Justification']):
+            for token in set(tokenize(text)):
+                token_id = self.token_ids.get(token)
+                if token_id is None:
+                    token_id = self.token_ids[token] = len(self.vocabulary)
+                    self.vocabulary.append(token)
+                pair_tokens.append(token_id)
+                pair_records.append(first + offset)
+
+        tokens = np.concatenate([self.pair_tokens, np.array(pair_tokens, dtype=np.int32)])
+        records = np.concatenate([self.pair_records, np.array(pair_records, dtype=np.int32)])
+        order = np.lexsort((records, tokens))
+        self.pair_tokens, self.pair_records = tokens[order], records[order]
+        self.records = pd.concat([self.records, rows], ignore_index=True)
+        self.live = np.concatenate([self.live, np.ones(len(rows), dtype=bool)])
+
+    def compact(self):
+        """Drops dead records and their pairs, renumbering the live records from 0."""
+        new_ids = np.cumsum(self.live) - 1
+        keep = self.live[self.pair_records]
+        self.pair_tokens = self.pair_tokens[keep]
+        self.pair_records = new_ids[self.pair_records[keep]].astype(np.int32)
+        self.records = self.records[self.live].reset_index(drop=True)
+        self.live = np.ones(len(self.records), dtype=bool)
+
+    def relabel(self, labels=None):
+        """
+        Sets Actual and Outcome of the loaded records from the current label files (a
+        ground_truth.GroundTruthIndex, default: Data/), like Results.apply_ground_truth().
+        Records of files without a label file get no Actual and no Outcome.
+        """
+        import ground_truth
+
+        labels = ground_truth.get_index() if labels is None else labels
+        actual = [None if (file_labels := labels.labels(category, file)) is None else rule_id in file_labels
+                  for category, file, rule_id in zip(self.records['Category'], self.records['File'], self.records['Rule_ID'])]
+        self.records['Actual'] = pd.Series(actual, index=self.records.index, dtype=object)
+        self.records['Outcome'] = outcomes(self.records['Actual'], self.records['Detected'])
+
+    # -------------------------------------------------
+    # Search
+    # -------------------------------------------------
+    def postings(self, term):
+        """Record ids (live or not) whose justification contains term; "word*" matches every token starting with word."""
+        if term.endswith("*"):
+            prefix = term[:-1]
+            ids = [self.postings(token) for token in self.vocabulary if token.startswith(prefix)]
+            return np.unique(np.concatenate(ids)) if ids else self.pair_records[:0]
+        token_id = self.token_ids.get(term)
+        if token_id is None:
+            return self.pair_records[:0]
+        start, end = np.searchsorted(self.pair_tokens, [token_id, token_id + 1])
+        return self.pair_records[start:end]
+
+    def search(self, text="", **facets):
+        """
+        Live records whose justification contains text as a phrase (its words in order, any
+        case and punctuation between them; a trailing * makes a word a prefix, "foreign key*"),
+        filtered by facets, e.g. LLM="Claude Opus 4.5", Rule_ID=["G6.3", "G6.4"], Outcome="FP".
+        The index of the result is the record id.
+        """
+        mask = self.live.copy()
+        for name, value in facets.items():
+            if name not in FACETS:
+                raise ValueError(f"Unknown facet '{name}', expected one of {FACETS}")
+            if value is not None:
+                values = [value] if isinstance(value, str) else list(value)
+                mask &= self.records[name].isin(values).to_numpy()
+
+        terms = QUERY_TERM.findall(text.lower())
+        for term in terms:
+            matches = np.zeros(len(mask), dtype=bool)
+            matches[self.postings(term)] = True
+            mask &= matches
+        result = self.records[mask]
+
+        if len(terms) > 1:
+            # Tokens are per record, so their order is checked on the (few) candidates
+            parts = [re.escape(term[:-1]) + r"\w*" if term.endswith("*") else re.escape(term) + r"\b" for term in terms]
+            phrase = re.compile(r"\b" + r"\W+".join(parts), re.IGNORECASE)
+            candidates = result['Justification']
+            result = result[np.fromiter((bool(phrase.search(text)) for text in candidates), dtype=bool, count=len(result))]
+        return result
+
+    def facet_counts(self, result, facets=('LLM', 'Rule_ID', 'Outcome')):
+        return {name: result[name].value_counts() for name in facets}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the justifications of the Results records.")
+    parser.add_argument("text", nargs="?", default="", help='words or phrase to look for, "word*" for a prefix')
+    parser.add_argument("--models", nargs="+", default=LLM_MODELS, help="LLM names to index, as in Results.load_data")
+    parser.add_argument("--llm", nargs="+", help="only these LLMs")
+    parser.add_argument("--rule", nargs="+", help="only these rule IDs")
+    parser.add_argument("--category", nargs="+", help="only these categories")
+    parser.add_argument("--outcome", nargs="+", choices=['TP', 'FP', 'TN', 'FN'])
+    parser.add_argument("--limit", type=int, default=20, help="records to print")
+    parser.add_argument("--relabel", action="store_true", help="outcomes against the current Data/ label files instead of the stored labels")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = JustificationIndex()
+    updated = index.update(args.models)
+    if args.relabel:
+        index.relabel()
+    ready = time.perf_counter()
+    result = index.search(args.text, LLM=args.llm, Rule_ID=args.rule, Category=args.category, Outcome=args.outcome)
+    searched = time.perf_counter()
+
+    with pd.option_context("display.width", 200, "display.max_colwidth", 120):
+        print(result[['LLM', 'Category', 'File', 'Rule_ID', 'Outcome', 'Justification']].head(args.limit).to_string())
+        for name, counts in (index.facet_counts(result) if len(result) else {}).items():
+            print(f"\n--- {name} ---")
+            print(counts[counts > 0].to_string())
+    print(f"\n{len(result)} of {int(index.live.sum())} records. Index: {updated} files updated in "
+          f"{(ready - start) * 1000:.0f} ms, search: {(searched - ready) * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
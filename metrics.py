@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+import scoring
+from scoring import COUNTS, SCORES
+
+# ==========================================
+# Confusion counts and scores for any grouping of the loaded Results
+# ==========================================
+# confusion_counts() turns the per-smell rows of Results.load_data into TP/FP/TN/FN per
+# LLM x Category x Rule_ID x File in one bincount pass; every coarser table (per LLM, per
+# rule, per category, ...) is a sum over that one, and the scores are derived from counts
+# with the formulas of scoring.py.
+
+KEYS = ['LLM', 'Category', 'Rule_ID', 'File']
+
+
+def confusion_counts(df, keys=KEYS):
+    """
+    One row per combination of keys (in order of first appearance) with its TP, FP, TN and FN.
+    Rows without an Actual or Detected value cannot be scored and are left out.
+    """
+    keys = [key for key in keys if key in df.columns]
+    valid = df['Actual'].notna() & df['Detected'].notna()
+    if not valid.all():
+        df = df[valid]
+
+    # Outcome of every row as one number, scoring.outcome() on whole columns: 0 TN, 1 FP, 2 FN, 3 TP
+    outcome = df['Actual'].to_numpy(dtype=bool).astype(np.int64) * 2 + df['Detected'].to_numpy(dtype=bool)
+
+    group = np.zeros(len(df), dtype=np.int64)
+    factors = []
+    for key in keys:
+        codes, uniques = pd.factorize(df[key], use_na_sentinel=False)
+        group = group * len(uniques) + codes
+        factors.append((codes, uniques))
+
+    ids, first, inverse = np.unique(group, return_index=True, return_inverse=True)
+    counts = np.bincount(inverse * 4 + outcome, minlength=len(ids) * 4).reshape(-1, 4)
+    order = np.argsort(first, kind="stable")
+    first = first[order]
+
+    table = pd.DataFrame({key: np.asarray(uniques.take(codes[first]), dtype=object)
+                          for key, (codes, uniques) in zip(keys, factors)})
+    for column in COUNTS:
+        table[column] = counts[order, scoring.OUTCOMES.index(column)]
+    return table
+
+
+def rollup(counts, keys=()):
+    """Sums a confusion_counts() table up to coarser keys (no keys: a single total row)."""
+    keys = list(keys)
+    if not keys:
+        return counts[COUNTS].sum().to_frame().T.reset_index(drop=True)
+    return counts.groupby(keys, sort=False, dropna=False)[COUNTS].sum().reset_index()
+
+
+def ratio(numerator, denominator):
+    """numerator / denominator, 0 where the denominator is 0 (like sklearn's zero_division=0)."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def score_arrays(tp, fp, tn, fn):
+    """{score: array} from count arrays of any (matching) shape, e.g. a whole stack of bootstrap resamples."""
+    return scoring.score_counts(tp, fp, tn, fn, ratio=ratio)
+
+
+def scores(counts):
+    """Adds the SCORES columns to a table of counts."""
+    counts = counts.copy()
+    for name, values in score_arrays(*(counts[column].to_numpy() for column in COUNTS)).items():
+        counts[name] = values
+    return counts
+
+
+def summarize(counts, keys=()):
+    """Scores per combination of keys, from a confusion_counts() table."""
+    return scores(rollup(counts, keys))
+
+
+def counts_for(df):
+    """
+    confusion_counts(df) over KEYS, for a plotting or metrics call to compute once and share
+    between its tables. Counted fresh on every call, so edits to df (relabeling, inplace
+    filtering) always show. A table that already holds counts (a confusion_counts() table
+    or a filtered part of it) is returned as it is.
+    """
+    if 'Actual' not in df.columns and all(column in df.columns for column in COUNTS):
+        return df
+    return confusion_counts(df)
@@ -0,0 +1,248 @@
+import os
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from api_clients.adapters import Attachment
+
+# ==========================================
+# CONFIG: page renders of the Data/ PDFs
+# ==========================================
+# Needs PyMuPDF (pip install pymupdf). Every page is rendered once per DPI of the ladder
+# and its text layer extracted; results are stored by PDF content hash, so all providers
+# and reruns share them.
+# "auto" decides per PDF on input tokens only: on the Data/ diagrams the readable rung
+# (mostly 110 dpi for their ~5.7 pt text) costs about 5% fewer tokens than the whole PDF,
+# but its PNGs upload about 30% more bytes than the PDF. Tokens are what is billed and
+# rate limited, so the renders are sent anyway; use --pages pdf to keep the uploads small.
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DATA_DIR = SCRIPT_DIR / "Data"
+CACHE_DIR = SCRIPT_DIR / ".cache" / "pages"
+
+# Resolution ladder in DPI, cheapest first
+RESOLUTIONS = (72, 110, 150)
+
+# The smallest text on a page should be at least this many pixels high to stay readable
+MIN_GLYPH_PX = 8
+
+# Rough input token costs used to compare representations: an image costs width*height/750
+# tokens up to IMAGE_TOKEN_CAP (the providers downscale larger images), a PDF page costs a
+# full-size page image plus its text, and text costs about one token per 4 characters.
+IMAGE_TOKEN_CAP = 1600
+CHARS_PER_TOKEN = 4
+
+MANIFEST_VERSION = 2
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def image_tokens(width, height):
+    return min(width * height // 750, IMAGE_TOKEN_CAP)
+
+
+def small_font_size(page):
+    """Font size (pt) of the smallest text on the page, ignoring the rare outliers (5th percentile)."""
+    sizes = sorted(
+        span["size"]
+        for block in page.get_text("dict")["blocks"] if block.get("type") == 0
+        for line in block["lines"]
+        for span in line["spans"] if span["text"].strip()
+    )
+    if not sizes:
+        return None
+    return sizes[int(len(sizes) * 0.05)]
+
+
+def split_pdf(pdf_path, cache_dir=CACHE_DIR, resolutions=RESOLUTIONS):
+    """
+    Renders every page of one PDF at every resolution and extracts its text layer.
+    Runs in a worker process; returns the manifest that is also written to the cache.
+    """
+    import pymupdf
+
+    sha = file_sha256(pdf_path)
+    out_dir = Path(cache_dir) / sha
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    pages = []
+    with pymupdf.open(pdf_path) as doc:
+        for index, page in enumerate(doc, start=1):
+            renders = {}
+            for dpi in resolutions:
+                name = f"p{index:03d}_{dpi}.png"
+                # Grayscale keeps the diagrams readable at under half the PNG size
+                pix = page.get_pixmap(dpi=dpi, colorspace=pymupdf.csGRAY)
+                pix.save(out_dir / name)
+                renders[str(dpi)] = {"file": name, "bytes": (out_dir / name).stat().st_size, "width": pix.width, "height": pix.height}
+
+            text = page.get_text().strip()
+            (out_dir / f"p{index:03d}.txt").write_text(text, encoding="utf-8")
+            pages.append({"index": index, "text_file": f"p{index:03d}.txt", "text_chars": len(text),
+                          "text_bytes": len(text.encode("utf-8")),
+                          "small_font_pt": small_font_size(page), "renders": renders})
+
+    manifest = {"version": MANIFEST_VERSION, "sha256": sha, "source": os.path.basename(pdf_path),
+                "pdf_bytes": os.path.getsize(pdf_path), "resolutions": list(resolutions), "pages": pages}
+    tmp_path = out_dir / "manifest.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, out_dir / "manifest.json")
+    return manifest
+
+
+class PageCache:
+    """Content-addressed page renders: .cache/pages/<pdf sha256>/{manifest.json, pNNN_<dpi>.png, pNNN.txt}."""
+
+    def __init__(self, cache_dir=CACHE_DIR, resolutions=RESOLUTIONS):
+        self.cache_dir = Path(cache_dir)
+        self.resolutions = tuple(resolutions)
+        self._shas = {}     # pdf path -> (mtime_ns, size, sha256)
+
+    def sha(self, pdf_path):
+        stat = os.stat(pdf_path)
+        cached = self._shas.get(pdf_path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        sha = file_sha256(pdf_path)
+        self._shas[pdf_path] = (stat.st_mtime_ns, stat.st_size, sha)
+        return sha
+
+    def manifest(self, pdf_path):
+        """Cached manifest of pdf_path, or None when it has not been split yet."""
+        path = self.cache_dir / self.sha(pdf_path) / "manifest.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("resolutions") != list(self.resolutions):
+            return None
+        return manifest
+
+    def prepare(self, pdf_paths, workers=None):
+        """Splits every PDF that is not cached yet, in a process pool. Returns {pdf path: manifest}."""
+        manifests = {path: self.manifest(path) for path in pdf_paths}
+        missing = [path for path, manifest in manifests.items() if manifest is None]
+        if missing:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {path: pool.submit(split_pdf, path, self.cache_dir, self.resolutions) for path in missing}
+                for path, future in futures.items():
+                    manifests[path] = future.result()
+        return manifests
+
+    def page_dpi(self, page):
+        """Cheapest rung of the ladder at which the page's smallest text is still MIN_GLYPH_PX high."""
+        size = page.get("small_font_pt")
+        if size:
+            for dpi in self.resolutions:
+                if size * dpi / 72 >= MIN_GLYPH_PX:
+                    return dpi
+        # Unknown or tiny text (e.g. outlined fonts): use the sharpest render
+        return self.resolutions[-1]
+
+    def choose_renders(self, manifest, representation="auto"):
+        """[(page, render)] for every page: "auto" picks each page's readable DPI, "<dpi>" a fixed one."""
+        chosen = []
+        for page in manifest["pages"]:
+            dpi = self.page_dpi(page) if representation == "auto" else int(representation)
+            chosen.append((page, page["renders"][str(dpi)]))
+        return chosen
+
+    @staticmethod
+    def estimate_tokens(manifest, chosen=None):
+        """Estimated input tokens of the page renders in chosen (plus text layer), or of the whole PDF when chosen is None."""
+        text_tokens = sum(page["text_chars"] for page in manifest["pages"]) // CHARS_PER_TOKEN
+        if chosen is None:
+            return len(manifest["pages"]) * IMAGE_TOKEN_CAP + text_tokens
+        return sum(image_tokens(render["width"], render["height"]) for _, render in chosen) + text_tokens
+
+    @staticmethod
+    def estimate_bytes(manifest, chosen=None):
+        """Upload size of the page renders in chosen plus the text layer, or of the whole PDF when chosen is None."""
+        if chosen is None:
+            return manifest["pdf_bytes"]
+        return sum(render["bytes"] for _, render in chosen) + sum(page["text_bytes"] for page in manifest["pages"])
+
+    def auto_renders(self, manifest):
+        """The "auto" choice for one PDF: [(page, render)] at each page's readable DPI, or None when the whole PDF costs no more input tokens."""
+        chosen = self.choose_renders(manifest)
+        if self.estimate_tokens(manifest, chosen) >= self.estimate_tokens(manifest):
+            return None
+        return chosen
+
+    def attachments(self, pdf_path, representation="auto"):
+        """
+        Attachments to send for one PDF.
+          "pdf"   - the whole file, as before
+          "<dpi>" - every page as PNG at that DPI plus the text layer
+          "auto"  - every page at its own readable DPI plus the text layer; falls back to
+                    the PDF itself when that would not cost fewer input tokens
+        """
+        name = os.path.basename(pdf_path)
+        if representation == "pdf":
+            with open(pdf_path, 'rb') as f:
+                return [Attachment(name, "application/pdf", f.read())]
+
+        manifest = self.manifest(pdf_path) or self.prepare([pdf_path])[pdf_path]
+        out_dir = self.cache_dir / manifest["sha256"]
+
+        chosen = self.auto_renders(manifest) if representation == "auto" else self.choose_renders(manifest, representation)
+        if chosen is None:
+            return self.attachments(pdf_path, "pdf")
+
+        attachments = []
+        texts = []
+        for page, render in chosen:
+            attachments.append(Attachment(f"{Path(name).stem}_p{page['index']:03d}.png", "image/png",
+                                          (out_dir / render["file"]).read_bytes()))
+            text = (out_dir / page["text_file"]).read_text(encoding="utf-8")
+            if text:
+                texts.append(f"--- Page {page['index']} ---\n{text}")
+        if texts:
+            attachments.append(Attachment(f"{Path(name).stem}.txt", "text/plain", "\n\n".join(texts).encode("utf-8")))
+        return attachments
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split the Data/ PDFs into cached page renders and report upload sizes.")
+    parser.add_argument("folders", nargs="*", default=[str(DATA_DIR)], help="folders to scan for PDFs (default: Data/)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    pdf_paths = sorted(str(p) for folder in args.folders for p in Path(folder).rglob("*.pdf"))
+    cache = PageCache()
+    cache.prepare(pdf_paths, args.workers)
+
+    header = f"{'PDF':<45} {'pdf KB':>8} {'pdf tok':>8} " + " ".join(f"{str(dpi) + ' dpi KB':>11}" for dpi in cache.resolutions)
+    print(header + f" {'auto KB':>8} {'auto tok':>8}")
+    totals = {}
+    for path in pdf_paths:
+        manifest = cache.manifest(path)
+        row = {"pdf KB": manifest["pdf_bytes"] / 1024, "pdf tok": cache.estimate_tokens(manifest)}
+        for dpi in cache.resolutions:
+            row[dpi] = sum(p["renders"][str(dpi)]["bytes"] for p in manifest["pages"]) / 1024
+        chosen = cache.auto_renders(manifest)
+        row["auto KB"] = cache.estimate_bytes(manifest, chosen) / 1024
+        row["auto tok"] = cache.estimate_tokens(manifest, chosen)
+        for key, value in row.items():
+            totals[key] = totals.get(key, 0) + value
+        print_row(os.path.relpath(path, DATA_DIR), row)
+
+    print_row("TOTAL", totals)
+
+
+def print_row(label, row):
+    print(f"{label:<45} " + " ".join(f"{value:{11 if isinstance(key, int) else 8}.0f}" for key, value in row.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+
+# ==========================================
+# CONFIG: one entry per LLM provider
+# ==========================================
+
+
+@dataclass(frozen=True)
+class Provider:
+    key: str            # short name used on the command line
+    results_dir: str    # Results/<results_dir>/<category>
+    model_name: str     # written to "llm_model" in every saved result
+    file_prefix: str = ""   # prefix the prompt asks the model to put in front of "file_name"
+
+    # API access (see api_clients/adapters.py)
+    api: str = ""           # request/response shape: openai_responses, anthropic_messages, gemini_generate, chat_completions
+    api_model: str = ""     # model id sent to the API
+    base_url: str = ""
+    api_key_env: str = ""
+    prompt_file: str = "gemini.txt"     # Prompts/<prompt_file>
+    max_concurrency: int = 4            # parallel requests per provider in a sweep
+    pool_size: int = 0                  # keep-alive connections per provider (0: max_concurrency)
+    max_tokens: int = 16000
+    structured_output: bool = True      # the API accepts validation.response_schema() (see api_clients/adapters.py)
+    # Starting rate limits; the x-ratelimit-* headers replace them (see api_clients/rate_limit.py)
+    requests_per_minute: int = 50
+    tokens_per_minute: int = 400000
+
+
+PROVIDERS = {
+    "gemini": Provider("gemini", "Gemini", "Gemini 3 Pro",
+                       api="gemini_generate", api_model="gemini-3-pro-preview",
+                       base_url="https://generativelanguage.googleapis.com/v1beta", api_key_env="GEMINI_API_KEY",
+                       prompt_file="gemini.txt"),
+    "chatgpt": Provider("chatgpt", "ChatGPT", "GPT-5.1", file_prefix="chatGPT_",
+                        api="openai_responses", api_model="gpt-5.1",
+                        base_url="https://api.openai.com/v1", api_key_env="OPENAI_API_KEY",
+                        prompt_file="chatGPT.txt"),
+    "claude": Provider("claude", "Claude", "Claude Opus 4.5", file_prefix="Claude_",
+                       api="anthropic_messages", api_model="claude-opus-4-5",
+                       base_url="https://api.anthropic.com/v1", api_key_env="ANTHROPIC_API_KEY",
+                       prompt_file="claude.txt"),
+    "grok": Provider("grok", "Grok", "Grok 4 Fast",
+                     api="chat_completions", api_model="grok-4-fast-reasoning",
+                     base_url="https://api.x.ai/v1", api_key_env="GROK_API_KEY"),
+    "deepseek": Provider("deepseek", "DeepSeek", "DeepSeek Chat",
+                         api="chat_completions", api_model="deepseek-chat",
+                         base_url="https://api.deepseek.com/v1", api_key_env="DEEPSEEK_API_KEY",
+                         max_tokens=8000, structured_output=False),  # json_object mode only, no schema
+}
+
+
+def get_provider(name):
+    """Looks up a provider by key, case-insensitive."""
+    try:
+        return PROVIDERS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown provider '{name}'. Known providers: {', '.join(PROVIDERS)}") from None
@@ -0,0 +1,281 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import contextlib
+from html import escape
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")   # headless: figures are only ever saved, never shown
+
+import pandas as pd
+
+import metrics
+
+# ==========================================
+# CONFIG: headless HTML/PNG report of Results.py
+# ==========================================
+# Every section of Results.ipynb is rendered by the same Results.py function, fed the
+# confusion counts slice it needs. Each section is cached in .cache/figures by a hash of
+# its function, arguments and counts slice, so after a new sweep only the sections whose
+# slice changed are rendered again.
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+CACHE_DIR = SCRIPT_DIR / ".cache" / "figures"
+OUTPUT_DIR = "Report"
+DPI = 110
+
+# Same groups and order as Results.ipynb
+CUSTOM_AGGREGATES = {
+    "Real World (Oppejoud + Yliopilased)": ["Oppejoud", "Yliopilased"],
+    "Synthetics (Single + Multi)": ["Synthetic -> Single", "Synthetic -> Multi"],
+}
+TARGET_ORDER = ["Oppejoud", "Yliopilased", "Synthetic -> Single", "Synthetic -> Multi"]
+
+# Code the figures depend on: a change to either file renders every section again
+SOURCES = ("Results.py", "metrics.py")
+
+
+def overall_metrics(counts):
+    """Metrics table, bar chart and confusion matrices of all data (first cell of Results.ipynb)."""
+    import Results
+
+    table = Results.metrics_from_counts(counts, grouping_col='LLM')
+    Results.display(table)
+    Results.plot_benchmark_bars(table, "Overall LLM Performance Comparison")
+    Results.plot_confusion_matrices(counts, title_prefix="Overall")
+
+
+def sections(counts):
+    """
+    (title, function name, args) of every report section, in notebook order. Functions are
+    looked up in this module first, then in Results. The counts passed are only the slice a
+    section reads, so a section's cache key changes only when its own data does.
+    """
+    def part(categories):
+        return counts[counts['Category'].isin(categories)].reset_index(drop=True)
+
+    everything = {"Overall (Real World + Synthetics)": list(counts['Category'].unique())}
+    plan = [("Overall Results (All Data)", "overall_metrics", (counts,))]
+    for name, categories in CUSTOM_AGGREGATES.items():
+        plan.append((name, "plot_custom_aggregates", (part(categories), {name: categories})))
+    for category in TARGET_ORDER:
+        plan.append((category, "plot_per_category", (part([category]), [category])))
+    plan += [
+        ("Hardest Smells", "plot_hardest_smells", (counts,)),
+        ("Hallucinations", "plot_hallucinations", (counts,)),
+        ("Paranoia Heatmap", "plot_paranoia_heatmap", (counts,)),
+    ]
+    for name, categories in {**everything, **CUSTOM_AGGREGATES}.items():
+        plan.append((f"Strategy Map: {name}", "plot_strategy_map", (part(categories), {name: categories})))
+    return plan
+
+
+def source_hash():
+    digest = hashlib.sha256()
+    for name in SOURCES:
+        with open(Path(__file__).with_name(name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def section_key(function, args, code_hash):
+    """Hash of the code, the function name and its arguments (DataFrames by their content)."""
+    digest = hashlib.sha256(f"{code_hash}\0{function}".encode())
+    for arg in args:
+        if isinstance(arg, pd.DataFrame):
+            digest.update(json.dumps(list(map(str, arg.columns))).encode())
+            digest.update(pd.util.hash_pandas_object(arg, index=False).to_numpy().tobytes())
+        else:
+            digest.update(json.dumps(arg, sort_keys=True, default=str).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()[:24]
+
+
+# ==========================================
+# RENDERING (runs in the worker processes)
+# ==========================================
+
+class Capture:
+    """
+    Stands in for stdout, IPython's display() and plt.show() while one section renders and
+    collects what the notebook would have shown as blocks: ("text", str), ("html", str) or
+    ("image", PNG file name in the cache dir).
+    """
+
+    def __init__(self, key, cache_dir):
+        self.key = key
+        self.cache_dir = Path(cache_dir)
+        self.blocks = []
+
+    def write(self, text):
+        if self.blocks and self.blocks[-1][0] == "text":
+            self.blocks[-1] = ("text", self.blocks[-1][1] + text)
+        else:
+            self.blocks.append(("text", text))
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def display(self, obj):
+        if isinstance(obj, pd.DataFrame):
+            self.blocks.append(("html", obj.to_html(index=False, float_format="{:.3f}".format)))
+        elif hasattr(obj, "data"):     # IPython.display.HTML
+            self.blocks.append(("html", obj.data))
+        else:
+            self.write(f"{obj}\n")
+
+    def show(self):
+        import matplotlib.pyplot as plt
+
+        for number in plt.get_fignums():
+            name = f"{self.key}-{sum(kind == 'image' for kind, _ in self.blocks)}.png"
+            tmp_path = self.cache_dir / f"{name}.tmp"
+            plt.figure(number).savefig(tmp_path, format="png", dpi=DPI, bbox_inches="tight")
+            os.replace(tmp_path, self.cache_dir / name)
+            self.blocks.append(("image", name))
+        plt.close("all")
+
+
+_capture = None     # Capture of the section being rendered in this process
+
+
+def show():
+    _capture.show()
+
+
+def display(obj):
+    _capture.display(obj)
+
+
+def render(function, args, key, cache_dir):
+    """Renders one section and saves its blocks to <cache_dir>/<key>.json; returns the blocks."""
+    import Results
+    import matplotlib.pyplot as plt
+
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    global _capture
+    capture = _capture = Capture(key, cache_dir)
+    target = globals().get(function) or getattr(Results, function)
+    # Restored afterwards: on the serial path this runs in the caller's process, e.g. a notebook
+    originals = Results.display, plt.show
+    Results.display, plt.show = display, show
+    try:
+        with contextlib.redirect_stdout(capture):
+            target(*args)
+        capture.show()      # a figure left open without a plt.show()
+    finally:
+        Results.display, plt.show = originals
+        _capture = None
+
+    tmp_path = Path(cache_dir) / f"{key}.json.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(capture.blocks, f, ensure_ascii=False)
+    os.replace(tmp_path, Path(cache_dir) / f"{key}.json")
+    return capture.blocks
+
+
+def cached_blocks(key, cache_dir):
+    """Blocks of an already rendered section, or None when it (or one of its images) is missing."""
+    try:
+        with open(Path(cache_dir) / f"{key}.json", 'r', encoding='utf-8') as f:
+            blocks = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if any(kind == "image" and not (Path(cache_dir) / value).exists() for kind, value in blocks):
+        return None
+    return blocks
+
+
+# ==========================================
+# REPORT
+# ==========================================
+
+def build_report(counts, output_dir=OUTPUT_DIR, cache_dir=CACHE_DIR, workers=None):
+    """
+    Renders every section (only the ones not in the cache, in parallel when there is more
+    than one CPU) and writes <output_dir>/index.html with its PNGs in <output_dir>/figures.
+    Returns (sections, rendered).
+    """
+    code_hash = source_hash()
+    plan = [(title, function, args, section_key(function, args, code_hash))
+            for title, function, args in sections(counts)]
+
+    blocks = {key: cached_blocks(key, cache_dir) for _, _, _, key in plan}
+    todo = [(function, args, key) for _, function, args, key in plan if blocks[key] is None]
+    todo = list({key: (function, args, key) for function, args, key in todo}.values())
+
+    workers = workers or os.cpu_count() or 1
+    if len(todo) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            futures = {key: pool.submit(render, function, args, key, cache_dir) for function, args, key in todo}
+            for key, future in futures.items():
+                blocks[key] = future.result()
+    else:
+        for function, args, key in todo:
+            blocks[key] = render(function, args, key, cache_dir)
+
+    figures_dir = Path(output_dir) / "figures"
+    figures_dir.mkdir(parents=True, exist_ok=True)
+    html = ["<!DOCTYPE html>", "<html><head><meta charset='utf-8'><title>LLM Model Smell Detection Results</title>",
+            "<style>body{font-family:sans-serif;max-width:1400px;margin:auto}img{max-width:100%}"
+            "table{border-collapse:collapse}td,th{padding:2px 8px;text-align:right}</style></head><body>",
+            "<h1>LLM Model Smell Detection Results</h1>"]
+    for title, _, _, key in plan:
+        html.append(f"<h2>{escape(title)}</h2>")
+        for kind, value in blocks[key]:
+            if kind == "image":
+                target = figures_dir / value
+                if not target.exists():
+                    shutil.copyfile(Path(cache_dir) / value, target)
+                html.append(f"<img src='figures/{value}'>")
+            elif kind == "html":
+                html.append(value)
+            elif value.strip():
+                html.append(f"<pre>{escape(value.strip())}</pre>")
+    html.append("</body></html>")
+
+    # Figures of sections that changed since the last report
+    used = {value for _, _, _, key in plan for kind, value in blocks[key] if kind == "image"}
+    for path in figures_dir.glob("*.png"):
+        if path.name not in used:
+            path.unlink()
+
+    tmp_path = Path(output_dir) / "index.html.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(html))
+    os.replace(tmp_path, Path(output_dir) / "index.html")
+    return len(plan), len(todo)
+
+
+def main():
+    import Results
+
+    parser = argparse.ArgumentParser(description="Render every Results.py figure into an HTML/PNG report, without Jupyter.")
+    parser.add_argument("--models", nargs="+", default=list(Results.llm_colors), help="LLM names as in Results.load_data")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="report folder (index.html + figures/)")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true", help="render every section again")
+    parser.add_argument("--relabel", action="store_true", help="score against the current Data/ label files (see Results.apply_ground_truth)")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    start = time.perf_counter()
+    df = Results.load_data(args.models, justifications=False, relabel=args.relabel)
+    if df.empty:
+        sys.exit("No results loaded.")
+    total, rendered = build_report(metrics.counts_for(df), args.output, workers=args.workers)
+    print(f"{total} sections ({rendered} rendered, {total - rendered} from cache) -> "
+          f"{os.path.join(args.output, 'index.html')} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+
+# ==========================================
+# CONFIG: on-disk cache of raw LLM replies
+# ==========================================
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+CACHE_DIR = SCRIPT_DIR / ".cache" / "responses"
+
+# Least recently used replies are evicted above this size
+MAX_BYTES = 512 * 1024 * 1024
+
+
+def cache_key(model, prompt, attachments, params=None):
+    """
+    Content address of one request: sha256 over the model id, the exact prompt text,
+    the bytes of every attached file and the decoding parameters.
+    """
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8") + b"\0")
+    digest.update(hashlib.sha256(prompt.encode("utf-8")).digest())
+    for attachment in attachments:
+        digest.update(attachment.mime_type.encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(attachment.data).digest())
+    digest.update(json.dumps(params or {}, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Reply texts stored as .cache/responses/<key[:2]>/<key>.json.
+
+    A hit touches the file's mtime, so eviction (oldest mtime first) is LRU across runs.
+    With bypass=True every lookup is a miss but fresh replies are still stored.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES, bypass=False):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sizes = {}    # key -> bytes on disk
+        for path in self.cache_dir.glob("*/*.json"):
+            self._sizes[path.stem] = path.stat().st_size
+        self.total_bytes = sum(self._sizes.values())
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """Cached reply text for key, or None."""
+        if self.bypass or key not in self._sizes:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, json.JSONDecodeError):
+            self._forget(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["text"]
+
+    def put(self, key, text, meta=None):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"text": text, "meta": meta or {}}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        self.total_bytes -= self._sizes.get(key, 0)
+        self._sizes[key] = path.stat().st_size
+        self.total_bytes += self._sizes[key]
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits into max_bytes."""
+        entries = []
+        for key in self._sizes:
+            try:
+                entries.append((self._path(key).stat().st_mtime_ns, key))
+            except OSError:
+                entries.append((0, key))
+        for _, key in sorted(entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._forget(key)
+            self.evictions += 1
+
+    def _forget(self, key):
+        self.total_bytes -= self._sizes.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._sizes),
+            "bytes": self.total_bytes,
+        }
+
+    def __len__(self):
+        return len(self._sizes)
+
+
+if __name__ == "__main__":
+    cache = ResponseCache()
+    print(f"Response cache {cache.cache_dir}: {len(cache)} entries, {cache.total_bytes / 1024 / 1024:.1f} MB")
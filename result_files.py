@@ -0,0 +1,79 @@
+import os
+import json
+import hashlib
+from itertools import repeat
+
+# ==========================================
+# Result files on disk: folder layout and per-smell records
+# ==========================================
+# Standard library only, so scripts that only need counts (see results_cli.py) start without
+# pandas; results_store.py builds its cached tables from the same parser.
+
+BASE_DIR = "Results"
+
+# Same names as Results.llm_colors; a name's first word is its folder under BASE_DIR
+LLM_MODELS = ['ChatGPT 5.1', 'Claude Opus 4.5', 'Gemini 3 Pro']
+
+# Columns of one per-smell record; "Source" is the result file relative to the LLM folder
+COLUMNS = ['Source', 'Category', 'File', 'Rule_ID', 'Actual', 'Detected', 'Justification']
+
+
+def llm_folder(llm, base_dir=BASE_DIR):
+    """Results folder of an LLM, e.g. 'Gemini 3 Pro' -> Results/Gemini."""
+    return os.path.join(base_dir, llm.split()[0])
+
+
+def list_result_files(llm_path):
+    """(full path, rel path, category) of every *.json under llm_path, in os.walk order."""
+    files = []
+    for root, _, names in os.walk(llm_path):
+        category = result_category(os.path.relpath(root, llm_path))
+        for name in names:
+            if name.endswith(".json"):
+                full_path = os.path.join(root, name)
+                files.append((full_path, os.path.relpath(full_path, llm_path).replace(os.path.sep, "/"), category))
+    return files
+
+
+def result_category(rel_dir):
+    """Category of a result folder relative to the LLM folder, e.g. 'Synthetic/Single' -> 'Synthetic -> Single'."""
+    category = rel_dir.replace(os.path.sep, " -> ").replace("/", " -> ")
+    return "Uncategorized" if category == "." else category
+
+
+def parse_batch(batch, justifications=True):
+    """
+    Reads and parses a batch of (full path, rel path, category) result files, in a worker
+    process for large loads. Returns ({column: list of values}, {rel path: manifest entry});
+    the columns hold the records of all files in batch order, without Justification when
+    justifications is False.
+    """
+    columns = {name: [] for name in COLUMNS if justifications or name != 'Justification'}
+    entries = {}
+    for full_path, rel, category in batch:
+        entry = {"mtime_ns": 0, "size": 0, "sha1": None, "error": None}
+        entries[rel] = entry
+        try:
+            stat = os.stat(full_path)
+            with open(full_path, 'rb') as f:
+                raw = f.read()
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size, sha1=hashlib.sha1(raw).hexdigest())
+            data = json.loads(raw)
+            rows = [(smell.get('rule_id'), smell.get('actual'), smell.get('detected'), smell.get('justification'))
+                    for smell in data.get('smell_analysis', [])]
+        except Exception as e:
+            entry["error"] = str(e)
+            continue
+
+        count = len(rows)
+        columns['Source'].extend(repeat(rel, count))
+        columns['Category'].extend(repeat(category, count))
+        columns['File'].extend(repeat(data.get('file_name'), count))
+        for rule_id, actual, detected, justification in rows:
+            columns['Rule_ID'].append(rule_id)
+            columns['Actual'].append(actual)
+            columns['Detected'].append(detected)
+            if justifications:
+                columns['Justification'].append(justification)
+    return columns, entries
+
@@ -0,0 +1,188 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import importlib
+import subprocess
+
+from result_files import BASE_DIR, LLM_MODELS, llm_folder, list_result_files, parse_batch
+from scoring import COUNTS, POSITIONS, outcome, score_counts
+
+# ==========================================
+# CONFIG: command line entry point of the Results analysis
+# ==========================================
+# "metrics" only needs the standard library: it counts TP/FP/TN/FN straight from the result
+# files, with the definitions metrics.py uses too (scoring.py), so a cron job or CI gate gets the tables
+# without importing pandas, matplotlib, seaborn or IPython. The other commands import their
+# module (and its dependencies) only when they are run.
+#
+#   python results_cli.py metrics [--by LLM|Category] [--format text|csv|json] [--min-f1 0.7]
+#   python results_cli.py report [...]          -> report.py
+#   python results_cli.py significance [...]    -> significance.py
+#   python results_cli.py search [...]          -> justification_index.py
+#   python results_cli.py budget                -> cold start time of "metrics" vs IMPORT_BUDGET_MS
+
+DELEGATED = {"report": "report", "significance": "significance", "search": "justification_index"}
+
+# Cold start budget of "results_cli.py metrics --format json" on a one-file Results tree
+# (interpreter start-up included)
+IMPORT_BUDGET_MS = 150
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib", "seaborn", "IPython", "sklearn", "scipy")
+
+SCORES = ['Accuracy', 'Precision', 'Recall', 'F1-Score', 'Sample Size']    # columns printed, scoring.SCORES without FPR
+
+
+def count_results(models, base_dir=BASE_DIR, labels=None):
+    """
+    {(LLM, Category): [TP, FP, TN, FN]} over every result file, in model and folder order.
+    With a ground_truth.GroundTruthIndex as labels, Actual comes from the current label files
+    instead of the result files (like Results.load_data(relabel=True)).
+    """
+    counts = {}
+    # A name given twice is counted once, like Results.load_data()
+    for llm in dict.fromkeys(models):
+        llm_path = llm_folder(llm, base_dir)
+        if not os.path.exists(llm_path):
+            print(f"Warning: Path not found for {llm}", file=sys.stderr)
+            continue
+        columns, entries = parse_batch(list_result_files(llm_path), justifications=False)
+        for rel, entry in entries.items():
+            if entry["error"]:
+                print(f"Error reading {os.path.join(llm_path, rel)}: {entry['error']}", file=sys.stderr)
+
+        if labels is not None:
+            columns['Actual'] = [None if (file_labels := labels.labels(category, file)) is None else rule_id in file_labels
+                                 for category, file, rule_id in zip(columns['Category'], columns['File'], columns['Rule_ID'])]
+
+        for category, actual, detected in zip(columns['Category'], columns['Actual'], columns['Detected']):
+            if actual is None or detected is None:
+                continue
+            row = counts.setdefault((llm, category), [0, 0, 0, 0])
+            row[POSITIONS[outcome(actual, detected)]] += 1
+    return counts
+
+
+def metric_rows(counts, by):
+    """Rows of scores per LLM (by="LLM") or per LLM and Category (by="Category")."""
+    grouped = {}
+    for (llm, category), row in counts.items():
+        key = (llm,) if by == "LLM" else (llm, category)
+        total = grouped.setdefault(key, [0, 0, 0, 0])
+        for index, value in enumerate(row):
+            total[index] += value
+    names = ['LLM'] if by == "LLM" else ['LLM', 'Category']
+    return [dict(zip(names, key), **dict(zip(COUNTS, row)), **score_counts(*row)) for key, row in grouped.items()]
+
+
+def format_rows(rows, columns, output_format):
+    if output_format == "json":
+        return json.dumps([{name: row[name] for name in columns} for row in rows], indent=2, ensure_ascii=False)
+    if output_format == "csv":
+        import csv, io
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, columns, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue().rstrip("\n")
+
+    cells = [[f"{row[name]:.3f}" if isinstance(row[name], float) else str(row[name]) for name in columns] for row in rows]
+    widths = [max(len(name), *(len(line[i]) for line in cells)) for i, name in enumerate(columns)]
+    lines = ["  ".join(name.rjust(width) for name, width in zip(columns, widths))]
+    lines += ["  ".join(cell.rjust(width) for cell, width in zip(line, widths)) for line in cells]
+    return "\n".join(lines)
+
+
+def metrics_main(argv):
+    parser = argparse.ArgumentParser(prog="results_cli.py metrics", description="Accuracy, Precision, Recall and F1 per LLM, without the plotting stack.")
+    parser.add_argument("--models", nargs="+", default=LLM_MODELS, help="LLM names as in Results.load_data")
+    parser.add_argument("--base-dir", default=BASE_DIR)
+    parser.add_argument("--by", choices=["LLM", "Category"], nargs="+", default=["LLM", "Category"], help="tables to print")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--counts", action="store_true", help="also print TP, FP, TN and FN")
+    parser.add_argument("--relabel", action="store_true", help="score against the current Data/ label files instead of the stored labels")
+    parser.add_argument("--min-f1", type=float, default=None, help="exit with status 1 when an LLM's overall F1-Score is below this")
+    args = parser.parse_args(argv)
+
+    labels = None
+    if args.relabel:
+        import ground_truth
+        labels = ground_truth.get_index()
+    counts = count_results(args.models, args.base_dir, labels)
+    if not counts:
+        sys.exit("No results loaded.")
+
+    for by in args.by:
+        rows = metric_rows(counts, by)
+        columns = (['LLM'] if by == "LLM" else ['LLM', 'Category']) + (COUNTS if args.counts else []) + SCORES
+        if args.format == "text":
+            print(f"--- Metrics per {'LLM' if by == 'LLM' else 'LLM and Category'} ---")
+        print(format_rows(rows, columns, args.format))
+        if args.format == "text":
+            print()
+
+    if args.min_f1 is not None:
+        failing = [row['LLM'] for row in metric_rows(counts, "LLM") if row['F1-Score'] < args.min_f1]
+        if failing:
+            print(f"F1-Score below {args.min_f1}: {', '.join(failing)}", file=sys.stderr)
+            sys.exit(1)
+
+
+def write_fixture(base_dir):
+    """One result file of the first LLM under base_dir: enough for every step of "metrics", in no time."""
+    folder = os.path.join(llm_folder(LLM_MODELS[0], base_dir), "Oppejoud")
+    os.makedirs(folder, exist_ok=True)
+    smells = [{"rule_id": rule_id, "actual": actual, "detected": detected, "justification": ""}
+              for rule_id, actual, detected in (("G5.1", True, True), ("S1.1", False, True), ("N1.1", True, False))]
+    with open(os.path.join(folder, "Kool.json"), 'w', encoding='utf-8') as f:
+        json.dump({"file_name": "Kool", "llm_model": LLM_MODELS[0], "smell_analysis": smells}, f)
+
+
+def budget_main(argv):
+    """
+    Times "metrics --format json" cold starts on a fixture Results tree (best of --runs) and
+    checks that a real metrics_main() call imports no heavy module.
+    """
+    parser = argparse.ArgumentParser(prog="results_cli.py budget", description="Cold start time of the metrics command against IMPORT_BUDGET_MS.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        write_fixture(base_dir)
+        metrics_argv = ["--base-dir", base_dir, "--models", LLM_MODELS[0], "--format", "json"]
+        command = [sys.executable, os.path.abspath(__file__), "metrics", *metrics_argv]
+        best = float("inf")
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            best = min(best, (time.perf_counter() - start) * 1000)
+
+        probe = (f"import sys, contextlib; sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r}); import results_cli\n"
+                 f"with contextlib.redirect_stdout(None): results_cli.metrics_main({metrics_argv!r})\n"
+                 f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+        heavy = subprocess.run([sys.executable, "-c", probe], check=True, capture_output=True, text=True).stdout.split()
+
+    print(f"metrics cold start: {best:.0f} ms (budget {args.budget_ms:.0f} ms), heavy imports: {', '.join(heavy) or 'none'}")
+    if best > args.budget_ms or heavy:
+        sys.exit(1)
+
+def main():
+    commands = ["metrics", "budget", *DELEGATED]
+    if len(sys.argv) < 2 or sys.argv[1] not in commands:
+        sys.exit(f"usage: results_cli.py {{{','.join(commands)}}} [options]")
+    command, argv = sys.argv[1], sys.argv[2:]
+
+    if command == "metrics":
+        metrics_main(argv)
+    elif command == "budget":
+        budget_main(argv)
+    else:
+        # The module parses sys.argv itself
+        sys.argv = [f"results_cli.py {command}", *argv]
+        importlib.import_module(DELEGATED[command]).main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from result_files import COLUMNS, result_category, parse_batch
+
+# ==========================================
+# CONFIG: columnar cache of the flattened Results/ records
+# ==========================================
+# Needs a Parquet engine for pandas (pip install pyarrow); without one every load
+# parses all JSON files, as before.
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = SCRIPT_DIR / "Results"
+CACHE_DIR = SCRIPT_DIR / ".cache" / "results"
+
+# Columns with few distinct values, returned as pandas categoricals
+CATEGORICAL = ['Category', 'File', 'Rule_ID']
+
+# Below this many files to parse, a worker pool costs more to start than it saves
+PARALLEL_MIN_FILES = 256
+BATCH_FILES = 128
+
+STORE_VERSION = 1
+
+
+def parse_files(files, justifications=True, workers=None):
+    """parse_batch() over all files, spread over a process pool when there are many. Returns (DataFrame, entries)."""
+    batches = [files[i:i + BATCH_FILES] for i in range(0, len(files), BATCH_FILES)]
+    if len(files) >= PARALLEL_MIN_FILES and (workers or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_batch, batches, repeat(justifications)))
+    else:
+        results = [parse_batch(batch, justifications) for batch in batches]
+
+    names = [name for name in COLUMNS if justifications or name != 'Justification']
+    columns = {name: [] for name in names}
+    entries = {}
+    for batch_columns, batch_entries in results:
+        for name in names:
+            columns[name].extend(batch_columns[name])
+        entries.update(batch_entries)
+    return pd.DataFrame(columns, columns=names), entries
+
+
+def as_categorical(frame, names=CATEGORICAL):
+    for name in names:
+        if name in frame.columns and not isinstance(frame[name].dtype, pd.CategoricalDtype):
+            frame[name] = frame[name].astype('category')
+    return frame
+
+
+def concat_categorical(frames, names=CATEGORICAL):
+    """pd.concat that keeps categorical columns categorical, by giving every frame the union of their categories."""
+    for name in names:
+        if not all(name in frame.columns for frame in frames):
+            continue
+        categories = pd.api.types.union_categoricals([frame[name].array for frame in frames]).categories
+        for frame in frames:
+            frame[name] = frame[name].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+class ResultsStore:
+    """
+    Flattened records of every *.json under one Results/<LLM> folder, kept as a Parquet table
+    in CACHE_DIR next to a manifest of each source file's mtime, size and sha1.
+
+    load() re-stats the folder and parses only new or changed files (in a process pool when
+    there are many); the records of unchanged files come from the table, and records of
+    deleted files are dropped. Columns that are not asked for are not read from the table,
+    so the justification strings stay on disk when only the labels are needed.
+    """
+
+    def __init__(self, llm_path, cache_dir=CACHE_DIR, workers=None):
+        self.llm_path = os.path.abspath(llm_path)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.workers = workers
+        digest = hashlib.sha256(self.llm_path.encode("utf-8")).hexdigest()[:12]
+        name = f"{os.path.basename(self.llm_path)}-{digest}"
+        self.table_path = self.cache_dir / f"{name}.parquet" if self.cache_dir else None
+        self.manifest_path = self.cache_dir / f"{name}.json" if self.cache_dir else None
+        self.parsed = 0     # files parsed by the last load()
+        self.entries = {}   # rel path -> manifest entry (mtime_ns, size, sha1, error) after load()
+
+    # -------------------------------------------------
+    # Persistence
+    # -------------------------------------------------
+    def _load_manifest(self):
+        """Manifest entries of the cached table, or None when there is no usable cache."""
+        if not self.cache_dir or not self.manifest_path.exists() or not self.table_path.exists():
+            return None
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest.get("files", {}) if manifest.get("version") == STORE_VERSION else None
+
+    def _read_table(self, columns=None):
+        try:
+            return pd.read_parquet(self.table_path, columns=columns)
+        except (OSError, ValueError, ImportError):
+            return None
+
+    def _save_cache(self, entries, table=None):
+        """Writes the manifest, and the table first when it changed (a manifest never describes an unwritten table)."""
+        if not self.cache_dir:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if table is not None:
+            tmp_table = self.table_path.with_suffix(".parquet.tmp")
+            try:
+                table.to_parquet(tmp_table, index=False)
+            except ImportError:
+                print("Warning: no Parquet engine installed (pip install pyarrow), Results are not cached.")
+                self.cache_dir = None
+                return
+            os.replace(tmp_table, self.table_path)
+        tmp_manifest = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_manifest, 'w', encoding='utf-8') as f:
+            json.dump({"version": STORE_VERSION, "llm_path": self.llm_path, "files": entries}, f)
+        os.replace(tmp_manifest, self.manifest_path)
+
+    # -------------------------------------------------
+    # Load
+    # -------------------------------------------------
+    def _scan(self, entries):
+        """
+        Walks the folder against the manifest entries. Returns (every rel path in walk order,
+        (full path, rel path, category) of new or edited files, whether a stat field moved).
+        """
+        order = []
+        to_parse = []
+        dirty = False
+        for root, _, files in os.walk(self.llm_path):
+            category = None
+            for file in files:
+                if not file.endswith(".json"):
+                    continue
+                full_path = os.path.join(root, file)
+                rel = os.path.relpath(full_path, self.llm_path).replace(os.path.sep, "/")
+                order.append(rel)
+
+                entry = entries.get(rel)
+                if entry:
+                    stat = os.stat(full_path)
+                    if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                        continue
+                    with open(full_path, 'rb') as f:
+                        if hashlib.sha1(f.read()).hexdigest() == entry["sha1"]:
+                            # Touched but not edited: only the stat fields move
+                            entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+                            dirty = True
+                            continue
+
+                if category is None:
+                    category = result_category(os.path.relpath(root, self.llm_path))
+                to_parse.append((full_path, rel, category))
+        return order, to_parse, dirty
+
+    def load(self, columns=None):
+        """
+        DataFrame with the requested COLUMNS (all by default), rows in os.walk order of the
+        source files. Category, File and Rule_ID are categoricals.
+        """
+        columns = [name for name in COLUMNS if name in (columns or COLUMNS)]
+        entries = self._load_manifest()
+        table = None
+        if entries is not None:
+            order, to_parse, dirty = self._scan(entries)
+            removed = set(entries) - set(order)
+            # Unchanged folder: only the requested columns are read. Otherwise the whole table is rewritten
+            table = self._read_table(columns if not to_parse and not removed else None)
+        if table is None:
+            entries = {}
+            order, to_parse, dirty = self._scan(entries)
+            removed = set()
+        for rel in removed:
+            del entries[rel]
+        self.parsed = len(to_parse)
+
+        if table is not None and not to_parse and not removed:
+            if dirty:
+                self._save_cache(entries)
+            result = table
+        else:
+            # The cache always keeps every column, so a later load can still ask for the justifications
+            fresh, fresh_entries = parse_files(to_parse, self.cache_dir is not None or 'Justification' in columns, self.workers)
+            entries.update(fresh_entries)
+            if table is not None:
+                reparsed = set(fresh_entries)
+                table = table[~table['Source'].isin(reparsed | removed)]
+                result = pd.concat([table, fresh], ignore_index=True) if len(fresh) else table
+                # Rows of a file stay together, files in walk order, like a fresh parse
+                position = {rel: index for index, rel in enumerate(order)}
+                result = result.iloc[result['Source'].map(position).argsort(kind="stable")].reset_index(drop=True)
+                result = result.infer_objects()
+            else:
+                result = fresh
+            self._save_cache(entries, result)
+            result = result[columns]
+
+        self.entries = entries
+        for rel in order:
+            if entries[rel]["error"]:
+                print(f"Error reading {os.path.join(self.llm_path, rel)}: {entries[rel]['error']}")
+        return as_categorical(result)
+
+
+# ==========================================
+# LOAD BENCHMARK
+# ==========================================
+
+def build_tree(source_dir, target_dir, scale):
+    """Copies every result file of source_dir scale times into target_dir (copy n of a.json becomes a_n.json)."""
+    count = 0
+    for root, _, files in os.walk(source_dir):
+        out_dir = os.path.join(target_dir, os.path.relpath(root, source_dir))
+        os.makedirs(out_dir, exist_ok=True)
+        for file in files:
+            if file.endswith(".json"):
+                for n in range(scale):
+                    shutil.copyfile(os.path.join(root, file), os.path.join(out_dir, f"{file[:-5]}_{n}.json"))
+                    count += 1
+    return count
+
+
+def legacy_load(llm_path, llm):
+    """The one-dict-per-record loop Results.load_data used before the store, for comparison."""
+    records = []
+    for root, _, files in os.walk(llm_path):
+        for file in files:
+            if file.endswith(".json"):
+                with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for smell in data.get('smell_analysis', []):
+                    records.append({'LLM': llm, 'Category': result_category(os.path.relpath(root, llm_path)),
+                                    'File': data.get('file_name'), 'Rule_ID': smell.get('rule_id'),
+                                    'Actual': smell.get('actual'), 'Detected': smell.get('detected'),
+                                    'Justification': smell.get('justification')})
+    return pd.DataFrame(records)
+
+
+def measure(tree, mode, cache_dir):
+    """Loads every LLM folder of tree once; prints seconds, rows and peak RSS (MB, Linux ru_maxrss) as JSON."""
+    import resource  # Unix only, and Results.py imports this module on every platform
+    start = time.perf_counter()
+    frames = []
+    for llm in sorted(os.listdir(tree)):
+        llm_path = os.path.join(tree, llm)
+        if mode == "legacy":
+            frames.append(legacy_load(llm_path, llm))
+            continue
+        columns = None if mode.endswith("full") else ['Category', 'File', 'Rule_ID', 'Actual', 'Detected']
+        store = ResultsStore(llm_path, cache_dir=cache_dir if mode.startswith("cached") else None,
+                             workers=1 if mode.startswith("serial") else None)
+        frames.append(store.load(columns))
+    rows = sum(len(frame) for frame in frames)
+    memory = sum(frame.memory_usage(deep=True).sum() for frame in frames) / 1024 / 1024
+    print(json.dumps({"seconds": time.perf_counter() - start, "rows": rows, "frame_mb": memory,
+                      "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                      "worker_peak_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and peak memory of loading a scaled-up copy of the Results tree.")
+    parser.add_argument("--scale", type=int, default=50, help="copies of every result file (default: 50)")
+    parser.add_argument("--results-dir", default=str(RESULTS_DIR))
+    parser.add_argument("--measure", nargs=3, metavar=("TREE", "MODE", "CACHE_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        return measure(*args.measure)
+
+    runs = [("legacy", "legacy"), ("serial-full", "serial-full"), ("parallel-full", "parallel-full"),
+            ("parallel-labels", "parallel-labels"), ("cached-full cold", "cached-full"),
+            ("cached-full warm", "cached-full"), ("cached-labels", "cached-labels")]
+    with tempfile.TemporaryDirectory() as tmp:
+        tree, cache_dir = os.path.join(tmp, "Results"), os.path.join(tmp, "cache")
+        files = build_tree(args.results_dir, tree, args.scale)
+        print(f"{files} result files ({args.scale}x {args.results_dir})")
+        print(f"{'mode':<17} {'rows':>9} {'seconds':>8} {'frame':>8} {'peak RSS':>9} {'workers':>8}")
+        for label, mode in runs:
+            # Every run gets a fresh interpreter, so its peak RSS is its own
+            output = subprocess.run([sys.executable, __file__, "--measure", tree, mode, cache_dir],
+                                    capture_output=True, text=True, check=True).stdout
+            stats = json.loads(output.strip().splitlines()[-1])
+            print(f"{label:<17} {stats['rows']:>9} {stats['seconds']:7.2f}s {stats['frame_mb']:5.0f} MB "
+                  f"{stats['peak_mb']:6.0f} MB {stats['worker_peak_mb']:5.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# ==========================================
+# Confusion count and score definitions shared by metrics.py and results_cli.py
+# ==========================================
+# Standard library only, so results_cli.py can score without importing numpy or pandas.
+# The score formulas take any numbers that support + and *: plain ints here, whole numpy
+# arrays in metrics.score_arrays() (which passes its own element-wise ratio).
+
+COUNTS = ['TP', 'FP', 'TN', 'FN']
+SCORES = ['Accuracy', 'Precision', 'Recall', 'F1-Score', 'FPR', 'Sample Size']
+
+# Outcome of one scored row as a number, actual * 2 + detected, and the count it adds to
+OUTCOMES = ('TN', 'FP', 'FN', 'TP')
+POSITIONS = tuple(COUNTS.index(name) for name in OUTCOMES)     # outcome -> index in COUNTS
+
+
+def outcome(actual, detected):
+    """0 TN, 1 FP, 2 FN, 3 TP."""
+    return bool(actual) * 2 + bool(detected)
+
+
+def ratio(numerator, denominator):
+    """numerator / denominator, 0 where the denominator is 0 (like sklearn's zero_division=0)."""
+    return numerator / denominator if denominator else 0.0
+
+
+def score_counts(tp, fp, tn, fn, ratio=ratio):
+    """{score: value} of the SCORES from TP, FP, TN and FN."""
+    total = tp + fp + tn + fn
+    return {
+        'Accuracy': ratio(tp + tn, total),
+        'Precision': ratio(tp, tp + fp),
+        'Recall': ratio(tp, tp + fn),
+        'F1-Score': ratio(2 * tp, 2 * tp + fp + fn),
+        'FPR': ratio(fp, fp + tn),
+        'Sample Size': total,
+    }
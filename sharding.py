@@ -0,0 +1,160 @@
+import re
+import tempfile
+import argparse
+from pathlib import Path
+from dataclasses import replace
+
+from validation import CHECK_LIST, ResponseValidator, ValidationError
+
+# ==========================================
+# CONFIG: split the 18-rule checklist into concurrent sub-prompts
+# ==========================================
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+RULES_PATH = SCRIPT_DIR / "Rules" / "Rules.txt"
+
+# Shard name -> rule ID prefix (Generality G*, Size S*, Naming N*)
+FAMILIES = {"Generality": "G", "Size": "S", "Naming": "N"}
+
+RULE_LINE = re.compile(r"^([GSN]\d+\.\d+):")
+# "Size Smells (S)" style headings some prompts put between the families
+FAMILY_HEADING = re.compile(r"^\w+ Smells \([GSN]\)\s*$")
+
+
+def load_rule_definitions(path=RULES_PATH):
+    """{rule_id: definition line} from Rules/Rules.txt."""
+    definitions = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = RULE_LINE.match(line)
+            if match:
+                definitions[match.group(1)] = line.strip()
+    return definitions
+
+
+def shard_rules(check_list=CHECK_LIST):
+    """{family: [rule IDs in check_list order]}, empty families left out."""
+    shards = {}
+    for family, prefix in FAMILIES.items():
+        rule_ids = [rule_id for rule_id in check_list if rule_id.startswith(prefix)]
+        if rule_ids:
+            shards[family] = rule_ids
+    return shards
+
+
+def definition_blocks(lines):
+    """
+    {rule_id: (first line, last line)} of every definition in a prompt. A definition is the
+    "G5.1: ..." line plus the "* ..." bullet lines right after it (as in Prompts/claude.txt).
+    """
+    blocks = {}
+    index = 0
+    while index < len(lines):
+        match = RULE_LINE.match(lines[index])
+        if not match:
+            index += 1
+            continue
+        end = index
+        while end + 1 < len(lines) and lines[end + 1].lstrip().startswith("*"):
+            end += 1
+        blocks[match.group(1)] = (index, end)
+        index = end + 1
+    return blocks
+
+
+def shard_prompt(prompt, rule_ids, definitions=None):
+    """
+    The prompt with its knowledge base cut down to rule_ids. The prompt's own wording of
+    each definition is kept; a rule the prompt does not define is taken from Rules/Rules.txt.
+    """
+    definitions = definitions if definitions is not None else load_rule_definitions()
+    lines = prompt.split("\n")
+    blocks = definition_blocks(lines)
+
+    if blocks:
+        start = min(first for first, _ in blocks.values())
+        end = max(last for _, last in blocks.values())
+        if start > 0 and FAMILY_HEADING.match(lines[start - 1]):
+            start -= 1
+    else:
+        start = end = None
+
+    kept = []
+    for rule_id in rule_ids:
+        if rule_id in blocks:
+            first, last = blocks[rule_id]
+            kept.extend(lines[first:last + 1])
+        elif rule_id in definitions:
+            kept.append(definitions[rule_id])
+
+    instruction = (f"\nIMPORTANT: In this request analyze ONLY the following {len(rule_ids)} rules: {', '.join(rule_ids)}. "
+                   f"The smell_analysis array must contain exactly {len(rule_ids)} items, one per rule, in this order.")
+
+    if start is None:
+        return prompt + "\n\n" + "\n".join(kept) + instruction
+    return "\n".join(lines[:start] + kept + lines[end + 1:]) + instruction
+
+
+def merge_shards(parts, check_list=CHECK_LIST):
+    """
+    Merges the validated smell_analysis lists of all shards into one response in check_list
+    order, the same document a monolithic request returns. A rule answered by two shards is
+    rejected rather than resolved by shard order.
+    """
+    by_rule = {}
+    for items in parts:
+        for item in items:
+            rule_id = next(iter(item.values()))
+            if rule_id in by_rule:
+                raise ValidationError(f"Error (Condition 3): Duplicate rule_id '{rule_id}' across shards.")
+            by_rule[rule_id] = item
+    missing = [rule_id for rule_id in check_list if rule_id not in by_rule]
+    if missing:
+        raise ValidationError(f"Error (Condition 3): Required rule_id '{missing[0]}' not found in the input data.")
+    return [by_rule[rule_id] for rule_id in check_list]
+
+
+def shard_validators(check_list=CHECK_LIST):
+    return {family: ResponseValidator(rule_ids) for family, rule_ids in shard_rules(check_list).items()}
+
+
+# ==========================================
+# LATENCY COMPARISON
+# ==========================================
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def main():
+    from sweep import DEFAULT_CATEGORIES, collect_jobs, run_sweep
+
+    parser = argparse.ArgumentParser(description="Compare per-file latency of monolithic and rule-sharded requests.")
+    parser.add_argument("--base-url", help="host to send requests to, e.g. a local mock server")
+    parser.add_argument("--providers", nargs="+", default=["gemini"])
+    parser.add_argument("--categories", nargs="+", default=DEFAULT_CATEGORIES)
+    parser.add_argument("--limit", type=int, default=20, help="files per provider")
+    parser.add_argument("--concurrency", type=int, help="override every provider's max_concurrency")
+    args = parser.parse_args()
+
+    jobs = []
+    for key in args.providers:
+        jobs.extend(collect_jobs([key], args.categories)[:args.limit])
+    if args.concurrency:
+        jobs = [replace(job, provider=replace(job.provider, max_concurrency=args.concurrency)) for job in jobs]
+
+    print(f"{'mode':<12} {'files':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'wall':>8}")
+    for shard in (False, True):
+        with tempfile.TemporaryDirectory() as results_dir:
+            report = run_sweep(jobs, base_url=args.base_url, results_dir=results_dir, shard=shard, verbose=False)
+        latencies = [value for values in report.file_latencies.values() for value in values]
+        mean = sum(latencies) / len(latencies) if latencies else 0.0
+        print(f"{'sharded' if shard else 'monolithic':<12} {len(latencies):>6} {mean:7.2f}s {percentile(latencies, 0.5):7.2f}s "
+              f"{percentile(latencies, 0.95):7.2f}s {report.elapsed:7.2f}s")
+        for job, error in report.failed:
+            print(f"  FAIL  {job.label}: {error}")
+
+
+if __name__ == "__main__":
+    main()
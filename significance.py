@@ -0,0 +1,187 @@
+import math
+import time
+import argparse
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+# ==========================================
+# CONFIG: uncertainty of the LLM comparisons
+# ==========================================
+# The resampling unit is the result file: the 18 verdicts of one file come from one reading
+# of the same PDF, so they are not independent samples.
+
+RESAMPLES = 10_000
+LEVEL = 0.95
+SEED = 0
+SCORES = ['Accuracy', 'Precision', 'Recall', 'F1-Score']
+
+# Resample weights held in memory at once (resamples x files); larger sweeps go in batches
+BATCH_ELEMENTS = 20_000_000
+
+# Up to this many discordant verdicts McNemar's test is exact, above it the chi-square approximation
+EXACT_LIMIT = 1000
+
+
+def file_tensor(df):
+    """
+    Confusion counts per LLM and result file: (llms, array of shape (LLMs, files, 4)) with the
+    counts in metrics.COUNTS order. A file one LLM has no result for counts as all zeros.
+    """
+    per_file = metrics.rollup(metrics.counts_for(df), ['LLM', 'Category', 'File'])
+    llm_codes, llms = pd.factorize(per_file['LLM'])
+    file_codes, files = pd.factorize(per_file['Category'].astype(str) + "/" + per_file['File'].astype(str))
+    tensor = np.zeros((len(llms), len(files), len(metrics.COUNTS)), dtype=np.int64)
+    tensor[llm_codes, file_codes] = per_file[metrics.COUNTS].to_numpy()
+    return list(llms), tensor
+
+
+def resampled_counts(tensor, resamples=RESAMPLES, seed=SEED):
+    """
+    Summed counts of bootstrap resamples of the files, shape (resamples, LLMs, 4). Every LLM
+    is scored on the same resampled files, so differences between LLMs are paired. Each batch
+    is one matrix product of the file weights (how often each file was drawn) with the
+    per-file counts.
+    """
+    rng = np.random.default_rng(seed)
+    n_llms, n_files, n_counts = tensor.shape
+    flat = tensor.transpose(1, 0, 2).reshape(n_files, -1).astype(np.float64)
+    batch = max(1, min(resamples, BATCH_ELEMENTS // max(n_files, 1)))
+    out = np.empty((resamples, n_llms, n_counts))
+    for start in range(0, resamples, batch):
+        size = min(batch, resamples - start)
+        # n_files draws with replacement per resample, counted per file with one flat bincount
+        draws = rng.integers(0, n_files, size=(size, n_files)) + np.arange(size)[:, None] * n_files
+        weights = np.bincount(draws.ravel(), minlength=size * n_files).reshape(size, n_files)
+        out[start:start + size] = (weights.astype(np.float64) @ flat).reshape(size, n_llms, n_counts)
+    return out
+
+
+def bootstrap(df, resamples=RESAMPLES, seed=SEED):
+    """(llms, point scores {score: (LLMs,)}, resampled scores {score: (resamples, LLMs)})."""
+    llms, tensor = file_tensor(df)
+    point = metrics.score_arrays(*tensor.sum(axis=1).T)
+    counts = resampled_counts(tensor, resamples, seed)
+    return llms, point, metrics.score_arrays(*np.moveaxis(counts, -1, 0))
+
+
+def confidence_intervals(boot, scores=SCORES, level=LEVEL):
+    """Percentile bootstrap interval of every score per LLM: LLM, Metric, Estimate, Lower, Upper."""
+    llms, point, resampled = boot
+    tail = (1 - level) / 2 * 100
+    rows = []
+    for score in scores:
+        lower, upper = np.percentile(resampled[score], [tail, 100 - tail], axis=0)
+        for index, llm in enumerate(llms):
+            rows.append({'LLM': llm, 'Metric': score, 'Estimate': point[score][index],
+                         'Lower': lower[index], 'Upper': upper[index]})
+    return pd.DataFrame(rows)
+
+
+def paired_differences(boot, score='F1-Score', level=LEVEL):
+    """
+    Paired bootstrap of the score difference for every LLM pair: LLM A, LLM B, Difference
+    (A - B), its interval and the two-sided bootstrap p-value of "no difference".
+    """
+    llms, point, resampled = boot
+    tail = (1 - level) / 2 * 100
+    rows = []
+    for a, b in combinations(range(len(llms)), 2):
+        diff = resampled[score][:, a] - resampled[score][:, b]
+        lower, upper = np.percentile(diff, [tail, 100 - tail])
+        p_value = min(1.0, 2 * min((diff <= 0).mean(), (diff >= 0).mean()))
+        rows.append({'LLM A': llms[a], 'LLM B': llms[b], 'Metric': score,
+                     'Difference': point[score][a] - point[score][b], 'Lower': lower, 'Upper': upper,
+                     'p-value': p_value})
+    return pd.DataFrame(rows)
+
+
+def mcnemar_p(b, c):
+    """Two-sided McNemar p-value for b and c discordant verdicts."""
+    n = b + c
+    if n == 0:
+        return 1.0
+    if n <= EXACT_LIMIT:
+        tail = sum(math.comb(n, i) for i in range(min(b, c) + 1))
+        return min(1.0, 2 * tail / 2 ** n)
+    statistic = (abs(b - c) - 1) ** 2 / n
+    return math.erfc(math.sqrt(statistic / 2))
+
+
+def mcnemar(df):
+    """
+    McNemar's test on per-verdict correctness for every LLM pair, over the (Category, File,
+    Rule_ID) verdicts both LLMs gave: LLM A, LLM B, Paired, A only (right where B is wrong),
+    B only, p-value.
+    """
+    df = df[df['Actual'].notna() & df['Detected'].notna()]
+    correct = (df['Actual'].to_numpy(dtype=bool) == df['Detected'].to_numpy(dtype=bool)).astype(np.int8)
+    items = df.groupby(['Category', 'File', 'Rule_ID'], observed=True, sort=False).ngroup().to_numpy()
+    llm_codes, llms = pd.factorize(df['LLM'])
+
+    # -1 where an LLM has no verdict for an item, else 1 right / 0 wrong
+    table = np.full((items.max() + 1 if len(items) else 0, len(llms)), -1, dtype=np.int8)
+    table[items, llm_codes] = correct
+
+    rows = []
+    for a, b in combinations(range(len(llms)), 2):
+        both = (table[:, a] >= 0) & (table[:, b] >= 0)
+        only_a = int(np.sum(both & (table[:, a] == 1) & (table[:, b] == 0)))
+        only_b = int(np.sum(both & (table[:, a] == 0) & (table[:, b] == 1)))
+        rows.append({'LLM A': llms[a], 'LLM B': llms[b], 'Paired': int(both.sum()),
+                     'A only': only_a, 'B only': only_b, 'p-value': mcnemar_p(only_a, only_b)})
+    return pd.DataFrame(rows)
+
+
+# ==========================================
+# REPORT
+# ==========================================
+
+def tile(df, copies):
+    """df repeated copies times as distinct files, to time larger sweeps."""
+    if copies <= 1:
+        return df
+    frames = []
+    for n in range(copies):
+        frame = df.copy()
+        frame['File'] = frame['File'].astype(str) + f"#{n}"
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    import Results
+
+    parser = argparse.ArgumentParser(description="Bootstrap confidence intervals, paired bootstraps and McNemar tests between LLMs.")
+    parser.add_argument("--models", nargs="+", default=list(Results.llm_colors), help="LLM names as in Results.load_data")
+    parser.add_argument("--resamples", type=int, default=RESAMPLES)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--level", type=float, default=LEVEL)
+    parser.add_argument("--metric", default="F1-Score", help="score compared in the paired bootstrap")
+    parser.add_argument("--scale", type=int, default=1, help="repeat the loaded results as this many times the files (timing only)")
+    parser.add_argument("--relabel", action="store_true", help="score against the current Data/ label files (see Results.apply_ground_truth)")
+    args = parser.parse_args()
+
+    df = tile(Results.load_data(args.models, justifications=False, relabel=args.relabel), args.scale)
+    start = time.perf_counter()
+    boot = bootstrap(df, args.resamples, args.seed)
+    intervals = confidence_intervals(boot, level=args.level)
+    paired = paired_differences(boot, args.metric, args.level)
+    tests = mcnemar(df)
+    elapsed = time.perf_counter() - start
+
+    with pd.option_context("display.width", 160, "display.float_format", "{:.4f}".format):
+        print(f"--- {args.level:.0%} bootstrap intervals ({args.resamples} file resamples) ---")
+        print(intervals.to_string(index=False))
+        print(f"\n--- Paired bootstrap: {args.metric} difference ---")
+        print(paired.to_string(index=False))
+        print("\n--- McNemar: per-verdict correctness ---")
+        print(tests.to_string(index=False))
+    print(f"\n{len(df)} records, {boot[1]['Sample Size'].size} LLMs: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import json
+
+from validation import CHECK_LIST, ResponseValidator, ValidationError
+
+# ==========================================
+# Incremental validation of a streamed reply
+# ==========================================
+
+
+class StreamingValidator:
+    """
+    Consumes a reply as it is generated and validates every smell_analysis item the moment
+    its closing brace arrives: 3 keys, no empty values, boolean second value and a rule ID
+    from rule_ids that was not seen before. feed() raises ValidationError on the first bad
+    item, so the caller can cancel the generation instead of paying for the rest of it.
+
+    Only the JSON structure is tracked (string/escape state and nesting depth); items are
+    parsed with json.loads once complete. Text before the first "{" (a ```json fence or a
+    sentence) is skipped, just like parse_response_text() does.
+    """
+
+    def __init__(self, rule_ids=CHECK_LIST):
+        self.rule_ids = tuple(rule_ids)
+        self._known = frozenset(self.rule_ids)
+        self._checker = ResponseValidator(self.rule_ids)
+        self.text = []          # all chunks, joined by result()
+        self.items = 0          # items validated so far
+        self._buffer = ""       # not yet scanned text, starting at the unfinished item
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._array_depth = None    # depth inside the target array (first list of the top object)
+        self._item_start = None
+        self._seen = set()
+
+    def feed(self, chunk):
+        self.text.append(chunk)
+        if not self._started:
+            start = chunk.find("{")
+            if start == -1:
+                return
+            self._started = True
+            chunk = chunk[start:]
+        self._buffer += chunk
+        self._scan()
+
+    def _scan(self):
+        buffer = self._buffer
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2 and self._array_depth is None:
+                    self._array_depth = 2
+                elif char == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item_start = pos
+            elif char in "}]":
+                if char == "}" and self._item_start is not None and self._depth == self._array_depth + 1:
+                    self._check(buffer[self._item_start:pos + 1])
+                    self._item_start = None
+                self._depth -= 1
+
+        # Keep only the unfinished item, so long replies are not rescanned or copied again
+        keep = self._item_start if self._item_start is not None else len(buffer)
+        self._buffer = buffer[keep:]
+        self._pos = len(buffer) - keep
+        if self._item_start is not None:
+            self._item_start = 0
+
+    def _check(self, item_text):
+        index = self.items
+        try:
+            item = json.loads(item_text)
+        except json.JSONDecodeError as e:
+            raise ValidationError(f"Error: Invalid JSON format in item at index {index}. {e}")
+
+        if index >= len(self.rule_ids):
+            raise ValidationError(f"Error (Condition 1): Smell count mismatch. Expected {len(self.rule_ids)}, found more.")
+        self._checker.check_item(item, index)
+
+        rule_id = next(iter(item.values()))
+        if not isinstance(rule_id, str) or rule_id not in self._known:
+            raise ValidationError(f"Error (Condition 3): Unknown rule_id '{rule_id}' at index {index}.")
+        if rule_id in self._seen:
+            raise ValidationError(f"Error (Condition 3): Duplicate rule_id '{rule_id}' at index {index}.")
+        self._seen.add(rule_id)
+        self.items += 1
+
+    def result(self):
+        """The complete reply text, once the stream has ended."""
+        return "".join(self.text)
@@ -0,0 +1,578 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from dataclasses import dataclass, field
+
+import httpx
+
+from api_clients.adapters import Attachment, FileRef, get_adapter
+from api_clients.file_registry import FileRegistry, StaleFileError, UploadError
+from api_clients.rate_limit import RateLimits, estimate_tokens, parse_reset
+from api_clients.transport import REQUEST_TIMEOUT, Transport
+from journal import DONE, FAILED, IN_FLIGHT, QUEUED, SweepJournal, journal_path, prompt_hash
+from pdf_pages import PageCache
+from providers import get_provider
+from response_cache import ResponseCache, cache_key
+from sharding import load_rule_definitions, merge_shards, shard_prompt, shard_rules, shard_validators
+from streaming import StreamingValidator
+from validation import CHECK_LIST, RESULTS_DIR, ValidationEngine, ValidationError, parse_response_text, response_schema
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, "Data")
+PROMPTS_DIR = os.path.join(SCRIPT_DIR, "Prompts")
+
+# Data/ sub folders that make up a full sweep
+DEFAULT_CATEGORIES = ["Oppejoud", "Yliopilased", "Synthetic/Single", "Synthetic/Multi"]
+DEFAULT_PROVIDERS = ["gemini", "chatgpt", "claude"]
+
+RETRIES = 2
+RETRY_STATUSES = {429, 500, 502, 503, 504, 529}
+# Longest wait for one Retry-After (seconds or an HTTP-date); longer ones are retried sooner
+MAX_RETRY_AFTER = 60
+
+
+@dataclass(frozen=True)
+class Job:
+    provider: object        # providers.Provider
+    category: str           # Data/ sub folder, e.g. "Synthetic/Single"
+    file_name: str          # PDF name without extension
+    pdf_path: str
+    prompt_path: str
+
+    @property
+    def label(self):
+        return f"{self.provider.key}:{self.category}/{self.file_name}"
+
+
+@dataclass
+class SweepReport:
+    passed: list = field(default_factory=list)
+    failed: list = field(default_factory=list)      # (job, error message)
+    skipped: list = field(default_factory=list)     # output already exists
+    latencies: dict = field(default_factory=dict)   # provider key -> [seconds per request]
+    file_latencies: dict = field(default_factory=dict)  # provider key -> [seconds per file, all shards]
+    upload_bytes: dict = field(default_factory=dict)    # provider key -> attachment bytes sent
+    cache_stats: dict = field(default_factory=dict)
+    file_stats: dict = field(default_factory=dict)
+    stream_aborts: dict = field(default_factory=dict)   # provider key -> generations cancelled mid-stream
+    transport_stats: dict = field(default_factory=dict)  # provider key -> Transport.stats()
+    rate_limit_stats: dict = field(default_factory=dict)  # "provider/model" -> RateLimiter.stats()
+    batch_stats: dict = field(default_factory=dict)     # provider key -> {"batches", "requests", "requeued", "seconds"}
+    validation_stats: dict = field(default_factory=dict)  # provider key -> {"replies", "rejected"}, fresh replies only
+    elapsed: float = 0.0
+
+    def print_summary(self):
+        print("\n--- Sweep Summary ---")
+        for job, error in self.failed:
+            print(f"FAIL  {job.label}: {error}")
+        for key, values in sorted(self.latencies.items()):
+            if values:
+                per_file = self.file_latencies.get(key) or [0.0]
+                print(f"{key:<10} requests: {len(values):>4}  mean latency: {sum(values) / len(values):7.2f}s  max: {max(values):7.2f}s"
+                      f"  per file: {sum(per_file) / len(per_file):7.2f}s"
+                      f"  upload: {self.upload_bytes.get(key, 0) / len(values) / 1024:7.0f} KB/request")
+        if self.cache_stats:
+            print(f"Cache: {self.cache_stats['hits']} hits, {self.cache_stats['misses']} misses ({self.cache_stats['hit_rate']:.0%})")
+        if self.file_stats:
+            print(f"Files: {self.file_stats['uploads']} uploaded ({self.file_stats['uploaded_bytes'] / 1024 / 1024:.1f} MB), "
+                  f"{self.file_stats['reuses']} reused by id")
+        for key, stats in sorted(self.transport_stats.items()):
+            print(f"{key:<10} connections: {stats['connections']} for {stats['requests']} requests "
+                  f"({'/'.join(stats['http_versions']) or '-'}, {stats['tls_handshakes']} TLS handshakes)")
+        for name, stats in sorted(self.rate_limit_stats.items()):
+            print(f"{name:<32} rate: {stats['rpm']:.0f}/{stats['rpm_limit']:.0f} rpm, {stats['tpm']:.0f}/{stats['tpm_limit']:.0f} tpm  "
+                  f"throttled: {stats['throttled']} requests, {stats['throttle_seconds']:.1f}s  "
+                  f"max queue: {stats['max_queue']}  429s: {stats['rate_limited']}")
+        for key, stats in sorted(self.batch_stats.items()):
+            print(f"{key:<10} batches: {stats['batches']}  requests: {stats['requests']}  re-queued: {stats['requeued']}  "
+                  f"until the last result: {stats['seconds']:.1f}s")
+        if self.validation_stats:
+            print("Rejected replies: " + ", ".join(
+                f"{key} {stats['rejected']}/{stats['replies']} ({stats['rejected'] / stats['replies']:.1%})"
+                for key, stats in sorted(self.validation_stats.items()) if stats["replies"]))
+        if self.stream_aborts:
+            print("Stream aborts: " + ", ".join(f"{key} {count}" for key, count in sorted(self.stream_aborts.items())))
+        total = len(self.passed) + len(self.failed)
+        print(f"Passed: {len(self.passed)}, failed: {len(self.failed)}, skipped: {len(self.skipped)}")
+        if self.elapsed > 0:
+            print(f"Wall-clock: {self.elapsed:.2f}s ({total / self.elapsed:.2f} files/sec)")
+
+
+# ==========================================
+# JOBS
+# ==========================================
+
+def collect_jobs(providers=DEFAULT_PROVIDERS, categories=DEFAULT_CATEGORIES, data_dir=DATA_DIR, prompt_file=None):
+    """One job per (provider, category, PDF). prompt_file overrides the provider's own prompt."""
+    jobs = []
+    for key in providers:
+        provider = get_provider(key)
+        prompt_path = os.path.join(PROMPTS_DIR, prompt_file or provider.prompt_file)
+        for category in categories:
+            folder = os.path.join(data_dir, category)
+            for name in sorted(os.listdir(folder)):
+                if name.lower().endswith(".pdf"):
+                    jobs.append(Job(provider, category, os.path.splitext(name)[0], os.path.join(folder, name), prompt_path))
+    return jobs
+
+
+def api_key_for(provider, base_url=None):
+    api_key = os.getenv(provider.api_key_env)
+    if api_key:
+        return api_key
+    if base_url:
+        # A local stub server does not check keys
+        return "stub"
+    raise ValueError(f"❌ Key has no value! Set {provider.api_key_env} for provider '{provider.key}'.")
+
+
+# ==========================================
+# RUNNER
+# ==========================================
+
+class RequestError(ValidationError):
+    """Raised when a job gets no reply to validate: HTTP, connection or upload errors."""
+
+
+class StreamAbort(ValidationError):
+    """Raised when the last streamed attempt was cancelled; request() has already counted it as rejected."""
+
+
+class SweepRunner:
+    """
+    Runs jobs concurrently: every provider gets its own semaphore of provider.max_concurrency,
+    so the sweep takes as long as the slowest provider, not the sum of all latencies.
+    Each response goes straight into the ValidationEngine of its (provider, category).
+    """
+
+    def __init__(self, base_url=None, results_dir=RESULTS_DIR, timeout=REQUEST_TIMEOUT, retries=RETRIES, cache=None,
+                 pages="pdf", file_registry=None, shard=False, stream=False, journal=None, pool_sizes=None,
+                 rate_limit=True, structured_output=True, verbose=True):
+        self.base_url = base_url
+        self.journal = journal
+        self.cache = cache
+        self.file_registry = file_registry
+        self.shard = shard
+        self.stream = stream
+        self.validator_check_list = CHECK_LIST
+        self._shard_validators = shard_validators(CHECK_LIST) if shard else {}
+        self._definitions = load_rule_definitions() if shard else {}
+        self.pages = pages
+        self.page_cache = PageCache() if pages != "pdf" else None
+        self.results_dir = results_dir
+        self.timeout = timeout
+        self.pool_sizes = pool_sizes
+        self.rate_limits = RateLimits() if rate_limit else None
+        self.structured_output = structured_output
+        self.retries = retries
+        self.verbose = verbose
+        self.report = SweepReport()
+        self._engines = {}
+        self._semaphores = {}
+        self._prompts = {}
+        self._prompt_hashes = {}
+        self._api_keys = {}
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    def engine(self, job):
+        key = (job.provider.key, job.category)
+        if key not in self._engines:
+            engine = ValidationEngine(job.provider, job.category, results_dir=self.results_dir, verbose=False)
+            os.makedirs(engine.output_path, exist_ok=True)
+            self._engines[key] = engine
+        return self._engines[key]
+
+    def prompt(self, job):
+        if job.prompt_path not in self._prompts:
+            with open(job.prompt_path, 'r', encoding='utf-8') as f:
+                self._prompts[job.prompt_path] = f.read()
+        return self._prompts[job.prompt_path]
+
+    def job_key(self, job):
+        """Journal key of a job: provider, model, category, file and the hash of the prompt it is sent with."""
+        if job.prompt_path not in self._prompt_hashes:
+            self._prompt_hashes[job.prompt_path] = prompt_hash(self.prompt(job))
+        return job.provider.key, job.provider.api_model, job.category, job.file_name, self._prompt_hashes[job.prompt_path]
+
+    def resume(self, jobs):
+        """
+        The jobs the journal does not record as done, marked queued. Output files are only
+        checked for jobs the journal has never seen (results saved before it existed) and for
+        jobs that were in flight when the last run stopped.
+        """
+        pending, adopted = [], []
+        for job in jobs:
+            key = self.job_key(job)
+            status = self.journal.status(key)
+            if status == DONE:
+                self.report.skipped.append(job)
+            elif status in (None, IN_FLIGHT) and os.path.exists(self.engine(job).output_file(job.file_name)):
+                self.report.skipped.append(job)
+                adopted.append(key)
+            else:
+                pending.append(job)
+        self.journal.record(adopted, DONE)
+        self.journal.record([self.job_key(job) for job in pending], QUEUED)
+        return pending
+
+    def attachments(self, job):
+        """The PDF itself, or its cached page renders when the sweep runs with pages != "pdf"."""
+        if self.page_cache is not None:
+            return self.page_cache.attachments(job.pdf_path, self.pages)
+        with open(job.pdf_path, 'rb') as f:
+            return [Attachment(os.path.basename(job.pdf_path), "application/pdf", f.read())]
+
+    def schema(self, job, rule_ids=CHECK_LIST):
+        """The response schema sent with the job's requests, None without structured output."""
+        if self.structured_output and job.provider.structured_output:
+            return response_schema(rule_ids)
+        return None
+
+    def count_reply(self, job, rejected):
+        """Counts one fresh reply of the job's provider, and whether validation rejected it."""
+        stats = self.report.validation_stats.setdefault(job.provider.key, {"replies": 0, "rejected": 0})
+        stats["replies"] += 1
+        stats["rejected"] += bool(rejected)
+
+    def cache_key(self, job, prompt, attachments):
+        params = {"api": job.provider.api, "max_tokens": job.provider.max_tokens}
+        if self.schema(job) is not None:
+            params["structured_output"] = True
+        if self.base_url:
+            # Stub server replies must never be served for the real API
+            params["base_url"] = self.base_url
+        return cache_key(job.provider.api_model, prompt, attachments, params)
+
+    async def stream_reply(self, client, adapter, url, headers, body, rule_ids):
+        """
+        Streams one generation through a StreamingValidator. Returns (response, reply text), the text
+        being None when the status is not 200. Raises ValidationError on the first bad item; leaving
+        the stream closes the connection, which cancels the rest of the generation.
+        """
+        validator = StreamingValidator(rule_ids)
+        async with client.stream("POST", url, headers=headers, json=body) as response:
+            if response.status_code != 200:
+                await response.aread()
+                return response, None
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    event = json.loads(data)
+                except json.JSONDecodeError:
+                    raise ValidationError(f"Error: Invalid stream event. {data[:200]}")
+                validator.feed(adapter.stream_text(event))
+        return response, validator.result()
+
+    async def request(self, client, job, prompt, attachments, rule_ids=CHECK_LIST, tokens=0):
+        """
+        Sends one job to its provider and returns the reply text. Retries 429/5xx and connection errors.
+        When streaming, a generation that breaks the schema for rule_ids is cancelled and asked again.
+        Every attempt first waits for the provider's rate limiter (tokens: estimated tokens of the request).
+        """
+        adapter = get_adapter(job.provider)
+        build = adapter.stream_request if self.stream else adapter.request
+        url, headers, body = build(job.provider, self._api_keys[job.provider.key], prompt, attachments, self.base_url,
+                                   self.schema(job, rule_ids))
+        limiter = self.rate_limits.limiter(job.provider) if self.rate_limits is not None else None
+
+        for attempt in range(self.retries + 1):
+            text = None
+            if limiter is not None:
+                await limiter.acquire(tokens)
+            try:
+                if self.stream:
+                    response, text = await self.stream_reply(client, adapter, url, headers, body, rule_ids)
+                else:
+                    response = await client.post(url, headers=headers, json=body)
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise RequestError(f"Error: Request failed. {type(e).__name__}: {e}")
+                await asyncio.sleep(2 ** attempt)
+                continue
+            except ValidationError as e:
+                self.report.stream_aborts[job.provider.key] = self.report.stream_aborts.get(job.provider.key, 0) + 1
+                self.count_reply(job, rejected=True)
+                self._log(f"ABORT {job.label}: {e}")
+                if attempt == self.retries:
+                    raise StreamAbort(str(e)) from e
+                continue
+
+            used_tokens, unreadable = None, None
+            if response.status_code == 200 and text is None:
+                # A 200 whose body is not the API's JSON (a proxy's HTML page, a cut-off body) is a bad reply, not a crash
+                try:
+                    payload = response.json()
+                    text = adapter.response_text(payload)
+                    used_tokens = adapter.usage(payload)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    unreadable = f"{type(e).__name__}: {e}"
+            if limiter is not None:
+                limiter.update(response.status_code, response.headers, tokens, used_tokens)
+            if unreadable is not None:
+                if attempt == self.retries:
+                    raise RequestError(f"Error: Unreadable reply body. {unreadable}. {response.text[:200]}")
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                if response.status_code != 429 or limiter is None:
+                    # The limiter itself pauses for a 429's Retry-After
+                    retry_after = parse_reset(response.headers.get("retry-after"))
+                    await asyncio.sleep(min(2 ** attempt if retry_after is None else retry_after, MAX_RETRY_AFTER))
+                continue
+            if response.status_code in (400, 404) and any(isinstance(a, FileRef) for a in attachments) \
+                    and "file" in response.text.lower():
+                raise StaleFileError(response.text[:200])
+            if response.status_code != 200:
+                raise RequestError(f"Error: API returned HTTP {response.status_code}. {response.text[:200]}")
+            return text
+
+    async def send(self, client, job, prompt, attachments, rule_ids=CHECK_LIST, tokens=0):
+        """
+        request() with the PDF replaced by an uploaded file reference when a file registry is used
+        and the provider has a file API. A file id the API no longer knows is uploaded again once.
+        """
+        key = job.provider.key
+        if self.file_registry is None or not get_adapter(job.provider).supports_files:
+            self.report.upload_bytes[key] = self.report.upload_bytes.get(key, 0) + sum(len(a.data) for a in attachments)
+            return await self.request(client, job, prompt, attachments, rule_ids, tokens)
+
+        api_key = self._api_keys[key]
+        for attempt in range(2):
+            try:
+                sent = [await self.file_registry.ensure(client, job.provider, a, api_key, self.base_url)
+                        if a.mime_type == "application/pdf" else a for a in attachments]
+            except (UploadError, httpx.TransportError) as e:
+                raise RequestError(str(e) if isinstance(e, UploadError) else f"Error: Upload failed. {e}")
+            self.report.upload_bytes[key] = self.report.upload_bytes.get(key, 0) + sum(
+                len(a.data) for a in sent if not isinstance(a, FileRef))
+            try:
+                return await self.request(client, job, prompt, sent, rule_ids, tokens)
+            except StaleFileError as e:
+                if attempt:
+                    raise RequestError(f"Error: Uploaded file rejected twice. {e}")
+                for a in attachments:
+                    if a.mime_type == "application/pdf":
+                        self.file_registry.forget(job.provider, hashlib.sha256(a.data).hexdigest())
+
+    async def reply(self, client, job, prompt, attachments, rule_ids=CHECK_LIST):
+        """
+        Reply text for one prompt: from the response cache or from the provider (under the
+        provider's semaphore). Returns (text, cache key to store a fresh reply under, whether it was cached).
+        """
+        key = self.cache_key(job, prompt, attachments) if self.cache is not None else None
+        text = self.cache.get(key) if self.cache is not None else None
+        if text is not None:
+            return text, None, True
+
+        async with self._semaphores.setdefault(job.provider.key, asyncio.Semaphore(job.provider.max_concurrency)):
+            if self.journal is not None:
+                # Only jobs that actually reached the API are in flight; waiting ones stay queued
+                self.journal.record(self.job_key(job), IN_FLIGHT)
+            start = time.perf_counter()
+            try:
+                text = await self.send(client, job, prompt, attachments, rule_ids,
+                                       estimate_tokens(prompt, attachments, len(rule_ids)))
+            finally:
+                self.report.latencies.setdefault(job.provider.key, []).append(time.perf_counter() - start)
+        return text, key, False
+
+    def remember(self, job, key, text):
+        # Only replies that passed validation are cached, rejected ones are asked again next time
+        if self.cache is not None and key is not None:
+            self.cache.put(key, text, {"provider": job.provider.key, "category": job.category, "file": job.file_name})
+
+    async def monolithic_reply(self, client, job, prompt, attachments):
+        """One request for all rules. Returns (parsed response, whether it came from the cache, replies to cache)."""
+        text, key, cached = await self.reply(client, job, prompt, attachments, self.validator_check_list)
+        return parse_response_text(text), cached, [(key, text)]
+
+    async def sharded_reply(self, client, job, prompt, attachments):
+        """
+        One concurrent request per rule family (sharding.FAMILIES), each validated against its own
+        rules and merged back into the full check_list response.
+        """
+        shards = shard_rules(self.validator_check_list)
+        replies = await asyncio.gather(*(
+            self.reply(client, job, shard_prompt(prompt, rule_ids, self._definitions), attachments, rule_ids)
+            for rule_ids in shards.values()
+        ))
+
+        parts = []
+        for family, (text, _, _) in zip(shards, replies):
+            data = parse_response_text(text)
+            try:
+                parts.append(self._shard_validators[family].smell_list(data))
+            except ValidationError as e:
+                raise ValidationError(f"{e} (shard {family})")
+
+        data = {"file_name": "", "smell_analysis": merge_shards(parts, self.validator_check_list)}
+        return data, all(cached for _, _, cached in replies), [(key, text) for text, key, _ in replies]
+
+    async def run_job(self, client, job):
+        engine = self.engine(job)
+        if self.journal is None and os.path.exists(engine.output_file(job.file_name)):
+            self.report.skipped.append(job)
+            return
+
+        prompt, attachments = self.prompt(job), self.attachments(job)
+        start = time.perf_counter()
+        cached = False
+        try:
+            if self.shard:
+                data, cached, replies = await self.sharded_reply(client, job, prompt, attachments)
+            else:
+                data, cached, replies = await self.monolithic_reply(client, job, prompt, attachments)
+            if not cached:
+                self.report.file_latencies.setdefault(job.provider.key, []).append(time.perf_counter() - start)
+            self.accept(job, data, replies, cached)
+            if not cached:
+                self.count_reply(job, rejected=False)
+        except ValidationError as e:
+            if not isinstance(e, (RequestError, StreamAbort)) and not cached:
+                # A reply that arrived but was rejected; the job has to be asked again next sweep
+                self.count_reply(job, rejected=True)
+            self.reject(job, str(e))
+
+    def accept(self, job, data, replies=(), cached=False):
+        """
+        Saves a parsed reply through the job's ValidationEngine (raises ValidationError when it
+        does not pass), caches the reply texts and records the job as done.
+        """
+        # The runner knows which PDF it sent, so it does not rely on the model reading the name
+        if isinstance(data, dict):
+            data["file_name"] = job.provider.file_prefix + job.file_name
+        self.engine(job).process(data)
+        for key, text in replies:
+            self.remember(job, key, text)
+        if self.journal is not None:
+            self.journal.record(self.job_key(job), DONE)
+        self.report.passed.append(job)
+        self._log(f"PASS  {job.label}" + (" (cached)" if cached else ""))
+
+    def reject(self, job, error):
+        if self.journal is not None:
+            self.journal.record(self.job_key(job), FAILED, error)
+        self.report.failed.append((job, error))
+        self._log(f"FAIL  {job.label}: {error}")
+
+    async def run(self, jobs):
+        # Fail before the first request when a key is missing
+        for job in jobs:
+            if job.provider.key not in self._api_keys:
+                self._api_keys[job.provider.key] = api_key_for(job.provider, self.base_url)
+
+        start = time.perf_counter()
+        if self.journal is not None:
+            total = len(jobs)
+            jobs = self.resume(jobs)
+            self._log(f"Journal: {total - len(jobs)} of {total} jobs done, resuming {len(jobs)} "
+                      f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+        if self.page_cache is not None:
+            # Split all PDFs up front in a process pool; the cache is shared by every provider
+            self.page_cache.prepare(sorted({job.pdf_path for job in jobs}))
+        # Every provider gets its own pool of keep-alive connections
+        async with Transport(self.timeout, self.pool_sizes) as transport:
+            await self.run_jobs(transport, jobs)
+        self.report.elapsed = time.perf_counter() - start
+        self.report.transport_stats = transport.stats()
+        if self.rate_limits is not None:
+            self.report.rate_limit_stats = self.rate_limits.stats()
+        if self.cache is not None:
+            self.report.cache_stats = self.cache.stats()
+        if self.file_registry is not None:
+            self.report.file_stats = self.file_registry.stats()
+        return self.report
+
+    async def run_jobs(self, transport, jobs):
+        await asyncio.gather(*(self.run_job(transport.client(job.provider), job) for job in jobs))
+
+
+def run_sweep(jobs, **kwargs):
+    return asyncio.run(SweepRunner(**kwargs).run(jobs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send every PDF of the corpus to every provider and save the validated results.")
+    parser.add_argument("--providers", nargs="+", default=DEFAULT_PROVIDERS, help=f"provider keys (default: {' '.join(DEFAULT_PROVIDERS)})")
+    parser.add_argument("--categories", nargs="+", default=DEFAULT_CATEGORIES, help="Data/ sub folders to include")
+    parser.add_argument("--prompt", help="file in Prompts/ to use for every provider instead of its own prompt")
+    parser.add_argument("--base-url", help="send every request to this host instead, e.g. a local stub server")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="root folder for saved results")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT, help="request timeout in seconds")
+    parser.add_argument("--pool-size", nargs="+", default=[], metavar="PROVIDER=N",
+                        help="keep-alive connections per provider (default: its max_concurrency)")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="send as fast as max_concurrency allows, without the adaptive rate limiter")
+    parser.add_argument("--no-structured-output", action="store_true",
+                        help="do not send the response schema, rely on the prompt for the JSON format")
+    parser.add_argument("--pages", default="pdf", choices=["pdf", "auto"] + [str(dpi) for dpi in PageCache().resolutions],
+                        help="send the whole PDF (default), page renders at a fixed DPI, or auto: readable renders where they cost fewer tokens and bytes than the PDF")
+    parser.add_argument("--upload-files", action="store_true",
+                        help="upload each PDF once per provider through its file API and reference it by id")
+    parser.add_argument("--shard", action="store_true",
+                        help="split the checklist by rule family into concurrent requests and merge the replies")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream replies, validate every item as it arrives and cancel generations that break the schema")
+    parser.add_argument("--batch", action="store_true",
+                        help="send the jobs through the providers' batch APIs (cheaper, results within hours), see batch.py")
+    parser.add_argument("--poll-interval", type=float, default=30, help="seconds between batch status checks")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="do not keep a run journal; check every output file on disk instead")
+    parser.add_argument("--no-cache", action="store_true", help="do not use the response cache at all")
+    parser.add_argument("--bypass-cache", action="store_true", help="ignore cached replies but store the fresh ones")
+    args = parser.parse_args()
+
+    try:
+        pool_sizes = {key.lower(): int(size) for key, size in (item.split("=") for item in args.pool_size)}
+    except ValueError:
+        parser.error("--pool-size expects PROVIDER=N, e.g. claude=2")
+
+    if args.batch and (args.stream or args.shard or args.pages != "pdf"):
+        parser.error("--batch sends whole PDFs in one request per job; it cannot be combined with --stream, --shard or --pages")
+    if args.batch:
+        from api_clients.batches import get_batch_api
+        try:
+            for key in args.providers:
+                get_batch_api(get_provider(key))
+        except ValueError as e:
+            parser.error(f"--batch: {e}")
+
+    jobs = collect_jobs(args.providers, args.categories, prompt_file=args.prompt)
+    print(f"--- Starting Sweep: {len(jobs)} jobs ---")
+
+    cache = None if args.no_cache else ResponseCache(bypass=args.bypass_cache)
+    file_registry = FileRegistry(scope=args.base_url or "") if args.upload_files else None
+    journal = None if args.no_journal else SweepJournal(journal_path(args.results_dir))
+    options = dict(base_url=args.base_url, results_dir=args.results_dir, timeout=args.timeout, cache=cache,
+                   file_registry=file_registry, journal=journal, pool_sizes=pool_sizes,
+                   structured_output=not args.no_structured_output)
+    try:
+        if args.batch:
+            from batch import run_batch
+            report = run_batch(jobs, poll_interval=args.poll_interval, **options)
+        else:
+            report = run_sweep(jobs, pages=args.pages, shard=args.shard, stream=args.stream,
+                               rate_limit=not args.no_rate_limit, **options)
+    finally:
+        if journal is not None:
+            journal.close()
+    report.print_summary()
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
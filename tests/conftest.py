@@ -0,0 +1,42 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# The modules under test are plain scripts in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def mock_server():
+    """
+    Starts api_clients/mock_server.py on a free port: mock_server(invalid_rate=1.0, ...) takes
+    the keyword options of serve() and returns (base URL, handler class, for its stats).
+    Every server started is shut down after the test.
+    """
+    from api_clients.mock_server import serve
+
+    servers = []
+
+    def start(**options):
+        server = serve(port=0, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}", server.RequestHandlerClass
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def sweep_jobs():
+    """sweep_jobs(provider keys, files per provider) -> Jobs over the first PDFs of Data/Oppejoud, which have label files."""
+    from sweep import collect_jobs
+
+    def jobs(providers=("claude",), files=1):
+        return [job for key in providers for job in collect_jobs([key], ["Oppejoud"])[:files]]
+
+    return jobs
@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+from batch import BatchRunner
+
+
+def test_submit_poll_collect_and_requeue(mock_server, sweep_jobs, tmp_path):
+    base_url, handler = mock_server(batch_delay=0.2)
+    send_batch, batch_results = handler.send_batch, handler.batch_results
+    outages = {"status": 4, "results": 1}
+
+    def flaky_send_batch(self, batch_id, results=False):
+        # Status polls fail more often in a row than the runner's retries, then one results download fails
+        kind = "results" if results else "status"
+        if self.command == "GET" and outages[kind]:
+            outages[kind] -= 1
+            return self.send_json(503, {"error": {"type": "overloaded_error", "message": "Overloaded"}})
+        return send_batch(self, batch_id, results)
+
+    def first_item_errored_once(self, items):
+        results = batch_results(self, items)
+        if handler.stats.get("batches", 0) == 0:
+            results[0] = (results[0][0], None, "Internal server error (mock server)")
+        return results
+
+    handler.send_batch = flaky_send_batch
+    handler.batch_results = first_item_errored_once
+
+    state_path = tmp_path / "batches.json"
+    runner = BatchRunner(base_url=base_url, results_dir=str(tmp_path / "results"), retries=2, rate_limit=False,
+                         verbose=False, poll_interval=0.05, state_path=state_path)
+    report = asyncio.run(runner.run(sweep_jobs(["claude"], files=2)))
+
+    assert report.failed == [] and len(report.passed) == 2
+    assert outages == {"status": 0, "results": 0}
+    # Only the errored item went into a second batch; the unreadable batch was never submitted again
+    assert handler.stats["batches"] == 2
+    assert report.batch_stats["claude"]["requests"] == 3
+    assert report.batch_stats["claude"]["requeued"] == 1
+    assert json.loads(state_path.read_text(encoding="utf-8")) == {}
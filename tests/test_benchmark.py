@@ -0,0 +1,25 @@
+import pytest
+
+import metrics
+import Results
+from benchmark import run_scale
+
+
+def test_run_scale_times_every_stage_and_restores_the_results_globals(tmp_path):
+    originals = Results.base_dir, Results.RESULTS_CACHE_DIR
+    stages = run_scale(30, tmp_path, report=False, repeat=1)
+    assert list(stages) == ["ingest", "generate+ingest", "load cold", "load cached", "load cached +justifications",
+                            "metrics", "cli metrics"]
+    assert (Results.base_dir, Results.RESULTS_CACHE_DIR) == originals
+    assert len(list((tmp_path / "corpus_30" / "Results").rglob("*.json"))) == 30
+
+
+def test_a_failing_stage_still_restores_the_results_globals(tmp_path, monkeypatch):
+    def broken(df):
+        raise RuntimeError("metrics stage failed")
+
+    monkeypatch.setattr(metrics, "confusion_counts", broken)
+    originals = Results.base_dir, Results.RESULTS_CACHE_DIR
+    with pytest.raises(RuntimeError, match="metrics stage failed"):
+        run_scale(6, tmp_path, report=False, repeat=1)
+    assert (Results.base_dir, Results.RESULTS_CACHE_DIR) == originals
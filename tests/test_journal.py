@@ -0,0 +1,87 @@
+import json
+
+import journal
+from journal import DONE, FAILED, IN_FLIGHT, QUEUED, SweepJournal
+
+
+def key(name):
+    return ("claude", "claude-opus-4-5", "Oppejoud", name, "0123456789abcdef")
+
+
+def test_replay_keeps_the_last_record_of_every_job(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    log = SweepJournal(path)
+    log.record([key("a"), key("b")], QUEUED)
+    log.record(key("a"), IN_FLIGHT)
+    log.record(key("a"), DONE)
+    log.record(key("b"), FAILED, "Error: API returned HTTP 500.")
+    log.close()
+
+    replayed = SweepJournal(path)
+    assert replayed.status(key("a")) == DONE
+    assert replayed.status(key("b")) == FAILED
+    assert replayed.states[key("b")]["error"] == "Error: API returned HTTP 500."
+    assert replayed.status(key("c")) is None
+    assert replayed.counts() == {DONE: 1, FAILED: 1}
+
+
+def test_truncated_line_is_skipped_and_does_not_swallow_the_next_record(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    log = SweepJournal(path)
+    log.record(key("a"), DONE)
+    log.record(key("b"), IN_FLIGHT)
+    log.close()
+    # A crash in the middle of writing the last line
+    text = path.read_text(encoding="utf-8")
+    path.write_text(text[:-25], encoding="utf-8")
+
+    resumed = SweepJournal(path)
+    assert resumed.status(key("a")) == DONE
+    assert resumed.status(key("b")) is None
+    resumed.record(key("c"), DONE)
+    resumed.close()
+
+    replayed = SweepJournal(path)
+    assert replayed.status(key("a")) == DONE
+    assert replayed.status(key("c")) == DONE
+
+
+def test_garbage_and_incomplete_records_are_ignored(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    record = dict(zip(journal.KEY_FIELDS, key("a")), status=DONE)
+    path.write_text("not json\n" + json.dumps({"provider": "claude", "status": DONE}) + "\n"
+                    + json.dumps(record) + "\n", encoding="utf-8")
+    log = SweepJournal(path)
+    assert log.states == {key("a"): record}
+    assert log.lines == 1
+
+
+def test_compaction_on_open_keeps_only_the_latest_records(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    log = SweepJournal(path)
+    for _ in range(journal.COMPACT_RATIO + 1):
+        log.record([key("a"), key("b")], IN_FLIGHT)
+    log.record(key("a"), DONE)
+    log.close()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2 * (journal.COMPACT_RATIO + 1) + 1
+
+    compacted = SweepJournal(path)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == compacted.lines == 2
+    assert {json.loads(line)["file"]: json.loads(line)["status"] for line in lines} == {"a": DONE, "b": IN_FLIGHT}
+    assert not path.with_suffix(".tmp").exists()
+
+    # Appending after a compaction goes to the rewritten file
+    compacted.record(key("b"), DONE)
+    compacted.close()
+    assert SweepJournal(path).counts() == {DONE: 2}
+
+
+def test_small_logs_are_not_compacted(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    log = SweepJournal(path)
+    for status in (QUEUED, IN_FLIGHT, DONE):
+        log.record(key("a"), status)
+    log.close()
+    assert SweepJournal(path).lines == 3
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
@@ -0,0 +1,96 @@
+import json
+
+import pandas as pd
+import pytest
+
+import justification_index
+from ground_truth import GroundTruthIndex
+from justification_index import JustificationIndex
+
+pytest.importorskip("pyarrow")
+
+MODELS = ["Claude Opus 4.5", "Gemini 3 Pro"]
+
+
+def write_result(path, file_name, smells):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"file_name": file_name, "smell_analysis": [
+        {"rule_id": rule_id, "actual": actual, "detected": detected, "justification": justification}
+        for rule_id, actual, detected, justification in smells]}), encoding="utf-8")
+
+
+@pytest.fixture
+def base_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(justification_index, "RESULTS_CACHE_DIR", tmp_path / "cache")
+    base_dir = tmp_path / "Results"
+    write_result(base_dir / "Claude" / "Oppejoud" / "Kool.json", "Kool", [
+        ("G6.3", False, True, "The Foreign Key of Klass is shown as an attribute."),
+        ("N1.1", True, True, "Class names mix Estonian and English."),
+    ])
+    write_result(base_dir / "Gemini" / "Oppejoud" / "Kool.json", "Kool", [
+        ("G6.3", False, False, "No foreign keys are modelled as attributes."),
+        ("N1.1", True, False, "Names are consistent."),
+    ])
+    return base_dir
+
+
+@pytest.fixture
+def index(base_dir, tmp_path):
+    index = JustificationIndex(tmp_path / "index")
+    assert index.update(MODELS, base_dir) == 2
+    return index
+
+
+def test_phrase_prefix_and_facets(index):
+    assert index.search("foreign key")['LLM'].tolist() == ["Claude Opus 4.5"]
+    assert index.search("foreign key*")['LLM'].tolist() == ["Claude Opus 4.5", "Gemini 3 Pro"]
+    # Both words, but not as a phrase
+    assert index.search("key foreign").empty
+    assert index.search("", Outcome="FP")['Rule_ID'].tolist() == ["G6.3"]
+    assert index.search("names", LLM="Gemini 3 Pro", Rule_ID=["N1.1"])['Outcome'].tolist() == ["FN"]
+    with pytest.raises(ValueError, match="Unknown facet 'Model'"):
+        index.search("names", Model="Gemini 3 Pro")
+
+
+def test_reopened_index_updates_only_changed_files(index, base_dir, tmp_path):
+    write_result(base_dir / "Gemini" / "Oppejoud" / "Kool.json", "Kool", [
+        ("G6.3", False, True, "A foreign key attribute is repeated."),
+        ("N1.1", True, True, "Estonian and English names are mixed."),
+    ])
+    (base_dir / "Claude" / "Oppejoud" / "Kool.json").unlink()
+
+    reopened = JustificationIndex(tmp_path / "index")
+    assert len(reopened.search("")) == 4
+    assert reopened.update(MODELS, base_dir) == 1
+    assert reopened.search("foreign key")['LLM'].tolist() == ["Gemini 3 Pro"]
+    assert reopened.search("", Outcome="TP")['Rule_ID'].tolist() == ["N1.1"]
+    # Dead records outnumbered the live ones, so the index was compacted
+    assert len(reopened.records) == 2 and reopened.live.all()
+
+
+def test_relabel_recomputes_the_outcome_facet(index, tmp_path):
+    data_dir = tmp_path / "Data"
+    (data_dir / "Oppejoud").mkdir(parents=True)
+    (data_dir / "Oppejoud" / "Kool.txt").write_text("G6.3", encoding="utf-8")
+    labels = GroundTruthIndex(data_dir, cache_path=tmp_path / "ground_truth.json")
+    labels.refresh()
+
+    assert index.search("", Outcome="FP")['LLM'].tolist() == ["Claude Opus 4.5"]
+    index.relabel(labels)
+    # G6.3 is now a smell of Kool and N1.1 is not
+    assert index.search("", Outcome="TP")['Rule_ID'].tolist() == ["G6.3"]
+    assert index.search("", Rule_ID="G6.3", LLM="Gemini 3 Pro")['Outcome'].tolist() == ["FN"]
+    assert index.search("", Rule_ID="N1.1")['Outcome'].tolist() == ["FP", "TN"]
+
+
+def test_save_without_a_parquet_engine_warns(base_dir, tmp_path, monkeypatch, capsys):
+    def no_engine(*args, **kwargs):
+        raise ImportError("Unable to find a usable engine")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", no_engine)
+    index = JustificationIndex(tmp_path / "index")
+    index.update(MODELS, base_dir)
+    assert "no Parquet engine installed (pip install pyarrow)" in capsys.readouterr().out
+    assert not (tmp_path / "index" / "manifest.json").exists()
+    # The index still answers from memory
+    assert len(index.search("foreign key*")) == 2
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from metrics import confusion_counts, counts_for, rollup, summarize
+
+# (LLM, Category, Rule_ID, File, Actual, Detected)
+ROWS = [
+    ("Gemini 3 Pro", "Oppejoud", "G5.1", "Kool", True, True),       # TP
+    ("Gemini 3 Pro", "Oppejoud", "G5.1", "Kool", True, False),      # FN
+    ("Gemini 3 Pro", "Oppejoud", "S1.1", "Kool", False, True),      # FP
+    ("Gemini 3 Pro", "Oppejoud", "S1.1", "Hotell", False, False),   # TN
+    ("GPT-5.1", "Oppejoud", "G5.1", "Kool", True, True),            # TP
+    ("GPT-5.1", "Yliopilased", "G5.1", "Tooaeg", False, True),      # FP
+    ("GPT-5.1", "Yliopilased", "G5.1", "Tooaeg", None, True),       # no label: not scored
+]
+
+
+def results_frame(rows=ROWS):
+    df = pd.DataFrame(rows, columns=['LLM', 'Category', 'Rule_ID', 'File', 'Actual', 'Detected'])
+    for column in ('LLM', 'Category', 'Rule_ID', 'File'):
+        df[column] = df[column].astype('category')
+    df['Actual'] = df['Actual'].astype('boolean')
+    return df
+
+
+def test_confusion_counts_per_key_combination():
+    counts = confusion_counts(results_frame())
+    assert counts.values.tolist() == [
+        ["Gemini 3 Pro", "Oppejoud", "G5.1", "Kool", 1, 0, 0, 1],
+        ["Gemini 3 Pro", "Oppejoud", "S1.1", "Kool", 0, 1, 0, 0],
+        ["Gemini 3 Pro", "Oppejoud", "S1.1", "Hotell", 0, 0, 1, 0],
+        ["GPT-5.1", "Oppejoud", "G5.1", "Kool", 1, 0, 0, 0],
+        ["GPT-5.1", "Yliopilased", "G5.1", "Tooaeg", 0, 1, 0, 0],
+    ]
+    assert list(counts.columns) == ['LLM', 'Category', 'Rule_ID', 'File', 'TP', 'FP', 'TN', 'FN']
+
+
+def test_rollup_and_scores():
+    counts = confusion_counts(results_frame())
+    per_llm = rollup(counts, ['LLM'])
+    assert per_llm.values.tolist() == [["Gemini 3 Pro", 1, 1, 1, 1], ["GPT-5.1", 1, 1, 0, 0]]
+    assert rollup(counts)[['TP', 'FP', 'TN', 'FN']].values.tolist() == [[2, 2, 1, 1]]
+
+    scores = summarize(counts, ['LLM']).set_index('LLM')
+    assert scores.loc["Gemini 3 Pro", 'Accuracy'] == 0.5
+    assert scores.loc["Gemini 3 Pro", 'F1-Score'] == 0.5
+    assert scores.loc["GPT-5.1", 'Precision'] == 0.5
+    assert scores.loc["GPT-5.1", 'Recall'] == 1.0
+    assert scores.loc["GPT-5.1", 'FPR'] == 1.0
+    assert scores.loc["GPT-5.1", 'Sample Size'] == 2
+    # S1.1 has no positives: Recall and F1 are 0, like sklearn's zero_division=0
+    assert summarize(counts, ['Rule_ID']).set_index('Rule_ID').loc["S1.1", ['Recall', 'F1-Score']].tolist() == [0.0, 0.0]
+
+
+def test_counts_for_sees_edits_to_the_same_frame():
+    df = results_frame()
+    assert counts_for(df)['TP'].sum() == 2
+    df.loc[0, 'Detected'] = False
+    assert counts_for(df)['TP'].sum() == 1
+    counts = confusion_counts(df)
+    assert counts_for(counts) is counts
+
+
+def test_confusion_counts_of_fewer_keys_match_the_rollup():
+    df = results_frame()
+    by_rule = confusion_counts(df, ['Rule_ID'])
+    expected = rollup(confusion_counts(df), ['Rule_ID'])
+    pd.testing.assert_frame_equal(by_rule.astype({'Rule_ID': str}), expected.astype({'Rule_ID': str}), check_dtype=False)
+
+
+@pytest.mark.parametrize("rows", [[], [ROWS[-1]]])
+def test_nothing_to_score(rows):
+    assert confusion_counts(results_frame(rows)).empty
@@ -0,0 +1,75 @@
+import pytest
+
+from pdf_pages import IMAGE_TOKEN_CAP, PageCache
+
+
+def render(dpi, kb):
+    # A4 at dpi, like pymupdf renders it
+    return {"file": f"p001_{dpi}.png", "bytes": kb * 1024, "width": round(595 * dpi / 72), "height": round(842 * dpi / 72)}
+
+
+def page(index, small_font_pt, text="Õppejõud"):
+    return {"index": index, "text_file": f"p{index:03d}.txt", "text_chars": len(text),
+            "text_bytes": len(text.encode("utf-8")), "small_font_pt": small_font_pt,
+            "renders": {"72": render(72, 20), "110": render(110, 40), "150": render(150, 70)}}
+
+
+def manifest(*fonts, pdf_kb=100):
+    return {"version": 2, "sha256": "0" * 64, "source": "x.pdf", "pdf_bytes": pdf_kb * 1024,
+            "resolutions": [72, 110, 150], "pages": [page(i, font) for i, font in enumerate(fonts, start=1)]}
+
+
+@pytest.mark.parametrize("small_font_pt, dpi", [(12.0, 72), (8.0, 72), (5.7, 110), (4.0, 150), (2.0, 150), (None, 150)])
+def test_page_dpi_is_the_cheapest_readable_rung(small_font_pt, dpi):
+    assert PageCache().page_dpi({"small_font_pt": small_font_pt}) == dpi
+
+
+def test_choose_renders_per_page_or_fixed():
+    cache = PageCache()
+    pages = manifest(12.0, 5.7, None)
+    assert [render["file"] for _, render in cache.choose_renders(pages)] == ["p001_72.png", "p001_110.png", "p001_150.png"]
+    assert {render["file"] for _, render in cache.choose_renders(pages, "72")} == {"p001_72.png"}
+
+
+def test_auto_keeps_renders_that_cost_fewer_tokens_even_when_larger():
+    cache = PageCache()
+    # 110 dpi A4 pages are ~1100 tokens each, less than a PDF page; the PNGs outweigh the 50 KB PDF
+    pages = manifest(5.7, 5.7, pdf_kb=50)
+    chosen = cache.auto_renders(pages)
+    assert chosen is not None
+    assert cache.estimate_tokens(pages, chosen) < cache.estimate_tokens(pages)
+    assert cache.estimate_bytes(pages, chosen) > cache.estimate_bytes(pages)
+
+
+def test_auto_falls_back_to_the_pdf_when_renders_cost_as_many_tokens():
+    cache = PageCache()
+    # Unknown font sizes need 150 dpi, which the providers downscale to a full IMAGE_TOKEN_CAP page
+    pages = manifest(None, None)
+    assert cache.estimate_tokens(pages, cache.choose_renders(pages)) == cache.estimate_tokens(pages)
+    assert cache.auto_renders(pages) is None
+
+
+def test_estimate_bytes_counts_encoded_text():
+    pages = manifest(12.0)
+    chosen = PageCache().choose_renders(pages)
+    # "Õppejõud" is 8 characters but 10 bytes of UTF-8
+    assert PageCache.estimate_bytes(pages, chosen) == 20 * 1024 + 10
+    assert PageCache.estimate_tokens(pages) == IMAGE_TOKEN_CAP + 8 // 4
+
+
+def test_attachments_of_a_generated_pdf(tmp_path):
+    pymupdf = pytest.importorskip("pymupdf")
+    pdf_path = tmp_path / "Kool.pdf"
+    with pymupdf.open() as doc:
+        doc.new_page().insert_text((72, 72), "Õpilane 1..* Klass", fontsize=6)
+        doc.save(pdf_path)
+
+    cache = PageCache(tmp_path / "pages")
+    attachments = cache.attachments(str(pdf_path), "auto")
+    assert [a.name for a in attachments] == ["Kool_p001.png", "Kool.txt"]
+    assert "Õpilane 1..* Klass" in attachments[1].data.decode("utf-8")
+
+    manifest = cache.manifest(str(pdf_path))
+    assert cache.page_dpi(manifest["pages"][0]) == 110
+    assert manifest["pages"][0]["text_bytes"] == len("Õpilane 1..* Klass".encode("utf-8"))
+    assert cache.attachments(str(pdf_path), "pdf")[0].data == pdf_path.read_bytes()
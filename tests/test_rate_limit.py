@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from api_clients import rate_limit
+from api_clients.rate_limit import RateLimiter, parse_reset, rate_limit_headers
+
+# The real sleep, before the clock fixture replaces it
+YIELD = asyncio.sleep
+
+
+class Clock:
+    """Stands in for time.monotonic and asyncio.sleep, so waits take no real time."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+        await YIELD(0)  # let the other tasks run, like a real sleep
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("1s", 1.0), ("6m0s", 360.0), ("20ms", 0.02), ("1h2m3.5s", 3723.5), ("2.5", 2.5), ("-3", 0.0),
+    ("", None), (None, None), ("soon", None), ("nan", None), ("inf", None),
+])
+def test_parse_reset(value, seconds):
+    assert parse_reset(value) == seconds
+
+
+def test_parse_reset_rfc3339():
+    reset = (datetime.now(timezone.utc) + timedelta(seconds=30)).isoformat().replace("+00:00", "Z")
+    assert 28 < parse_reset(reset) <= 30
+    assert parse_reset("2001-01-01T00:00:00Z") == 0.0
+
+
+def test_parse_reset_http_date():
+    reset = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 28 < parse_reset(reset) <= 30
+    assert parse_reset("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_429_with_limits_but_no_reset_pauses_for_the_default(clock):
+    limiter = RateLimiter("claude/test", requests_per_minute=60, tokens_per_minute=100000)
+    limiter.update(429, {"anthropic-ratelimit-requests-limit": "60", "anthropic-ratelimit-requests-remaining": "0"})
+    assert limiter.paused_until == clock.now + rate_limit.DEFAULT_RETRY_AFTER
+
+
+def test_rate_limit_headers_of_both_styles():
+    openai = {"x-ratelimit-limit-requests": "500", "x-ratelimit-remaining-requests": "499",
+              "x-ratelimit-reset-requests": "120ms", "x-ratelimit-limit-tokens": "30000"}
+    assert rate_limit_headers(openai) == {"requests": (500.0, 499.0, 0.12), "tokens": (30000.0, None, None)}
+    anthropic = {"anthropic-ratelimit-tokens-limit": "80000", "anthropic-ratelimit-tokens-remaining": "0"}
+    assert rate_limit_headers(anthropic) == {"tokens": (80000.0, 0.0, None)}
+    assert rate_limit_headers({}) == {}
+
+
+def test_garbage_headers_are_ignored_like_missing_ones(clock):
+    garbage = {"x-ratelimit-limit-requests": "unlimited", "x-ratelimit-remaining-requests": " ",
+               "x-ratelimit-reset-requests": "later", "x-ratelimit-limit-tokens": "-5",
+               "x-ratelimit-remaining-tokens": "nan", "retry-after": "whenever"}
+    assert rate_limit_headers(garbage) == {}
+
+    limiter = RateLimiter("grok/test", requests_per_minute=60, tokens_per_minute=100000)
+    limiter.update(200, garbage)
+    assert limiter.limits == {"requests": 60.0, "tokens": 100000.0}
+    limiter.update(429, garbage)
+    assert limiter.rates == {"requests": 30.0, "tokens": 50000.0}
+    assert limiter.paused_until == clock.now + rate_limit.DEFAULT_RETRY_AFTER
+
+
+def test_429_backs_off_pauses_and_recovers(clock):
+    limiter = RateLimiter("claude/test", requests_per_minute=60, tokens_per_minute=100000)
+    limiter.update(429, {"retry-after": "3", "x-ratelimit-limit-requests": "60", "x-ratelimit-remaining-requests": "0"})
+
+    # Only the exhausted bucket backs off, and the limiter waits out Retry-After
+    assert limiter.rates == {"requests": 30.0, "tokens": 100000.0}
+    assert limiter.rate_limited == 1
+    assert limiter._wait(100) == pytest.approx(3.0)
+
+    clock.now += 3
+    assert limiter._wait(100) == 0
+
+    # Additive increase of INCREASE_SHARE of the limit per successful reply, capped at the limit
+    steps = round((1 - rate_limit.DECREASE_FACTOR) / rate_limit.INCREASE_SHARE)
+    for _ in range(steps - 1):
+        limiter.update(200, {})
+    assert limiter.rates["requests"] < 60
+    limiter.update(200, {})
+    limiter.update(200, {})
+    assert limiter.rates["requests"] == 60.0
+
+
+def test_429_without_headers_backs_off_both_buckets_down_to_the_floor(clock):
+    limiter = RateLimiter("gemini/test", requests_per_minute=100, tokens_per_minute=1000)
+    limiter.update(429, {})
+    assert limiter.rates == {"requests": 50.0, "tokens": 500.0}
+    assert limiter.paused_until == clock.now + rate_limit.DEFAULT_RETRY_AFTER
+    for _ in range(10):
+        limiter.update(429, {})
+    assert limiter.rates == {"requests": 100 * rate_limit.MIN_SHARE, "tokens": 1000 * rate_limit.MIN_SHARE}
+
+
+def test_reset_header_is_the_pause_when_retry_after_is_missing(clock):
+    limiter = RateLimiter("chatgpt/test", requests_per_minute=60, tokens_per_minute=100000)
+    limiter.update(429, {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "6s"})
+    assert limiter.paused_until == clock.now + 6
+    assert limiter.rates["requests"] == 60.0
+
+
+def test_headers_replace_the_configured_limits(clock):
+    limiter = RateLimiter("grok/test", requests_per_minute=50, tokens_per_minute=400000)
+    limiter.update(200, {"x-ratelimit-limit-requests": "10", "x-ratelimit-remaining-requests": "2"})
+    assert limiter.limits["requests"] == 10.0
+    assert limiter.rates["requests"] == 10.0
+    assert limiter.levels["requests"] == 2.0
+
+    # Reported usage gives back the overestimate
+    level = limiter.levels["tokens"]
+    limiter.update(200, {}, tokens=5000, used_tokens=3000)
+    assert limiter.levels["tokens"] == level + 2000
+
+
+def test_acquire_waits_for_the_pause_in_arrival_order(clock):
+    limiter = RateLimiter("claude/test", requests_per_minute=60, tokens_per_minute=100000)
+    limiter.update(429, {"retry-after": "2", "x-ratelimit-remaining-requests": "0"})
+    order = []
+
+    async def send(name):
+        await limiter.acquire(100)
+        order.append((name, clock.now))
+
+    async def main():
+        await asyncio.gather(send("first"), send("second"))
+
+    asyncio.run(main())
+    assert [name for name, _ in order] == ["first", "second"]
+    assert order[0][1] >= 1002.0
+    # The second request waits for the request bucket (30 rpm after the back-off) to refill
+    assert order[1][1] - order[0][1] == pytest.approx(2.0)
+    stats = limiter.stats()
+    assert stats["requests"] == 2 and stats["throttled"] == 2 and stats["max_queue"] == 2
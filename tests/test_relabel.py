@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+from Results import apply_ground_truth, relabeled_records
+from ground_truth import GroundTruthIndex
+
+# (Category, File, Rule_ID, Actual stored in the result file)
+ROWS = [
+    ("Oppejoud", "Kool", "G5.1", True),
+    ("Oppejoud", "Kool", "S1.1", True),
+    ("Oppejoud", "Kool", "N1.1", False),
+    ("Synthetic -> Single", "s_01", "N1.1", True),
+    ("Synthetic -> Single", "s_01", "G5.1", False),
+]
+
+
+def results_frame(rows=ROWS):
+    """Rows shaped like Results.load_data(): categorical keys, boolean Actual and Detected."""
+    df = pd.DataFrame(rows, columns=['Category', 'File', 'Rule_ID', 'Actual'])
+    for column in ('Category', 'File', 'Rule_ID'):
+        df[column] = df[column].astype('category')
+    df.insert(0, 'LLM', pd.Categorical(['Gemini 3 Pro'] * len(df)))
+    df['Detected'] = True
+    return df
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    data = tmp_path / "Data"
+    (data / "Oppejoud").mkdir(parents=True)
+    (data / "Synthetic" / "Single").mkdir(parents=True)
+    (data / "Oppejoud" / "Kool.txt").write_text("G5.1, S1.1\n", encoding="utf-8")
+    (data / "Synthetic" / "Single" / "s_01.txt").write_text("N1.1", encoding="utf-8")
+    (data / "Oppejoud" / "LOEMIND.txt").write_text("Not a label file", encoding="utf-8")
+    return data
+
+
+def relabel(data_dir, df, cache_path=None):
+    index = GroundTruthIndex(data_dir, cache_path=cache_path)
+    index.refresh()
+    return apply_ground_truth(df, index, verbose=False)
+
+
+def test_unchanged_labels_change_nothing(data_dir):
+    df = relabel(data_dir, results_frame())
+    assert df['Actual'].tolist() == [True, True, False, True, False]
+    assert df['Stored_Actual'].tolist() == df['Actual'].tolist()
+    assert relabeled_records(df).empty
+
+
+def test_relabeling_a_changed_label_file(data_dir, tmp_path, capsys):
+    cache_path = tmp_path / "ground_truth.json"
+    index = GroundTruthIndex(data_dir, cache_path=cache_path)
+    index.refresh()
+
+    (data_dir / "Oppejoud" / "Kool.txt").write_text("G5.1,N1.1,N3.1", encoding="utf-8")
+    # A new index reads the cache and re-parses only the edited file
+    index = GroundTruthIndex(data_dir, cache_path=cache_path)
+    assert index.refresh() == ["Oppejoud/Kool.txt"]
+
+    df = apply_ground_truth(results_frame(), index)
+    assert df['Actual'].tolist() == [True, False, True, True, False]
+    assert df['Stored_Actual'].tolist() == [row[3] for row in ROWS]
+
+    changed = relabeled_records(df)
+    assert changed['Rule_ID'].astype(str).tolist() == ["S1.1", "N1.1"]
+    assert "Oppejoud/Kool: +N1.1 -S1.1" in capsys.readouterr().out
+
+
+def test_files_without_a_label_file_get_no_label(data_dir):
+    rows = ROWS + [("Yliopilased", "Tooaeg", "G5.1", False)]
+    df = relabel(data_dir, results_frame(rows))
+    assert df['Actual'].dtype == 'boolean'
+    assert df['Actual'].isna().tolist() == [False] * len(ROWS) + [True]
+    assert relabeled_records(df)['File'].astype(str).tolist() == ["Tooaeg"]
+
+
+def test_removed_label_files_take_the_labels_away(data_dir):
+    for path in data_dir.rglob("*.txt"):
+        path.unlink()
+    # An index without label files is empty (falsy), and must not fall back to the real Data/ folder
+    df = relabel(data_dir, results_frame())
+    assert df['Actual'].isna().all()
+    assert len(relabeled_records(df)) == len(ROWS)
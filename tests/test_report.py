@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import metrics
+from report import build_report, section_key, sections
+
+pytest.importorskip("seaborn")
+
+CATEGORIES = ["Oppejoud", "Yliopilased", "Synthetic -> Single", "Synthetic -> Multi"]
+RULES = ["G5.1", "S1.1", "N1.1", "N3.1"]
+
+
+def results_frame(seed=0):
+    """Random verdicts of two LLMs on two files per category, shaped like Results.load_data()."""
+    rng = np.random.default_rng(seed)
+    rows = [(llm, category, f"{category[:3]}_{n}", rule)
+            for llm in ("ChatGPT 5.1", "Gemini 3 Pro") for category in CATEGORIES for n in range(2) for rule in RULES]
+    df = pd.DataFrame(rows, columns=['LLM', 'Category', 'File', 'Rule_ID'])
+    df['Actual'] = rng.random(len(df)) < 0.4
+    df['Detected'] = rng.random(len(df)) < 0.5
+    return df
+
+
+def test_section_key_follows_the_content():
+    counts = metrics.confusion_counts(results_frame())
+    key = section_key("plot_hallucinations", (counts,), "code")
+    assert section_key("plot_hallucinations", (counts.copy(),), "code") == key
+    assert section_key("plot_paranoia_heatmap", (counts,), "code") != key
+    assert section_key("plot_hallucinations", (counts,), "other code") != key
+    changed = counts.copy()
+    changed.loc[0, 'TP'] += 1
+    assert section_key("plot_hallucinations", (changed,), "code") != key
+
+
+def test_second_build_reuses_the_cached_sections(tmp_path):
+    df = results_frame()
+    output, cache = tmp_path / "Report", tmp_path / "figures"
+    total, rendered = build_report(metrics.counts_for(df), output, cache, workers=1)
+    assert total == len(sections(metrics.counts_for(df))) and rendered == total
+    html = (output / "index.html").read_text(encoding="utf-8")
+    assert html.count("<img src='figures/") >= total - 1
+
+    # Nothing changed: every section comes from the cache and the report is the same
+    assert build_report(metrics.counts_for(df), output, cache, workers=1) == (total, 0)
+    assert (output / "index.html").read_text(encoding="utf-8") == html
+
+    # Other verdicts in Synthetic -> Multi render again only the sections that show that category
+    df.loc[df['Category'] == "Synthetic -> Multi", 'Detected'] ^= True
+    _, rendered = build_report(metrics.counts_for(df), output, cache, workers=1)
+    untouched = [title for title, _, args in sections(metrics.counts_for(df))
+                 if "Synthetic -> Multi" not in set(args[0]['Category'])]
+    assert untouched == ["Real World (Oppejoud + Yliopilased)", "Oppejoud", "Yliopilased", "Synthetic -> Single",
+                         "Strategy Map: Real World (Oppejoud + Yliopilased)"]
+    assert rendered == total - len(untouched)
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+import metrics
+import Results
+from results_cli import count_results, metric_rows, metrics_main, write_fixture
+from scoring import COUNTS
+
+MODELS = ["ChatGPT 5.1", "Gemini 3 Pro"]
+
+# LLM folder -> {result file: (file_name, [(rule_id, actual, detected)])}
+TREE = {
+    "ChatGPT": {
+        "Oppejoud/Kool.json": ("Kool", [("G5.1", True, True), ("S1.1", False, True), ("N1.1", True, False)]),
+        "Oppejoud/Hotell.json": ("Hotell", [("G5.1", False, False), ("S1.1", None, True)]),
+        "Synthetic/Single/s_01.json": ("s_01", [("N1.1", True, True), ("G5.1", False, True)]),
+    },
+    "Gemini": {
+        "Oppejoud/Kool.json": ("Kool", [("G5.1", True, False), ("S1.1", False, False), ("N1.1", True, True)]),
+        "Synthetic/Single/s_01.json": ("s_01", [("N1.1", True, True), ("G5.1", False, False)]),
+    },
+}
+
+
+@pytest.fixture
+def results_dir(tmp_path, monkeypatch):
+    base_dir = tmp_path / "Results"
+    for folder, files in TREE.items():
+        for rel, (file_name, smells) in files.items():
+            path = base_dir / folder / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"file_name": file_name, "smell_analysis": [
+                {"rule_id": rule_id, "actual": actual, "detected": detected, "justification": ""}
+                for rule_id, actual, detected in smells]}), encoding="utf-8")
+    (base_dir / "Gemini" / "Oppejoud" / "Broken.json").write_text("{", encoding="utf-8")
+    monkeypatch.setattr(Results, "base_dir", str(base_dir))
+    monkeypatch.setattr(Results, "RESULTS_CACHE_DIR", tmp_path / "cache")
+    return base_dir
+
+
+def test_cli_and_metrics_agree(results_dir):
+    cli = metric_rows(count_results(MODELS, str(results_dir)), "Category")
+    table = metrics.summarize(metrics.confusion_counts(Results.load_data(MODELS, justifications=False)),
+                              ['LLM', 'Category'])
+    assert len(cli) == len(table) == 4
+    for row, (_, expected) in zip(cli, table.iterrows()):
+        assert (row['LLM'], row['Category']) == (expected['LLM'], expected['Category'])
+        assert [row[name] for name in COUNTS] == expected[COUNTS].tolist()
+        for score in ('Accuracy', 'Precision', 'Recall', 'F1-Score', 'FPR', 'Sample Size'):
+            assert row[score] == pytest.approx(expected[score])
+
+
+def test_metrics_command_json(results_dir, capsys):
+    metrics_main(["--base-dir", str(results_dir), "--models", *MODELS, "--by", "LLM", "--format", "json", "--counts"])
+    rows = json.loads(capsys.readouterr().out)
+    # ChatGPT: TP 2, FP 2, TN 1, FN 1 (the unlabeled verdict is not scored)
+    assert [(row['LLM'], [row[name] for name in COUNTS]) for row in rows] == [
+        ("ChatGPT 5.1", [2, 2, 1, 1]), ("Gemini 3 Pro", [2, 0, 2, 1])]
+    assert rows[0]['F1-Score'] == pytest.approx(4 / 7)
+
+
+def test_min_f1_gate(results_dir, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        metrics_main(["--base-dir", str(results_dir), "--models", *MODELS, "--format", "csv", "--min-f1", "0.6"])
+    assert exit_info.value.code == 1
+    assert "F1-Score below 0.6: ChatGPT 5.1" in capsys.readouterr().err
+
+
+def test_budget_fixture_tree_is_scored(tmp_path):
+    write_fixture(tmp_path)
+    assert count_results(["ChatGPT 5.1"], str(tmp_path)) == {("ChatGPT 5.1", "Oppejoud"): [1, 1, 0, 1]}
+
+
+def test_load_data_loads_a_repeated_model_once(results_dir):
+    df = Results.load_data(["Gemini 3 Pro", "ChatGPT 5.1", "Gemini 3 Pro"], justifications=False)
+    assert list(df['LLM'].cat.categories) == ["Gemini 3 Pro", "ChatGPT 5.1"]
+    assert df['LLM'].value_counts().to_dict() == {"ChatGPT 5.1": 7, "Gemini 3 Pro": 5}
+
+
+def test_cli_counts_a_repeated_model_once(results_dir):
+    assert count_results(["ChatGPT 5.1", "ChatGPT 5.1"], str(results_dir)) == count_results(["ChatGPT 5.1"], str(results_dir))
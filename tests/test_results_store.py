@@ -0,0 +1,71 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from results_store import ResultsStore
+
+pytest.importorskip("pyarrow")
+
+
+def write_result(path, file_name, detected):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"file_name": file_name, "smell_analysis": [
+        {"rule_id": rule_id, "actual": rule_id == "G5.1", "detected": rule_id in detected, "justification": f"{file_name} {rule_id}"}
+        for rule_id in ("G5.1", "S1.1")]}), encoding="utf-8")
+
+
+@pytest.fixture
+def llm_path(tmp_path):
+    llm_path = tmp_path / "Results" / "Gemini"
+    write_result(llm_path / "Oppejoud" / "Kool.json", "Kool", {"G5.1"})
+    write_result(llm_path / "Oppejoud" / "Hotell.json", "Hotell", set())
+    write_result(llm_path / "Synthetic" / "Single" / "s_01.json", "s_01", {"S1.1"})
+    return llm_path
+
+
+def load(llm_path, cache_dir, columns=None):
+    store = ResultsStore(llm_path, cache_dir=cache_dir)
+    return store, store.load(columns)
+
+
+def test_second_load_reads_the_cache(llm_path, tmp_path):
+    store, first = load(llm_path, tmp_path / "cache")
+    assert store.parsed == 3 and len(first) == 6
+    assert set(first['Category']) == {"Oppejoud", "Synthetic -> Single"}
+
+    store, second = load(llm_path, tmp_path / "cache")
+    assert store.parsed == 0
+    pd.testing.assert_frame_equal(second, first)
+    # Same rows as a parse without the cache
+    pd.testing.assert_frame_equal(ResultsStore(llm_path, cache_dir=None).load(), first)
+
+
+def test_only_edited_files_are_parsed_again(llm_path, tmp_path):
+    _, before = load(llm_path, tmp_path / "cache")
+    write_result(llm_path / "Oppejoud" / "Hotell.json", "Hotell", {"G5.1", "S1.1"})
+    os.utime(llm_path / "Oppejoud" / "Kool.json")     # touched, not edited
+
+    store, after = load(llm_path, tmp_path / "cache")
+    assert store.parsed == 1
+    # Rows keep the walk order of a fresh parse
+    assert after['Source'].tolist() == before['Source'].tolist()
+    assert after.loc[after['File'] == "Hotell", 'Detected'].tolist() == [True, True]
+    pd.testing.assert_frame_equal(after, ResultsStore(llm_path, cache_dir=None).load())
+
+
+def test_deleted_files_drop_their_records(llm_path, tmp_path):
+    load(llm_path, tmp_path / "cache")
+    (llm_path / "Synthetic" / "Single" / "s_01.json").unlink()
+    store, records = load(llm_path, tmp_path / "cache")
+    assert store.parsed == 0
+    assert sorted(set(records['File'])) == ["Hotell", "Kool"]
+
+
+def test_labels_only_load_keeps_justifications_in_the_cache(llm_path, tmp_path):
+    _, labels = load(llm_path, tmp_path / "cache", ['Category', 'File', 'Rule_ID', 'Actual', 'Detected'])
+    assert 'Justification' not in labels.columns
+    store, full = load(llm_path, tmp_path / "cache")
+    assert store.parsed == 0
+    assert full['Justification'].iloc[0].endswith("G5.1")
@@ -0,0 +1,53 @@
+import pytest
+
+from sharding import merge_shards, shard_rules, shard_validators
+from validation import CHECK_LIST, ValidationError
+
+
+def item(rule_id, detected=False):
+    return {"rule_id": rule_id, "detected": detected, "justification": f"About {rule_id}."}
+
+
+def shard_parts(check_list=CHECK_LIST):
+    """Validated smell_analysis lists of every shard, the way SweepRunner.sharded_reply() builds them."""
+    validators = shard_validators(check_list)
+    return [validators[family].smell_list({"file_name": "x", "smell_analysis": [item(rule_id) for rule_id in rule_ids]})
+            for family, rule_ids in shard_rules(check_list).items()]
+
+
+def test_shards_cover_the_check_list_once():
+    shards = shard_rules()
+    assert list(shards) == ["Generality", "Size", "Naming"]
+    assert sorted(rule_id for rule_ids in shards.values() for rule_id in rule_ids) == sorted(CHECK_LIST)
+
+
+def test_merge_restores_check_list_order():
+    parts = shard_parts()
+    merged = merge_shards(list(reversed(parts)))
+    assert [entry["rule_id"] for entry in merged] == CHECK_LIST
+
+
+def test_overlapping_shard_items_are_rejected():
+    parts = shard_parts()
+    # The Naming shard also answered a Size rule, with a different verdict
+    parts[2] = parts[2] + [item(parts[1][0]["rule_id"], detected=True)]
+    with pytest.raises(ValidationError, match="Duplicate rule_id 'S1.1' across shards"):
+        merge_shards(parts)
+
+    # Even an identical answer is a shard that did not stick to its rules
+    parts = shard_parts()
+    parts[0] = parts[0] + [dict(parts[1][0])]
+    with pytest.raises(ValidationError, match="Duplicate rule_id"):
+        merge_shards(parts)
+
+
+def test_missing_rule_is_rejected():
+    parts = shard_parts()
+    parts[1] = parts[1][1:]
+    with pytest.raises(ValidationError, match="Required rule_id 'S1.1' not found"):
+        merge_shards(parts)
+
+
+def test_merge_of_a_custom_check_list():
+    check_list = ["N1.1", "G5.1", "S2.1"]
+    assert [entry["rule_id"] for entry in merge_shards(shard_parts(check_list), check_list)] == check_list
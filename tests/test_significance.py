@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from significance import bootstrap, file_tensor, mcnemar, mcnemar_p, resampled_counts
+
+
+@pytest.mark.parametrize("b, c, p_value", [
+    (1, 9, 0.021484375),        # 2 * (C(10,0) + C(10,1)) / 2**10, the exact binomial test
+    (10, 2, 0.03857421875),     # 2 * (1 + 12 + 66) / 2**12
+    (0, 5, 0.0625),
+    (4, 4, 1.0),
+    (0, 0, 1.0),
+])
+def test_exact_mcnemar_is_the_two_sided_binomial_test(b, c, p_value):
+    assert mcnemar_p(b, c) == p_value
+
+
+def test_large_mcnemar_uses_chi_square_with_continuity_correction():
+    # scipy.stats.chi2.sf((|600 - 500| - 1)**2 / 1100, df=1)
+    assert mcnemar_p(600, 500) == pytest.approx(0.0028361326556546836)
+
+
+def verdicts(llm, correct, files=("Kool", "Hotell")):
+    """Rows of one LLM: a verdict per (file, rule), correct or wrong as listed."""
+    rules = [f"G{i}.1" for i in range(len(correct) // len(files))]
+    rows = [(llm, "Oppejoud", file, rule) for file in files for rule in rules]
+    df = pd.DataFrame(rows, columns=['LLM', 'Category', 'File', 'Rule_ID'])
+    df['Actual'] = True
+    df['Detected'] = correct
+    return df
+
+
+def test_mcnemar_counts_discordant_pairs():
+    df = pd.concat([verdicts("A", [True, True, True, False]), verdicts("B", [True, False, False, True]),
+                    verdicts("C", [True, True], files=("Kool",))], ignore_index=True)
+    tests = mcnemar(df).set_index(['LLM A', 'LLM B'])
+    assert tests.loc[("A", "B"), ['Paired', 'A only', 'B only']].tolist() == [4, 2, 1]
+    assert tests.loc[("A", "B"), 'p-value'] == mcnemar_p(2, 1) == 1.0
+    # C only answered for Kool: only those verdicts are paired
+    assert tests.loc[("A", "C"), ['Paired', 'A only', 'B only']].tolist() == [2, 0, 0]
+
+
+def test_resamples_draw_whole_files_for_every_llm():
+    df = pd.concat([verdicts("A", [True, True, True, False]), verdicts("B", [True, False, False, True])],
+                   ignore_index=True)
+    llms, tensor = file_tensor(df)
+    assert llms == ["A", "B"]
+    # (LLMs, files, TP FP TN FN)
+    assert tensor.tolist() == [[[2, 0, 0, 0], [1, 0, 0, 1]], [[1, 0, 0, 1], [1, 0, 0, 1]]]
+
+    counts = resampled_counts(tensor, resamples=200, seed=1)
+    assert counts.shape == (200, 2, 4)
+    # Two files drawn per resample, two verdicts each
+    assert np.all(counts.sum(axis=2) == 4)
+    # B's files are identical, so every resample of B is the same
+    assert np.all(counts[:, 1] == [2, 0, 0, 2])
+    np.testing.assert_array_equal(counts, resampled_counts(tensor, resamples=200, seed=1))
+
+
+def test_bootstrap_point_scores_are_the_full_sample():
+    df = pd.concat([verdicts("A", [True, True, True, False]), verdicts("B", [True, False, False, True])],
+                   ignore_index=True)
+    llms, point, resampled = bootstrap(df, resamples=50)
+    assert point['Recall'].tolist() == [0.75, 0.5]
+    assert resampled['Recall'].shape == (50, 2)
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from streaming import StreamingValidator
+from validation import CHECK_LIST, ValidationError
+
+RULES = CHECK_LIST[:3]
+
+
+def reply(justifications, rule_ids=RULES, detected=False):
+    items = [{"rule_id": rule_id, "detected": detected, "justification": text} for rule_id, text in zip(rule_ids, justifications)]
+    return json.dumps({"file_name": "diagram", "smell_analysis": items}, indent=2)
+
+
+def feed_chars(validator, text):
+    for char in text:
+        validator.feed(char)
+
+
+def test_escaped_quotes_and_braces_inside_strings():
+    text = reply(['Class "Order" has {3} ends}', 'Backslash at the end \\', 'Ends with \\"}] quoted'])
+    validator = StreamingValidator(RULES)
+    feed_chars(validator, text)
+    assert validator.items == 3
+    assert validator.result() == text
+
+
+def test_braces_in_file_name_before_the_array():
+    text = json.dumps({"file_name": "a{b}[c]\"d", "smell_analysis": [
+        {"rule_id": RULES[0], "detected": True, "justification": "x"}]})
+    validator = StreamingValidator(RULES[:1])
+    validator.feed(text)
+    assert validator.items == 1
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64])
+def test_chunk_boundaries_do_not_matter(size):
+    text = "```json\n" + reply(['"{"', "}\\\\", "[\\\"]"]) + "\n```"
+    validator = StreamingValidator(RULES)
+    for start in range(0, len(text), size):
+        validator.feed(text[start:start + size])
+    assert validator.items == 3
+
+
+def test_bad_item_fails_before_the_rest_arrives():
+    text = reply(["a", "b", "c"]).replace('"detected": false', '"detected": "no"', 1)
+    validator = StreamingValidator(RULES)
+    first_item_end = text.index("}") + 1
+    with pytest.raises(ValidationError, match="Condition 2.3"):
+        validator.feed(text[:first_item_end])
+    assert validator.items == 0
+
+
+def test_duplicate_and_unknown_rule_ids():
+    validator = StreamingValidator(RULES)
+    with pytest.raises(ValidationError, match="Duplicate rule_id"):
+        validator.feed(reply(["a", "b"], rule_ids=[RULES[0], RULES[0]]))
+
+    validator = StreamingValidator(RULES)
+    with pytest.raises(ValidationError, match="Unknown rule_id"):
+        validator.feed(reply(["a"], rule_ids=["X9.9"]))
+
+
+def test_more_items_than_rules():
+    validator = StreamingValidator(RULES[:1])
+    with pytest.raises(ValidationError, match="found more"):
+        validator.feed(reply(["a", "b"], rule_ids=RULES[:2]))
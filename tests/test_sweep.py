@@ -0,0 +1,120 @@
+import asyncio
+
+from sweep import SweepRunner
+
+
+def run(jobs, base_url, results_dir, **options):
+    options = {"retries": 2, "rate_limit": False, "verbose": False, **options}
+    return asyncio.run(SweepRunner(base_url=base_url, results_dir=str(results_dir), **options).run(jobs))
+
+
+def test_stream_aborted_on_every_attempt_is_counted_once_per_attempt(mock_server, sweep_jobs, tmp_path):
+    base_url, handler = mock_server(invalid_rate=1.0)
+    report = run(sweep_jobs(["claude"]), base_url, tmp_path / "results", stream=True, structured_output=False)
+
+    assert len(report.failed) == 1
+    assert report.stream_aborts == {"claude": 3}
+    # 3 generations, each rejected once: the last abort is not counted again by run_job()
+    assert report.validation_stats == {"claude": {"replies": 3, "rejected": 3}}
+
+
+def test_http_date_retry_after_is_parsed_and_capped(sweep_jobs, tmp_path, monkeypatch):
+    import json
+    import threading
+    from datetime import datetime, timedelta, timezone
+    from email.utils import format_datetime
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    import sweep
+    from api_clients.mock_server import analysis_text, wrap_reply
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        requests = 0
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            Handler.requests += 1
+            if Handler.requests == 1:
+                # A proxy's 503 with an HTTP-date an hour away
+                body, status = b"Service Unavailable", 503
+                retry_after = format_datetime(datetime.now(timezone.utc) + timedelta(hours=1), usegmt=True)
+            else:
+                body, status, retry_after = json.dumps(wrap_reply(self.path, analysis_text())).encode(), 200, None
+            self.send_response(status)
+            if retry_after:
+                self.send_header("Retry-After", retry_after)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    slept = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(seconds):
+        slept.append(seconds)
+        await real_sleep(0)
+
+    monkeypatch.setattr(sweep.asyncio, "sleep", sleep)
+    try:
+        report = run(sweep_jobs(["claude"]), f"http://127.0.0.1:{server.server_port}", tmp_path / "results")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert report.failed == [] and len(report.passed) == 1
+    assert slept == [sweep.MAX_RETRY_AFTER]
+
+
+def test_providers_run_concurrently_up_to_their_limit_and_retry_5xx(mock_server, sweep_jobs, tmp_path, monkeypatch):
+    import dataclasses
+    import threading
+
+    import sweep
+
+    base_url, handler = mock_server(latency=0.3)
+    do_post, lock = handler.do_POST, threading.Lock()
+    in_flight, peak, requests = {}, {}, []
+
+    def counting_do_post(self):
+        key = "claude" if "/messages" in self.path else "gemini"
+        with lock:
+            in_flight[key] = in_flight.get(key, 0) + 1
+            peak[key] = max(peak.get(key, 0), in_flight[key])
+            peak["all"] = max(peak.get("all", 0), sum(in_flight.values()))
+            requests.append(key)
+            overloaded = len(requests) <= 2
+        try:
+            if overloaded:
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                return self.send_json(500, {"error": {"message": "Internal error (mock server)"}})
+            return do_post(self)
+        finally:
+            with lock:
+                in_flight[key] -= 1
+
+    handler.do_POST = counting_do_post
+    slept = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(seconds):
+        slept.append(seconds)
+        await real_sleep(0)
+
+    monkeypatch.setattr(sweep.asyncio, "sleep", sleep)
+    limits = {"claude": 2, "gemini": 3}
+    jobs = [dataclasses.replace(job, provider=dataclasses.replace(job.provider, max_concurrency=limits[job.provider.key]))
+            for job in sweep_jobs(["claude", "gemini"], files=4)]
+    report = run(jobs, base_url, tmp_path / "results")
+
+    assert report.failed == [] and len(report.passed) == 8
+    # Every provider stays within its own limit, and the two providers overlap
+    assert peak["claude"] == 2 and peak["gemini"] == 3
+    assert peak["all"] > 3
+    # The two 500s were retried after the first back-off step
+    assert len(requests) == 10 and slept == [1, 1]
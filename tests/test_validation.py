@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from providers import PROVIDERS, get_provider
+from validation import CHECK_LIST, ResponseValidator, ValidationEngine, ValidationError, parse_response_text
+
+
+def reply(file_name="Autorent", detected=("S1.1", "N1.1")):
+    return {"file_name": file_name, "smell_analysis": [
+        {"rule_id": rule_id, "detected": rule_id in detected, "justification": f"About {rule_id}."} for rule_id in CHECK_LIST]}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Claude engine for Data/Oppejoud (Autorent.txt labels S1.1 and S1.2), saving under tmp_path."""
+    engine = ValidationEngine("claude", "Oppejoud", results_dir=str(tmp_path), verbose=False)
+    (tmp_path / "Claude" / "Oppejoud").mkdir(parents=True)
+    return engine
+
+
+def test_providers_by_key():
+    assert get_provider("Claude") is PROVIDERS["claude"]
+    with pytest.raises(ValueError, match="Unknown provider 'llama'"):
+        get_provider("llama")
+
+
+def test_saved_result_has_actual_from_the_label_file(engine, tmp_path):
+    path = engine.process(reply("Claude_Autorent"))
+    assert path == str(tmp_path / "Claude" / "Oppejoud" / "Autorent.json")
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["file_name"] == "Autorent" and saved["llm_model"] == "Claude Opus 4.5"
+    assert list(saved["smell_analysis"][0]) == ["rule_id", "actual", "detected", "justification"]
+    assert {item["rule_id"] for item in saved["smell_analysis"] if item["actual"]} == {"S1.1", "S1.2"}
+    assert {item["rule_id"] for item in saved["smell_analysis"] if item["detected"]} == {"S1.1", "N1.1"}
+
+    with pytest.raises(ValidationError, match="Condition 4"):
+        engine.process(reply("Claude_Autorent"))
+
+
+def test_provider_prefix_and_ground_truth_are_required(engine):
+    with pytest.raises(ValidationError, match="does not have Claude_ in it"):
+        engine.validate(reply("Autorent"))
+    with pytest.raises(ValidationError, match="Ground truth file not found"):
+        engine.validate(reply("Claude_Nonexistent"))
+    # Gemini has no prefix
+    assert ValidationEngine("gemini", "Oppejoud", verbose=False).validate(reply())[0] == "Autorent"
+
+
+@pytest.mark.parametrize("edit, condition", [
+    (lambda items: items.pop(), "Condition 1"),
+    (lambda items: items[0].pop("justification"), "Condition 2.1"),
+    (lambda items: items[1].update(justification=""), "Condition 2.2"),
+    (lambda items: items[2].update(detected="yes"), "Condition 2.3"),
+    (lambda items: items[3].update(rule_id="G5.1"), "Condition 3"),
+])
+def test_schema_conditions(edit, condition):
+    data = reply()
+    edit(data["smell_analysis"])
+    with pytest.raises(ValidationError, match=condition):
+        ResponseValidator().smell_list(data)
+
+
+def test_parse_response_text_drops_fences():
+    assert parse_response_text('Here it is:\n```json\n{"file_name": "x"}\n```') == {"file_name": "x"}
+    with pytest.raises(ValidationError, match="No JSON object"):
+        parse_response_text("Sorry, I cannot open the PDF.")
@@ -1,5 +1,10 @@
+import os
+import re
 import json
+import time
+import argparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # ==========================================
 # CONFIG: changes non utf-8 text parts only
@@ -8,35 +13,86 @@ from pathlib import Path
 SCRIPT_DIR = Path(__file__).resolve().parent
 ROOT = (SCRIPT_DIR / ".." / "Results").resolve()  # git_main_folder/Results
 
+WORKERS = 8
 
-def load_text(path: Path) -> str:
-    # Most JSON files are UTF-8; this also handles UTF-8 with BOM.
+BOM = b"\xef\xbb\xbf"
+
+# A \uXXXX escape that json.dumps(ensure_ascii=False) writes as the character itself: not
+# preceded by an odd number of backslashes (that would be an escaped "\" followed by "u")
+# and not a control character, which JSON keeps escaped. Checked on the raw bytes, no parsing.
+UNICODE_ESCAPE = re.compile(rb"(?<!\\)(?:\\\\)*\\u(?!00[01][0-9a-fA-F])[0-9a-fA-F]{4}")
+
+
+def needs_rewrite(raw: bytes) -> bool:
+    """True when the file starts with a BOM or contains a \\uXXXX escape of a printable character."""
+    if raw.startswith(BOM):
+        return True
+    return b"\\u" in raw and UNICODE_ESCAPE.search(raw) is not None
+
+
+def load_text(raw: bytes) -> str:
+    # Most JSON files are UTF-8; utf-8-sig also handles UTF-8 with BOM.
+    return raw.decode("utf-8-sig")
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Writes next to path and renames over it, so a crash never leaves a truncated file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def process(path: Path, rewrite_all: bool, dry_run: bool):
+    """Returns (bytes scanned, "rewritten" | "clean" | "failed", error message)."""
+    raw = b""
     try:
-        return path.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        return path.read_text(encoding="utf-8-sig")
+        raw = path.read_bytes()
+        if not rewrite_all and not needs_rewrite(raw):
+            return len(raw), "clean", None
+
+        data = json.loads(load_text(raw))  # decodes \u00xx escapes properly
+        pretty = json.dumps(data, ensure_ascii=False, indent=2) + "\n"
+        if not dry_run:
+            write_atomic(path, pretty)
+        return len(raw), "rewritten", None
+    except Exception as e:
+        return len(raw), "failed", f"{type(e).__name__}: {e}"
+
 
 def main() -> None:
-    if not ROOT.exists():
-        raise SystemExit(f"Folder not found: {ROOT}")
+    parser = argparse.ArgumentParser(description="Rewrites Results/**/*.json with real UTF-8 characters instead of \\uXXXX escapes.")
+    parser.add_argument("--root", type=Path, default=ROOT)
+    parser.add_argument("--all", action="store_true", help="rewrite every file, not only the ones with escapes or a BOM")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--dry-run", action="store_true", help="only list the files that would be rewritten")
+    args = parser.parse_args()
 
-    rewritten = 0
-    skipped = 0
+    if not args.root.exists():
+        raise SystemExit(f"Folder not found: {args.root}")
 
-    for p in ROOT.rglob("*.json"):
-        try:
-            raw = load_text(p)
-            data = json.loads(raw)  # decodes \u00xx escapes properly
+    start = time.perf_counter()
+    paths = sorted(args.root.rglob("*.json"))
+    scanned = 0
+    counts = {"rewritten": 0, "clean": 0, "failed": 0}
 
-            pretty = json.dumps(data, ensure_ascii=False, indent=2) + "\n"
-            p.write_text(pretty, encoding="utf-8")
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for path, (size, status, error) in zip(paths, pool.map(lambda p: process(p, args.all, args.dry_run), paths)):
+            scanned += size
+            counts[status] += 1
+            if status == "failed":
+                print(f"SKIP  {path}  ({error})")
+            elif status == "rewritten" and args.dry_run:
+                print(f"WOULD REWRITE  {path}")
 
-            rewritten += 1
-        except Exception as e:
-            skipped += 1
-            print(f"SKIP  {p}  ({type(e).__name__}: {e})")
+    elapsed = time.perf_counter() - start
+    print(f"Done. Rewritten: {counts['rewritten']}{' (dry run)' if args.dry_run else ''}, "
+          f"already clean: {counts['clean']}, failed: {counts['failed']}")
+    print(f"Scanned {len(paths)} files, {scanned / 1e6:.1f} MB in {elapsed:.2f}s "
+          f"({len(paths) / max(elapsed, 1e-9):.0f} files/s, {scanned / 1e6 / max(elapsed, 1e-9):.0f} MB/s)")
 
-    print(f"Done. Rewritten: {rewritten}, skipped: {skipped}")
 
 if __name__ == "__main__":
     main()
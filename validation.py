@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import functools
+from datetime import datetime, timezone
+
+from ground_truth import get_index
+from providers import get_provider
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+# The smell list to check against
+CHECK_LIST = ["G5.1", "G5.2", "G6.1", "G6.2", "G6.3", "G8.1", "G15.1", "G15.2", "G15.3", "S1.1", "S1.2", "S2.1", "N1.1", "N1.2", "N3.1", "N3.2", "N3.3", "N4.1"]
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(SCRIPT_DIR, "Results")
+
+
+class ValidationError(Exception):
+    """Raised when a response fails one of the validation conditions."""
+
+
+def parse_response_text(text):
+    """
+    Parses the JSON document out of a raw model reply. Models often wrap it in a ```json
+    fence or add a sentence around it, so everything outside the outermost braces is dropped.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValidationError("Error: Invalid JSON format. No JSON object found in the response.")
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise ValidationError(f"Error: Invalid JSON format. {e}")
+
+
+@functools.lru_cache(maxsize=None)
+def _response_schema(check_list):
+    item = {
+        "type": "object",
+        "properties": {
+            "rule_id": {"type": "string", "enum": list(check_list)},
+            "detected": {"type": "boolean"},
+            "justification": {"type": "string", "minLength": 1},
+        },
+        "required": ["rule_id", "detected", "justification"],
+        "additionalProperties": False,
+    }
+    return {
+        "type": "object",
+        "properties": {
+            "file_name": {"type": "string", "minLength": 1},
+            "smell_analysis": {"type": "array", "items": item, "minItems": len(check_list), "maxItems": len(check_list)},
+        },
+        "required": ["file_name", "smell_analysis"],
+        "additionalProperties": False,
+    }
+
+
+def response_schema(check_list=CHECK_LIST):
+    """
+    JSON Schema of a valid response for check_list, built once per check_list: the same
+    conditions as ResponseValidator (item count, exactly the 3 keys in this order, no empty
+    values, boolean "detected", rule IDs from check_list). Adapters translate it into each
+    API's structured output mode. Do not modify the returned dict, it is shared.
+    """
+    return _response_schema(tuple(check_list))
+
+
+# ==========================================
+# RESPONSE VALIDATOR
+# ==========================================
+
+class ResponseValidator:
+    """
+    The response schema compiled once: exactly len(check_list) items, 3 keys per item,
+    no empty values, a boolean second value and every rule ID of check_list present.
+    """
+
+    def __init__(self, check_list=CHECK_LIST):
+        self.check_list = tuple(check_list)
+        self.item_count = len(self.check_list)
+        self.items_validated = 0
+
+    def file_name(self, data, file_prefix=""):
+        """Returns the diagram name from "file_name" with the provider prefix removed."""
+        if not isinstance(data, dict) or "file_name" not in data:
+            raise ValidationError("Error: Input JSON is missing the required key 'file_name'.")
+
+        filename = data["file_name"]
+
+        if not filename or not isinstance(filename, str):
+            raise ValidationError("Error: The value for 'file_name' is empty or invalid.")
+
+        if file_prefix:
+            if file_prefix not in filename:
+                raise ValidationError(f"Error: The value does not have {file_prefix} in it, check the result.json")
+            filename = filename.removeprefix(file_prefix)
+
+        return filename
+
+    def smell_list(self, data):
+        """Validates and returns the first list in the response (normally "smell_analysis")."""
+        target_list = next((value for value in data.values() if isinstance(value, list)), None)
+        if target_list is None:
+            raise ValidationError("Error: No array/list found in the input JSON.")
+
+        # 1 Check Count
+        if len(target_list) != self.item_count:
+            raise ValidationError(f"Error (Condition 1): Smell count mismatch. Expected {self.item_count}, found {len(target_list)}.")
+
+        found_ids = set()
+        for index, item in enumerate(target_list):
+            self.check_item(item, index)
+            if isinstance(item_id := next(iter(item.values())), str):
+                found_ids.add(item_id)
+
+        # 3 check_list against found_ids
+        for val in self.check_list:
+            if val not in found_ids:
+                raise ValidationError(f"Error (Condition 3): Required rule_id '{val}' not found in the input data.")
+
+        self.items_validated += len(target_list)
+        return target_list
+
+    def check_item(self, item, index):
+        """Conditions 2.1 - 2.3 for a single smell_analysis item."""
+        # 2.1 Part A: 3 Keys exactly
+        if not isinstance(item, dict) or len(item) != 3:
+            raise ValidationError(f"Error (Condition 2.1): Item at index {index} does not have exactly 3 keys.")
+
+        # 2.2 Part B: No empty values
+        for k, v in item.items():
+            if v is None or v == "":
+                raise ValidationError(f"Error (Condition 2.2): Found empty value for key '{k}' at index {index}.")
+
+        # 2.3 Part C: 2nd Value is Boolean
+        keys = list(item)
+        if not isinstance(item[keys[1]], bool):
+            raise ValidationError(f"Error (Condition 2.3): The second value (key: '{keys[1]}') at index {index} is not a boolean.")
+
+    @staticmethod
+    def with_actual(target_list, gt_labels):
+        """Returns the items with "actual" injected right after the rule ID (exact match against gt_labels)."""
+        ordered_list = []
+        for item in target_list:
+            keys = list(item)
+            rule_id = item[keys[0]]
+            ordered_item = {keys[0]: rule_id, "actual": isinstance(rule_id, str) and rule_id in gt_labels}
+            for k in keys[1:]:
+                ordered_item[k] = item[k]
+            ordered_list.append(ordered_item)
+        return ordered_list
+
+
+# ==========================================
+# VALIDATION ENGINE
+# ==========================================
+
+class ValidationEngine:
+    """
+    Validates responses of one provider for one Data/ category and saves them under
+    Results/<provider>/<category>. One engine handles any number of responses.
+    """
+
+    def __init__(self, provider, category, results_dir=RESULTS_DIR, validator=None, verbose=True):
+        self.provider = get_provider(provider) if isinstance(provider, str) else provider
+        self.category = category
+        self.output_path = os.path.join(results_dir, self.provider.results_dir, category)
+        self.validator = validator or ResponseValidator()
+        self.ground_truth = get_index()
+        self.verbose = verbose
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    def validate(self, data):
+        """Validates one parsed response. Returns (file_name, final_output) or raises ValidationError."""
+        filename = self.validator.file_name(data, self.provider.file_prefix)
+
+        gt_labels = self.ground_truth.labels(self.category, filename)
+        if gt_labels is None:
+            raise ValidationError(f"Error: Ground truth file not found: {os.path.join('Data', self.category, filename + '.txt')}")
+
+        target_list = self.validator.smell_list(data)
+        self._log("--- All Validation Checks Passed ---")
+
+        final_output = {
+            "file_name": filename,
+            "timestamp": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "llm_model": self.provider.model_name,
+            "smell_analysis": self.validator.with_actual(target_list, gt_labels)
+        }
+        return filename, final_output
+
+    def output_file(self, filename):
+        return os.path.join(self.output_path, f"{filename}.json")
+
+    def save(self, filename, final_output):
+        full_output_path = self.output_file(filename)
+        self._log(f"Target Output:       {full_output_path}")
+
+        # Ensure Output Directory Exists
+        if not os.path.exists(self.output_path):
+            raise ValidationError(f"Error: Output directory does not exist: {self.output_path}")
+
+        try:
+            # 'x' mode ensures we never overwrite an existing result
+            with open(full_output_path, 'x', encoding='utf-8') as f:
+                json.dump(final_output, f, ensure_ascii=False, indent=2)
+        except FileExistsError:
+            raise ValidationError(f"Error (Condition 4): The file '{full_output_path}' already exists.")
+        except Exception as e:
+            raise ValidationError(f"Error: Could not save file. {e}")
+
+        self._log(f"Success: File saved as '{full_output_path}'")
+        return full_output_path
+
+    def process(self, data):
+        """Validates and saves one parsed response. Returns the saved path."""
+        filename, final_output = self.validate(data)
+        return self.save(filename, final_output)
+
+
+# ==========================================
+# BENCHMARK
+# ==========================================
+
+def validation_rate(responses, validator=None, rounds=1):
+    """Runs the schema validator over responses and returns validated smell items per second."""
+    validator = validator or ResponseValidator()
+    start_items = validator.items_validated
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for data in responses:
+            try:
+                validator.smell_list(data)
+            except ValidationError:
+                pass
+    elapsed = time.perf_counter() - start
+    items = validator.items_validated - start_items
+    return items / elapsed if elapsed > 0 else float("inf")
+
+
+def load_saved_responses(results_dir=RESULTS_DIR):
+    """Existing saved results turned back into raw responses (the "actual" key removed)."""
+    responses = []
+    for root, _, files in os.walk(results_dir):
+        for file in files:
+            if file.endswith(".json"):
+                with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for item in data.get("smell_analysis", []):
+                    item.pop("actual", None)
+                responses.append({"file_name": data.get("file_name"), "smell_analysis": data.get("smell_analysis", [])})
+    return responses
+
+
+if __name__ == "__main__":
+    responses = load_saved_responses()
+    rate = validation_rate(responses, rounds=20)
+    print(f"Validated {len(responses)} responses x 20 rounds: {rate:,.0f} items/sec")